@@ -1,14 +1,4 @@
-from flask import Flask, jsonify, request, send_file
-from flask_cors import CORS
-import os
-
-app = Flask(__name__)
-CORS(app)
-
-@app.route('/api/grocery-data/csv', methods=['GET'])
-def get_grocery_csv():
-    csv_path = os.path.join(os.path.dirname(__file__), 'data', 'GroceryDataset', 'GroceryDataset4Guaco.csv')
-    return send_file(csv_path, mimetype='text/csv')
-
-if __name__ == '__main__':
-    app.run(debug=True, port=8000) 
\ No newline at end of file
+# The grocery-data routes that used to run here as a separate Flask server
+# are served by the FastAPI app in main.py. This module stays so that
+# `uvicorn app:app` keeps working; it is the same single app.
+from main import app  # noqa: F401
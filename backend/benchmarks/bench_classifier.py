@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Accuracy and throughput of the grocery item classifier
+(services/grocery_classifier.py).
+
+Holds out a share of GroceryDataset4Guaco.csv (stratified by Sub
+Category), trains on the rest plus category_map.json, and reports top-1 /
+top-3 accuracy on the held-out titles, averaged over a few random splits.
+Then times classify_many() on batches of typed-style items (map names and
+title fragments) and reports items/second per batch size.
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/bench_classifier.py
+> python benchmarks/bench_classifier.py --no-map --splits 10
+> python benchmarks/bench_classifier.py --min-accuracy 0.6 --json classifier.json
+
+--min-accuracy makes the script exit non-zero if mean top-1 accuracy drops
+below the given fraction.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from services.grocery_classifier import GroceryClassifier, load_training_data  # noqa: E402
+from services.ingredient_index import CATEGORY_MAP_FILE  # noqa: E402
+
+BATCH_SIZES = (1, 20, 200, 2000)
+
+
+def stratified_split(labels: list[str], test_fraction: float, rng: random.Random) -> tuple[list[int], list[int]]:
+    by_label = defaultdict(list)
+    for i, label in enumerate(labels):
+        by_label[label].append(i)
+    train, test = [], []
+    for rows in by_label.values():
+        rng.shuffle(rows)
+        cut = max(1, round(len(rows) * test_fraction)) if len(rows) > 1 else 0
+        test += rows[:cut]
+        train += rows[cut:]
+    return train, test
+
+
+def evaluate(csv_items, csv_labels, extra_items, extra_labels, test_fraction, rng) -> dict:
+    train, test = stratified_split(csv_labels, test_fraction, rng)
+    start = time.perf_counter()
+    classifier = GroceryClassifier(
+        [csv_items[i] for i in train] + extra_items,
+        [csv_labels[i] for i in train] + extra_labels,
+    )
+    build_ms = (time.perf_counter() - start) * 1000
+    scores = classifier.scores([csv_items[i] for i in test])
+    truth = np.array([classifier.labels.index(csv_labels[i]) for i in test])
+    top3 = np.argsort(-scores, axis=1)[:, :3]
+    return {
+        "top1": float(np.mean(top3[:, 0] == truth)),
+        "top3": float(np.mean((top3 == truth[:, None]).any(axis=1))),
+        "build_ms": build_ms,
+        "test_items": len(test),
+    }
+
+
+def typed_items(csv_items: list[str], map_items: list[str], count: int, rng: random.Random) -> list[str]:
+    """What people type: ingredient names and two- or three-word bits of product titles."""
+    items = []
+    for _ in range(count):
+        if map_items and rng.random() < 0.5:
+            items.append(rng.choice(map_items))
+        else:
+            words = rng.choice(csv_items).split()
+            start = rng.randrange(max(1, len(words) - 2))
+            items.append(" ".join(words[start:start + rng.randint(2, 3)]))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--splits", type=int, default=5, help="random held-out splits to average over")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--no-map", action="store_true", help="train on the CSV only")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per batch size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--min-accuracy", type=float, help="fail if mean top-1 accuracy is below this")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    csv_items, csv_labels = load_training_data(map_path=None)
+    all_items, all_labels = load_training_data(map_path=None if args.no_map else CATEGORY_MAP_FILE)
+    map_items, map_labels = all_items[len(csv_items):], all_labels[len(csv_items):]
+
+    runs = [evaluate(csv_items, csv_labels, map_items, map_labels, args.test_fraction, rng)
+            for _ in range(args.splits)]
+    results = {
+        "train_titles": len(csv_items) - runs[0]["test_items"],
+        "map_names": len(map_items),
+        "test_titles": runs[0]["test_items"],
+        "splits": args.splits,
+        "top1": round(float(np.mean([r["top1"] for r in runs])), 4),
+        "top1_min": round(min(r["top1"] for r in runs), 4),
+        "top3": round(float(np.mean([r["top3"] for r in runs])), 4),
+        "build_ms": round(float(np.mean([r["build_ms"] for r in runs])), 1),
+        "throughput": {},
+    }
+
+    classifier = GroceryClassifier(all_items, all_labels)
+    for size in BATCH_SIZES:
+        batch = typed_items(csv_items, map_items, size, rng)
+        classified, deadline = 0, time.perf_counter() + args.seconds
+        start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            classifier.classify_many(batch)
+            classified += size
+        elapsed = time.perf_counter() - start
+        results["throughput"][size] = round(classified / elapsed)
+
+    print(f"✓  {len(classifier)} classes; trained on {results['train_titles']:,} titles"
+          f" + {results['map_names']} map names in {results['build_ms']} ms")
+    print(f"Held-out ({results['test_titles']} titles x {args.splits} splits): "
+          f"top-1 {results['top1']:.1%} (worst split {results['top1_min']:.1%}), top-3 {results['top3']:.1%}")
+    print(f"{'batch':>8} {'items/s':>12}")
+    for size, rate in results["throughput"].items():
+        print(f"{size:>8} {rate:>12,}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.min_accuracy is not None and results["top1"] < args.min_accuracy:
+        sys.exit(f"❌  top-1 accuracy {results['top1']:.1%} is below {args.min_accuracy:.1%}")
+
+
+if __name__ == "__main__":
+    main()
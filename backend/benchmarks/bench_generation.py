@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Side-by-side benchmark of the two generation modes (GENERATION_MODE=text
+vs json) against the fake OpenAI server in fake_openai.py.
+
+For every recorded ingredient list it runs generate_recipe_from_ingredients
+in each mode and reports:
+
+• prompt and completion tokens (approximate, counted by the fake server);
+• end-to-end latency, which the fake server makes proportional to the
+  completion length (--latency-ms + --ms-per-token per token);
+• parse time of the response: the regex text parser vs validating the
+  JSON into RecipeResponse.
+
+It also checks both modes produce the same servings and nutrition for the
+same recording.
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/bench_generation.py
+> python benchmarks/bench_generation.py --latency-ms 300 --ms-per-token 15 --json generation.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(BACKEND / "benchmarks"))
+
+# Compare the model's own nutrition in both modes, and don't touch real caches
+os.environ["NUTRITION_SOURCE"] = "llm"
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+import httpx  # noqa: E402
+from fake_openai import load_fixtures, running_server  # noqa: E402
+
+MODES = ("text", "json")
+
+
+def mean(values: list[float]) -> float:
+    return round(statistics.fmean(values), 3) if values else 0.0
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+def time_parse(parse, contents: list[str], rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        for content in contents:
+            start = time.perf_counter()
+            parse(content)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+async def run_mode(generator, mode: str, ingredient_lists: list[list[str]], rounds: int, base_url: str) -> dict:
+    generator.GENERATION_MODE = mode
+    async with httpx.AsyncClient() as client:
+        before = (await client.get(base_url.removesuffix("/v1") + "/stats")).json()
+        latencies, recipes = [], []
+        for _ in range(rounds):
+            for ingredients in ingredient_lists:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    recipe = await generator.generate_recipe_from_ingredients(ingredients)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if "error" in recipe:
+                    sys.exit(f"❌  {mode} mode failed for {ingredients}: {recipe['error']}")
+                recipes.append(recipe)
+        after = (await client.get(base_url.removesuffix("/v1") + "/stats")).json()
+
+    calls = after["requests"] - before["requests"]
+    return {
+        "calls": calls,
+        "prompt_tokens": round((after["prompt_tokens"] - before["prompt_tokens"]) / calls, 1),
+        "completion_tokens": round((after["completion_tokens"] - before["completion_tokens"]) / calls, 1),
+        "latency_mean_ms": mean(latencies),
+        "latency_p95_ms": percentile(latencies, 0.95),
+        "recipes": recipes[:len(ingredient_lists)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="generations per recording and mode")
+    parser.add_argument("--parse-rounds", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    text_fixtures = load_fixtures("responses.jsonl")
+    json_fixtures = load_fixtures("responses_json.jsonl")
+    ingredient_lists = [fixture["ingredients"] for fixture in text_fixtures]
+
+    with running_server(args.latency_ms, args.ms_per_token) as base_url:
+        os.environ["OPENAI_BASE_URL"] = base_url
+        from services import chat_generate_recipes as generator
+        from services import llm_client
+
+        async def run_all():
+            try:
+                return {mode: await run_mode(generator, mode, ingredient_lists, args.rounds, base_url) for mode in MODES}
+            finally:
+                await llm_client.aclose()
+
+        results = asyncio.run(run_all())
+
+    for i, ingredients in enumerate(ingredient_lists):
+        text_recipe, json_recipe = results["text"]["recipes"][i], results["json"]["recipes"][i]
+        for field in ("servings", "nutrition"):
+            if text_recipe[field] != json_recipe[field]:
+                print(f"⚠️  {field} differs between modes for {ingredients}")
+    for mode in MODES:
+        del results[mode]["recipes"]
+
+    parsers = {
+        "text": (generator.build_recipe_data, [f["content"] for f in text_fixtures]),
+        "json": (generator.build_structured_recipe_data, [f["content"] for f in json_fixtures]),
+    }
+    for mode, (parse, contents) in parsers.items():
+        samples = time_parse(parse, contents, args.parse_rounds)
+        results[mode]["parse_mean_us"] = mean(samples)
+        results[mode]["parse_p99_us"] = percentile(samples, 0.99)
+
+    print(f"{'':<22} {'text':>12} {'json':>12}")
+    for key in ("prompt_tokens", "completion_tokens", "latency_mean_ms", "latency_p95_ms", "parse_mean_us", "parse_p99_us"):
+        print(f"{key:<22} {results['text'][key]:>12} {results['json'][key]:>12}")
+    saved = 1 - results["json"]["completion_tokens"] / results["text"]["completion_tokens"]
+    print(f"completion tokens saved by json mode: {saved:.0%}")
+
+    if args.json:
+        results["settings"] = vars(args) | {"json": str(args.json)}
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Load test for the backend (main.py) under a mixed workload, with
+fake_openai.py standing in for the OpenAI API so no tokens are spent.
+
+Both servers run as subprocesses on free local ports, and the load
+generator keeps --concurrency requests in flight for --duration seconds
+(after --warmup seconds that are not counted). Each request is one
+operation from the mix. Weights are given with --mix:
+
+  save          POST /api/recipes
+  list          GET  /api/recipes/{category}?limit=50
+  generate      POST /api/generate_recipe_from_ingredients  (bypass_cache)
+  stream        POST /api/generate_recipe_from_ingredients/stream
+  grocery_csv   GET  /api/grocery-data/csv
+
+The report has req/s, p50/p95/p99 latency and the status codes for every
+route, plus the totals. --json writes it together with the git commit and
+the settings, and --compare prints the change against an earlier result,
+so two commits can be compared.
+
+The servers get a throwaway data/ folder (symlinks to the real files, but
+a fresh recipes.db and no generation cache on disk), so a run never
+touches the real recipes.
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/bench_load.py
+> python benchmarks/bench_load.py --concurrency 64 --duration 30 --json load.json
+> python benchmarks/bench_load.py --mix list=8,save=1,grocery_csv=1 --compare load.json
+
+Environment variables such as LLM_MAX_CONCURRENCY are passed on to the
+FastAPI server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(BACKEND / "benchmarks"))
+
+import httpx  # noqa: E402
+from fake_openai import _free_port, load_fixtures  # noqa: E402
+from services.nutrition_matrix import NUTRIENT_NAMES  # noqa: E402
+
+DEFAULT_MIX = "save=1,list=4,generate=1,stream=1,grocery_csv=2"
+CATEGORIES = ("breakfast", "lunch", "dinner", "snack")
+# Files the servers must not share with the real data/ folder
+PRIVATE_DATA = ("recipes.db", "recipes.json", "generation_cache.db")
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            sys.exit(f"❌  Unknown operation {name.strip()!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# -- servers ---------------------------------------------------------------
+
+@contextmanager
+def scratch_data_dir():
+    """A working directory whose data/ links to the real files except the recipe stores."""
+    root = Path(tempfile.mkdtemp(prefix="guaco-load-"))
+    (root / "data").mkdir()
+    for path in (BACKEND / "data").iterdir():
+        if path.name not in PRIVATE_DATA and path.name != "__pycache__":
+            (root / "data" / path.name).symlink_to(path)
+    try:
+        yield root
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def start(command: list[str], cwd: Path, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"❌  Server for {url} exited:\n{process.stderr.read()}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    sys.exit(f"❌  {url} did not come up within {timeout:.0f}s")
+
+
+@contextmanager
+def running_servers(args):
+    ports = {name: _free_port() for name in ("openai", "api")}
+    python = sys.executable
+    with scratch_data_dir() as workdir:
+        env = os.environ | {
+            "PYTHONPATH": str(BACKEND),
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{ports['openai']}/v1",
+            "OPENAI_API_KEY": "fake",
+            "GENERATION_CACHE_PATH": "",
+            "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+        }
+        processes = [
+            start([python, str(BACKEND / "benchmarks" / "fake_openai.py"), "--port", str(ports["openai"]),
+                   "--latency-ms", str(args.latency_ms), "--ms-per-token", str(args.ms_per_token)], workdir, env),
+            start([python, "-m", "uvicorn", "main:app", "--port", str(ports["api"]),
+                   "--workers", str(args.api_workers), "--log-level", "warning"], workdir, env),
+        ]
+        try:
+            urls = {name: f"http://127.0.0.1:{port}" for name, port in ports.items()}
+            wait_ready(urls["openai"] + "/stats", processes[0])
+            wait_ready(urls["api"] + "/api/hello", processes[1])
+            yield urls
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+# -- operations ------------------------------------------------------------
+# Each returns (route, status); the route is the template, not the URL.
+
+def sample_recipe(rng: random.Random) -> dict:
+    servings = rng.randint(1, 6)
+    return {
+        "title": f"Load test recipe {rng.randrange(10**6)}",
+        "summary": "Generated by bench_load.py",
+        "category": rng.choice(CATEGORIES),
+        "instructions": "1. Mix.\n2. Cook.",
+        "nutrition": {name: round(rng.uniform(0, 50), 1) for name in NUTRIENT_NAMES} | {"calories": rng.randint(100, 900)},
+        "servings": servings,
+        "prepTime": "10",
+        "cookTime": "20",
+    }
+
+
+async def op_save(client, urls, rng, fixtures):
+    response = await client.post(urls["api"] + "/api/recipes", json=sample_recipe(rng))
+    return "POST /api/recipes", response.status_code
+
+
+async def op_list(client, urls, rng, fixtures):
+    response = await client.get(urls["api"] + f"/api/recipes/{rng.choice(CATEGORIES)}", params={"limit": 50})
+    return "GET /api/recipes/{category}", response.status_code
+
+
+async def op_generate(client, urls, rng, fixtures):
+    body = {"ingredients": rng.choice(fixtures)["ingredients"], "bypass_cache": True}
+    response = await client.post(urls["api"] + "/api/generate_recipe_from_ingredients", json=body)
+    return "POST /api/generate_recipe_from_ingredients", response.status_code
+
+
+async def op_stream(client, urls, rng, fixtures):
+    body = {"ingredients": rng.choice(fixtures)["ingredients"], "bypass_cache": True}
+    async with client.stream("POST", urls["api"] + "/api/generate_recipe_from_ingredients/stream", json=body) as response:
+        async for _ in response.aiter_bytes():
+            pass
+    return "POST /api/generate_recipe_from_ingredients/stream", response.status_code
+
+
+async def op_grocery_csv(client, urls, rng, fixtures):
+    response = await client.get(urls["api"] + "/api/grocery-data/csv")
+    return "GET /api/grocery-data/csv", response.status_code
+
+
+OPERATIONS = {
+    "save": op_save,
+    "list": op_list,
+    "generate": op_generate,
+    "stream": op_stream,
+    "grocery_csv": op_grocery_csv,
+}
+
+
+# -- load generator ---------------------------------------------------------
+
+async def run_load(urls: dict, mix: dict[str, float], args) -> dict:
+    fixtures = load_fixtures("responses.jsonl")
+    names, weights = list(mix), list(mix.values())
+    samples: dict[str, list[float]] = {}
+    statuses: dict[str, dict[str, int]] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        measure_from = start + args.warmup
+        stop_at = measure_from + args.duration
+
+        async def worker(seed: int):
+            rng = random.Random(seed)
+            while (now := time.perf_counter()) < stop_at:
+                operation = OPERATIONS[rng.choices(names, weights)[0]]
+                try:
+                    route, status = await operation(client, urls, rng, fixtures)
+                except httpx.HTTPError as e:
+                    route, status = operation.__name__.removeprefix("op_"), type(e).__name__
+                if now >= measure_from:
+                    samples.setdefault(route, []).append((time.perf_counter() - now) * 1000)
+                    counts = statuses.setdefault(route, {})
+                    counts[str(status)] = counts.get(str(status), 0) + 1
+
+        await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - measure_from
+
+    routes = {
+        route: {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "statuses": statuses[route],
+        }
+        for route, latencies in sorted(samples.items())
+    }
+    everything = [latency for latencies in samples.values() for latency in latencies]
+    total = {
+        "requests": len(everything),
+        "rps": round(len(everything) / elapsed, 1),
+        "p50_ms": percentile(everything, 0.50),
+        "p95_ms": percentile(everything, 0.95),
+        "p99_ms": percentile(everything, 0.99),
+        "errors": sum(n for counts in statuses.values() for s, n in counts.items() if not s.startswith(("2", "3"))),
+    }
+    return {"routes": routes, "total": total}
+
+
+def print_report(results: dict, baseline: dict | None):
+    def delta(route: str, key: str, value: float) -> str:
+        if baseline is None:
+            return ""
+        before = (baseline["total"] if route == "total" else baseline["routes"].get(route, {})).get(key)
+        if not before:
+            return " " * 8
+        return f" {(value - before) / before:+7.0%}"
+
+    print(f"{'route':<52} {'req/s':>16} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16}  statuses")
+    rows = list(results["routes"].items()) + [("total", results["total"])]
+    for route, row in rows:
+        cells = "".join(f" {row[key]:>8}{delta(route, key, row[key])}" if baseline else f" {row[key]:>16}"
+                        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"))
+        statuses = row.get("statuses", {"errors": row.get("errors", 0)})
+        print(f"{route:<52}{cells}  {' '.join(f'{s}:{n}' for s, n in statuses.items())}")
+    if baseline is not None:
+        print(f"(change against {baseline.get('commit', '?')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. list=4,save=1")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fake API wait before the first token")
+    parser.add_argument("--ms-per-token", type=float, default=2.0, help="fake API wait per completion token")
+    parser.add_argument("--api-workers", type=int, default=1, help="uvicorn workers for main.py")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    parser.add_argument("--compare", type=Path, help="earlier --json result to compare against")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    with running_servers(args) as urls:
+        results = asyncio.run(run_load(urls, mix, args))
+
+    print_report(results, baseline)
+
+    if args.json:
+        results = {"commit": git_commit(), "settings": vars(args) | {
+            "json": str(args.json), "compare": str(args.compare) if args.compare else None,
+        }} | results
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
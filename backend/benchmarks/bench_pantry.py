@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for "what can I cook now" (services/pantry_index.py).
+
+Fills a scratch SQLite recipe store with synthetic saved recipes (summary
+plus an "Ingredients:" section, the way save_recipe stores them; ingredient
+popularity is skewed so common items like onion and garlic have long
+postings), indexes it, then times pantry queries of 3-15 grocery items.
+Finally saves a few more recipes and times the incremental sync.
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/bench_pantry.py
+> python benchmarks/bench_pantry.py --recipes 200000 --max-p99-ms 20 --json pantry.json
+
+--max-p99-ms makes the script exit non-zero if the p99 query time goes
+above the given number of milliseconds.
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from services.pantry_index import PantryIndex  # noqa: E402
+from services.recipe_store import SQLiteRecipeStore  # noqa: E402
+
+BASES = [
+    "onion", "garlic", "tomato", "potato", "carrot", "celery", "bell pepper", "spinach",
+    "broccoli", "zucchini", "mushroom", "cabbage", "kale", "corn", "pea", "green bean",
+    "sweet potato", "cucumber", "lettuce", "avocado", "lemon", "lime", "apple", "banana",
+    "chicken", "beef", "pork", "turkey", "salmon", "shrimp", "tuna", "tofu", "egg", "bacon",
+    "rice", "pasta", "quinoa", "bread", "tortilla", "flour", "oat", "lentil", "black bean",
+    "chickpea", "milk", "butter", "cheese", "yogurt", "cream", "sugar", "honey", "soy sauce",
+    "vinegar", "mustard", "ginger", "cilantro", "parsley", "basil", "thyme", "rosemary",
+    "cumin", "paprika", "chili powder", "cinnamon", "coconut milk", "peanut butter", "almond",
+]
+KINDS = ["", "", "", "red", "green", "cherry", "brown", "whole wheat", "cheddar", "greek", "smoked", "wild"]
+CATEGORIES = ["breakfast", "lunch", "dinner", "dessert", "snack"]
+
+
+def vocabulary() -> list[str]:
+    return sorted({f"{kind} {base}".strip() for base in BASES for kind in KINDS})
+
+
+def synthetic_recipe(rng: random.Random, vocab: list[str], weights: list[float]) -> dict:
+    names = set(rng.choices(vocab, weights, k=rng.randint(4, 12)))
+    lines = [f"• {rng.randint(1, 4)} cups {name}" for name in names] + ["• salt and pepper to taste"]
+    return {
+        "title": "Synthetic " + " and ".join(sorted(names)[:2]).title(),
+        "summary": "A recipe created using: " + ", ".join(sorted(names)),
+        "instructions": "Ingredients:\n" + "\n".join(lines) + "\n\nInstructions:\n1. Cook.",
+    }
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-p99-ms", type=float, help="fail if p99 query time is above this")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = vocabulary()
+    # Zipf-ish: a few ingredients appear in most recipes
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    rng.shuffle(weights)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store = SQLiteRecipeStore(Path(scratch) / "recipes.db")
+        start = time.perf_counter()
+        for offset in range(0, args.recipes, 5000):
+            store.add_many([(rng.choice(CATEGORIES), synthetic_recipe(rng, vocab, weights))
+                            for _ in range(min(5000, args.recipes - offset))])
+        filled = time.perf_counter()
+        index = PantryIndex(store)
+        len(index)
+        built = time.perf_counter()
+
+        queries = [
+            {
+                "items": rng.sample(vocab, rng.randint(3, 15)),
+                "min_coverage": rng.choice([0.5, 0.75, 1.0]),
+                "category": rng.choice([None, None, *CATEGORIES]),
+            }
+            for _ in range(args.queries)
+        ]
+        samples, hits = [], 0
+        for q in queries:
+            t = time.perf_counter()
+            _, total = index.search(**q)
+            samples.append((time.perf_counter() - t) * 1000)
+            hits += total > 0
+        ordered = sorted(samples)
+
+        store.add_many([(rng.choice(CATEGORIES), synthetic_recipe(rng, vocab, weights)) for _ in range(10)])
+        t = time.perf_counter()
+        len(index)
+        synced = time.perf_counter() - t
+
+    results = {
+        "recipes": len(index),
+        "terms": len(vocab),
+        "fill_ms": round((filled - start) * 1000, 1),
+        "build_ms": round((built - filled) * 1000, 1),
+        "sync_10_ms": round(synced * 1000, 3),
+        "queries": len(samples),
+        "queries_with_results": hits,
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+    print(f"✓  {results['recipes']:,} recipes over {results['terms']:,} ingredient terms "
+          f"(store {results['fill_ms']} ms, index {results['build_ms']} ms, "
+          f"sync of 10 new saves {results['sync_10_ms']} ms)")
+    print(f"{results['queries']:,} queries ({hits} with results): mean {results['mean_ms']} ms, "
+          f"p50 {results['p50_ms']} ms, p99 {results['p99_ms']} ms, max {results['max_ms']} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.max_p99_ms is not None and results["p99_ms"] > args.max_p99_ms:
+        sys.exit(f"❌  p99 query time {results['p99_ms']} ms is above {args.max_p99_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
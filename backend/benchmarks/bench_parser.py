@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the recipe response parser.
+
+Runs the current parser (services/chat_generate_recipes.py) and the frozen
+regex-per-field parser (legacy_parser.py) over a corpus of recorded model
+responses, checks they return identical dicts, and reports parse time per
+response.
+
+Corpus: fixtures/responses.jsonl plus the `instructions` text of every
+recipe in data/recipes.json.
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/bench_parser.py
+> python benchmarks/bench_parser.py --max-us 40 --json parser.json
+
+--max-us makes the script exit non-zero if the mean parse time of the
+current parser goes above the given number of microseconds, so it can be
+used to catch regressions.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(BACKEND / "benchmarks"))
+
+import legacy_parser  # noqa: E402
+from services.chat_generate_recipes import parse_recipe_text  # noqa: E402
+
+FIXTURES = BACKEND / "benchmarks" / "fixtures" / "responses.jsonl"
+RECIPES_JSON = BACKEND / "data" / "recipes.json"
+
+
+def load_corpus() -> list[str]:
+    corpus = [json.loads(line)["content"] for line in FIXTURES.open(encoding="utf-8") if line.strip()]
+    if RECIPES_JSON.exists():
+        for recipes in json.loads(RECIPES_JSON.read_text(encoding="utf-8")).values():
+            corpus += [recipe["instructions"] for recipe in recipes if recipe.get("instructions")]
+    return corpus
+
+
+def legacy_parse(text: str):
+    return (
+        legacy_parser.parse_recipe_metadata(text),
+        legacy_parser.parse_recipe_sections(text),
+        legacy_parser.parse_nutrition_values(text),
+    )
+
+
+def time_per_response(parse, corpus: list[str], rounds: int) -> list[float]:
+    """Microseconds per response, one sample per (round, response)."""
+    samples = []
+    for _ in range(rounds):
+        for text in corpus:
+            start = time.perf_counter()
+            parse(text)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean_us": round(statistics.fmean(ordered), 2),
+        "p50_us": round(ordered[len(ordered) // 2], 2),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--max-us", type=float, help="fail if the mean parse time is above this")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+
+    mismatches = [i for i, text in enumerate(corpus) if parse_recipe_text(text) != legacy_parse(text)]
+    if mismatches:
+        sys.exit(f"❌  Parsers disagree on responses {mismatches}")
+
+    results = {
+        "responses": len(corpus),
+        "rounds": args.rounds,
+        "legacy": summarize(time_per_response(legacy_parse, corpus, args.rounds)),
+        "current": summarize(time_per_response(parse_recipe_text, corpus, args.rounds)),
+    }
+    results["speedup"] = round(results["legacy"]["mean_us"] / results["current"]["mean_us"], 2)
+
+    print(f"✓  {len(corpus)} responses parsed identically by both parsers")
+    print(f"{'parser':<10} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10}")
+    for name in ("legacy", "current"):
+        r = results[name]
+        print(f"{name:<10} {r['mean_us']:>10} {r['p50_us']:>10} {r['p99_us']:>10}")
+    print(f"speed-up: {results['speedup']}x")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.max_us is not None and results["current"]["mean_us"] > args.max_us:
+        sys.exit(f"❌  Mean parse time {results['current']['mean_us']} µs is above {args.max_us} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the grocery product search (services/product_search.py).
+
+Builds the BM25 index over data/GroceryDataset/GroceryDataset.csv, then
+times a query mix: fixed shopping queries, two-word queries taken from
+product titles, and the same queries with category / price / rating
+filters.
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/bench_search.py
+> python benchmarks/bench_search.py --max-p99-ms 5 --json search.json
+
+--max-p99-ms makes the script exit non-zero if the p99 query time goes
+above the given number of milliseconds.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from services.grocery_catalog import CATEGORY_FIELD, GroceryCatalog  # noqa: E402
+from services.product_search import ProductSearch, tokenize  # noqa: E402
+
+GROCERY_CSV = BACKEND / "data" / "GroceryDataset" / "GroceryDataset.csv"
+
+FIXED_QUERIES = [
+    "peanut butter", "chocolate cake", "olive oil", "coffee", "organic eggs",
+    "cheddar cheese", "sparkling water", "frozen chicken breast", "rice",
+    "gluten free pasta", "almond milk", "kosher", "gift box", "snack variety pack",
+]
+
+
+def build_queries(catalog: GroceryCatalog, count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    texts = list(FIXED_QUERIES)
+    for title in rng.sample(catalog.columns["Title"], min(count, len(catalog))):
+        words = tokenize(title)
+        if len(words) >= 2:
+            start = rng.randrange(len(words) - 1)
+            texts.append(" ".join(words[start:start + 2]))
+
+    categories = sorted(set(catalog.columns[CATEGORY_FIELD]))
+    queries = [{"query": text} for text in texts]
+    queries += [
+        {
+            "query": text,
+            "category": rng.choice(categories),
+            "max_price": rng.choice([None, 20.0, 50.0]),
+            "min_rating": rng.choice([None, 4.0]),
+        }
+        for text in texts
+    ]
+    return queries
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500, help="title-derived queries to add to the mix")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-p99-ms", type=float, help="fail if p99 query time is above this")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = GroceryCatalog(GROCERY_CSV)
+    loaded = time.perf_counter()
+    search = ProductSearch(catalog)
+    built = time.perf_counter()
+
+    queries = build_queries(catalog, args.queries, args.seed)
+    samples = []
+    for _ in range(args.rounds):
+        for q in queries:
+            t = time.perf_counter()
+            search.search(**q)
+            samples.append((time.perf_counter() - t) * 1000)
+    ordered = sorted(samples)
+
+    results = {
+        "products": len(catalog),
+        "terms": len(search),
+        "load_ms": round((loaded - start) * 1000, 1),
+        "build_ms": round((built - loaded) * 1000, 1),
+        "queries": len(samples),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+    print(f"✓  {results['products']:,} products, {results['terms']:,} terms "
+          f"(load {results['load_ms']} ms, index {results['build_ms']} ms)")
+    print(f"{results['queries']:,} queries: mean {results['mean_ms']} ms, "
+          f"p50 {results['p50_ms']} ms, p99 {results['p99_ms']} ms, max {results['max_ms']} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.max_p99_ms is not None and results["p99_ms"] > args.max_p99_ms:
+        sys.exit(f"❌  p99 query time {results['p99_ms']} ms is above {args.max_p99_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
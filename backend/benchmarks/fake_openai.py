@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions API.
+
+Replays the recorded responses in fixtures/ instead of calling a model, so
+the generation paths can be timed without spending tokens:
+
+• text requests get fixtures/responses.jsonl, JSON-mode requests
+  (response_format={"type": "json_object"}) get fixtures/responses_json.jsonl;
+  the fixture whose ingredient list appears in the prompt is used, otherwise
+  they are served round-robin;
+• each reply waits --latency-ms before the first token and --ms-per-token
+  per completion token, so shorter completions really are faster;
+• stream=true is answered with chat.completion.chunk server-sent events;
+• usage is filled in with approx_tokens(), OpenAI's rule of thumb of one
+  token per 4 characters (good enough to compare two prompt formats; it is
+  not the model's tokenizer).
+
+How to run (from backend/)
+--------------------------
+> python benchmarks/fake_openai.py --port 8089 --latency-ms 400 --ms-per-token 20
+> OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+Benchmarks can also start it in-process with running_server().
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def approx_tokens(text: str) -> int:
+    return (len(text or "") + 3) // 4
+
+
+def load_fixtures(name: str) -> list[dict]:
+    with (FIXTURES / name).open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def make_app(latency_ms: float = 0.0, ms_per_token: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    fixtures = {"text": load_fixtures("responses.jsonl"), "json": load_fixtures("responses_json.jsonl")}
+    turns = {mode: itertools.cycle(items) for mode, items in fixtures.items()}
+    stats = {"requests": 0, "streams": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def pick(mode: str, prompt: str) -> str:
+        for fixture in fixtures[mode]:
+            if ", ".join(fixture["ingredients"]) in prompt:
+                return fixture["content"]
+        return next(turns[mode])["content"]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = "\n".join(m.get("content") or "" for m in body.get("messages", []))
+        mode = "json" if (body.get("response_format") or {}).get("type") == "json_object" else "text"
+        content = pick(mode, prompt)
+        usage = {"prompt_tokens": approx_tokens(prompt), "completion_tokens": approx_tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        stats["requests"] += 1
+        stats["prompt_tokens"] += usage["prompt_tokens"]
+        stats["completion_tokens"] += usage["completion_tokens"]
+        ident, created, model = f"chatcmpl-fake{stats['requests']}", int(time.time()), body.get("model", "fake")
+
+        if body.get("stream"):
+            stats["streams"] += 1
+            return StreamingResponse(
+                _stream(content, ident, created, model, latency_ms, ms_per_token),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep((latency_ms + ms_per_token * usage["completion_tokens"]) / 1000)
+        return JSONResponse({
+            "id": ident,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+async def _stream(content: str, ident: str, created: int, model: str, latency_ms: float, ms_per_token: float):
+    def chunk(delta: dict, finish_reason=None) -> str:
+        return "data: " + json.dumps({
+            "id": ident,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }) + "\n\n"
+
+    await asyncio.sleep(latency_ms / 1000)
+    yield chunk({"role": "assistant", "content": ""})
+    # One delta per approximate token
+    for piece in (content[i:i + 4] for i in range(0, len(content), 4)):
+        await asyncio.sleep(ms_per_token / 1000)
+        yield chunk({"content": piece})
+    yield chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def running_server(latency_ms: float = 0.0, ms_per_token: float = 0.0, port: int = 0):
+    """Run the fake API in a background thread; yields its base URL (…/v1)."""
+    port = port or _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        make_app(latency_ms, ms_per_token), host="127.0.0.1", port=port, log_level="warning",
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="wait before the first token")
+    parser.add_argument("--ms-per-token", type=float, default=20.0, help="wait per completion token")
+    args = parser.parse_args()
+    uvicorn.run(make_app(args.latency_ms, args.ms_per_token), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
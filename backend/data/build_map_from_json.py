@@ -36,9 +36,33 @@ Bucket counts:
   ...
 
 Copy category_map.json into your React project (e.g. src/data/) and import it.
+
+Bigger dumps, several sources, faster rebuilds
+----------------------------------------------
+> python build_map_from_json.py FoundationFoods.json SRLegacyFoods.json --stream --incremental
+
+• --stream       walk the foods array one item at a time instead of loading
+                 the whole file, so memory stays flat even for Branded Foods.
+• several files  are merged in the order given; the first source to name a
+                 food decides its bucket.
+• --incremental  remember a checksum per source (category_map.manifest.json)
+                 and keep each source's result in category_map.parts/; only
+                 sources whose checksum changed are read again.
+
+Every run also writes category_map.bin next to the JSON. It holds the same
+mapping in a compact binary form that the backend can mmap and
+read at startup without parsing JSON (see BINARY FORMAT below).
+
+Nutrient vectors
+----------------
+Every run also writes food_nutrients.json next to the output: for each
+name, the food's 31 nutrients per 100 g (in the units the recipe nutrition
+uses) and the gram weight of its household portions ("cup", "medium", …).
+The backend's local nutrition engine (services/nutrition_engine.py) uses it
+to compute a recipe's nutrition from its ingredient lines.
 """
 
-import json, re, unicodedata, sys
+import argparse, hashlib, json, re, struct, unicodedata, sys
 from collections import defaultdict
 from pathlib import Path
 
@@ -48,6 +72,12 @@ from pathlib import Path
 
 JSON_FILE = Path("FoundationFoods.json")   # Source downloaded from USDA
 OUT_FILE  = Path("category_map.json")      # Tiny file we'll generate
+NUTRIENTS_FILE_NAME = "food_nutrients.json" # Written next to OUT_FILE
+
+# Name of the foods array in each kind of USDA FoodData Central download
+FOOD_ARRAY_KEYS = ("FoundationFoods", "SRLegacyFoods", "BrandedFoods", "SurveyFoods")
+
+STREAM_CHUNK_SIZE = 1 << 20                # Bytes read at a time in --stream mode
 
 # ---------------------------------------------------------------------------
 # 2. OFFICIAL USDA CATEGORY ➜ YOUR 8 UI BUCKETS
@@ -115,48 +145,342 @@ def slug(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip().lower()
 
 # ---------------------------------------------------------------------------
-# 4. LOAD THE BIG USDA JSON
+# 4. READ THE BIG USDA JSON — all at once, or one food at a time (--stream)
 # ---------------------------------------------------------------------------
 
-if not JSON_FILE.exists():
-    sys.exit(f"❌  Cannot find {JSON_FILE}.  Put it next to this script.")
+def load_foods(path: Path):
+    """The simple way: parse the whole file and return the foods array."""
+    with path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    for key in FOOD_ARRAY_KEYS:
+        if key in data:
+            return data[key]
+    sys.exit(f"❌  {path} has none of the expected keys {FOOD_ARRAY_KEYS}.")
+
+
+def stream_foods(path: Path, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Yield the foods one by one without loading the file. Only the current
+    chunk and the food being decoded are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    array_start = re.compile(r'"(%s)"\s*:\s*\[' % "|".join(FOOD_ARRAY_KEYS))
+
+    with path.open(encoding="utf-8") as f:
+        buffer = ""
+        # -- a) Skip ahead to the opening "[" of the foods array ------------
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            match = array_start.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            if not chunk:
+                sys.exit(f"❌  {path} has none of the expected keys {FOOD_ARRAY_KEYS}.")
+            buffer = buffer[-64:]  # Keep enough to catch a key split across chunks
+
+        # -- b) Decode one food at a time ----------------------------------
+        pos = 0
+        while True:
+            # Skip whitespace and the commas between foods
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The food continues in the next chunk
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    sys.exit(f"❌  {path} ended in the middle of a food.")
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
 
-with JSON_FILE.open(encoding="utf-8") as f:
-    # The top-level key is "FoundationFoods"
-    foods = json.load(f)["FoundationFoods"]
 
 # ---------------------------------------------------------------------------
 # 5. WALK THROUGH EVERY FOOD AND BUILD name ➜ bucket
 # ---------------------------------------------------------------------------
 
-mapping: dict[str, str] = {}
-bucket_counts = defaultdict(int)
+def usda_category(item: dict) -> str:
+    """The official category, wherever this kind of download keeps it."""
+    if isinstance(item.get("foodCategory"), dict):
+        return item["foodCategory"].get("description", "")
+    if isinstance(item.get("wweiaFoodCategory"), dict):
+        return item["wweiaFoodCategory"].get("wweiaFoodCategoryDescription", "")
+    return item.get("brandedFoodCategory", "")
 
-for item in foods:
-    # -- a) Food name cleaning ---------------------------------------------
-    # USDA names often look like "Hummus, commercial".
-    # We only keep the FIRST part before the comma.
-    raw_name = item["description"].split(",")[0].title().strip()
-    key      = slug(raw_name)   # "Hummus" ➜ "hummus"
 
-    # -- b) Convert USDA category to our bucket -----------------------------
-    usda_cat   = item["foodCategory"]["description"]
-    bucket     = SIMPLIFIED.get(usda_cat, FALLBACK_BUCKET)
+def build_mapping(foods, mapping: dict = None) -> dict:
+    """Add every food's name ➜ bucket to mapping (first one wins)."""
+    mapping = {} if mapping is None else mapping
+    for item in foods:
+        # -- a) Food name cleaning -----------------------------------------
+        # USDA names often look like "Hummus, commercial".
+        # We only keep the FIRST part before the comma.
+        raw_name = item["description"].split(",")[0].title().strip()
+        key      = slug(raw_name)   # "Hummus" ➜ "hummus"
+
+        # -- b) Convert USDA category to our bucket -------------------------
+        bucket = SIMPLIFIED.get(usda_category(item), FALLBACK_BUCKET)
+
+        # -- c) Store if we haven't seen this key before --------------------
+        # The first bucket wins to avoid duplicates like "tomato" in multiple forms.
+        if key and key not in mapping:
+            mapping[key] = bucket
+    return mapping
+
+
+# ---------------------------------------------------------------------------
+# 6. NUTRIENT VECTORS — name ➜ nutrients per 100 g + portion weights
+#    Each field lists the USDA nutrient numbers that can provide it, best
+#    first, with the factor that converts the USDA unit to ours.
+# ---------------------------------------------------------------------------
+
+NUTRIENT_SOURCES = [
+    ("calories",            [("208", 1), ("957", 1), ("958", 1)]),   # kcal
+    ("protein",             [("203", 1)]),                           # g
+    ("total_carbs",         [("205", 1), ("205.2", 1)]),             # g
+    ("net_carbs",           []),                                     # carbs - fiber
+    ("fiber",               [("291", 1)]),                           # g
+    ("total_fat",           [("204", 1), ("298", 1)]),               # g
+    ("saturated_fat",       [("606", 1)]),                           # g
+    ("monounsaturated_fat", [("645", 1)]),                           # g
+    ("polyunsaturated_fat", [("646", 1)]),                           # g
+    ("trans_fat",           [("605", 1)]),                           # g
+    ("cholesterol",         [("601", 1)]),                           # mg
+    ("sodium",              [("307", 1)]),                           # mg
+    ("potassium",           [("306", 1)]),                           # mg
+    ("total_sugars",        [("269", 1), ("269.3", 1)]),             # g
+    ("added_sugars",        [("539", 1)]),                           # g
+    ("vitamin_a",           [("318", 1), ("320", 3.33)]),            # IU (from µg RAE)
+    ("vitamin_c",           [("401", 1)]),                           # mg
+    ("vitamin_d",           [("324", 1), ("328", 40)]),              # IU (from µg)
+    ("vitamin_e",           [("323", 1)]),                           # mg
+    ("vitamin_k",           [("430", 1)]),                           # µg
+    ("thiamin",             [("404", 1)]),                           # mg
+    ("riboflavin",          [("405", 1)]),                           # mg
+    ("niacin",              [("406", 1)]),                           # mg
+    ("vitamin_b6",          [("415", 1)]),                           # mg
+    ("folate",              [("417", 1), ("435", 1)]),               # µg
+    ("vitamin_b12",         [("418", 1)]),                           # µg
+    ("calcium",             [("301", 1)]),                           # mg
+    ("iron",                [("303", 1)]),                           # mg
+    ("magnesium",           [("304", 1)]),                           # mg
+    ("zinc",                [("309", 1)]),                           # mg
+    ("selenium",            [("317", 1)]),                           # µg
+]
+
+
+def nutrient_vector(item: dict) -> list:
+    """The food's nutrients per 100 g, in NUTRIENT_SOURCES order."""
+    amounts = {}
+    for entry in item.get("foodNutrients", []):
+        number = str((entry.get("nutrient") or {}).get("number", ""))
+        if number and entry.get("amount") is not None and number not in amounts:
+            amounts[number] = float(entry["amount"])
+
+    vector = []
+    for field, sources in NUTRIENT_SOURCES:
+        value = next((amounts[n] * factor for n, factor in sources if n in amounts), 0.0)
+        vector.append(round(value, 4))
+    carbs, fiber = vector[2], vector[4]
+    vector[3] = round(max(carbs - fiber, 0.0), 4)
+    return vector
+
+
+def portion_weights(item: dict) -> dict:
+    """Household measure ➜ grams for one of it, e.g. {"cup": 128.0, "medium": 173.0}."""
+    portions = {}
+    for portion in item.get("foodPortions", []):
+        grams, amount = portion.get("gramWeight"), portion.get("amount") or 1
+        unit = (portion.get("measureUnit") or {}).get("name", "")
+        if not unit or unit == "undetermined":
+            # SR Legacy keeps the measure in the modifier: "cup, chopped"
+            unit = (portion.get("modifier") or "").split(",")[0]
+        unit = slug(unit).split(" ")[0]   # "medium (2-1/4\" dia)" ➜ "medium"
+        if grams and unit and unit not in portions:
+            portions[unit] = round(grams / amount, 2)
+    return portions
+
+
+def build_nutrients(foods, table: dict = None, ranks: dict = None) -> dict:
+    """
+    Add every food's nutrient vector under the same name as category_map.
+    Several foods share a name ("Tomatoes, grape, raw", "Tomatoes, canned");
+    the plainest one wins: raw over prepared, then fewest qualifiers.
+    """
+    table = {} if table is None else table
+    ranks = {} if ranks is None else ranks
+    for item in foods:
+        description = item["description"]
+        key = slug(description.split(",")[0].title().strip())
+        if not key or not item.get("foodNutrients"):
+            continue
+        score = ("raw" not in description.lower(), description.count(","))
+        if key not in table or score < ranks.get(key, score):
+            table[key] = {"per_100g": nutrient_vector(item), "portions": portion_weights(item)}
+            ranks[key] = score
+    return table
+
+
+def build_tables(foods) -> tuple:
+    """One pass over the foods for both outputs (foods may be a stream)."""
+    mapping, nutrients, ranks = {}, {}, {}
+    for item in foods:
+        build_mapping([item], mapping)
+        build_nutrients([item], nutrients, ranks)
+    return mapping, nutrients
+
+
+# ---------------------------------------------------------------------------
+# 7. INCREMENTAL REBUILDS — only re-read sources whose checksum changed
+# ---------------------------------------------------------------------------
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_tables(source: Path, stream: bool, manifest: dict, parts_dir: Path) -> tuple:
+    """
+    (name ➜ bucket, name ➜ nutrients) for one source. With a manifest
+    (--incremental), a source whose checksum hasn't changed is read back
+    from parts_dir instead.
+    """
+    if manifest is None:
+        return build_tables(stream_foods(source) if stream else load_foods(source))
+
+    checksum = file_checksum(source)
+    entry = manifest.get(str(source))
+    # Named after the full path: a/Foods.json and b/Foods.json mustn't share parts
+    part_name = f"{source.stem}-{hashlib.sha256(str(source.resolve()).encode('utf-8')).hexdigest()[:12]}"
+    part_file = parts_dir / f"{part_name}.json"
+    nutrients_part = parts_dir / f"{part_name}.nutrients.json"
+    if entry and entry["sha256"] == checksum and part_file.exists() and nutrients_part.exists():
+        print(f"•  {source} unchanged, reusing {part_file}")
+        with part_file.open(encoding="utf-8") as f:
+            mapping = dict(json.load(f))
+        with nutrients_part.open(encoding="utf-8") as f:
+            return mapping, json.load(f)
+
+    print(f"•  {source} changed, reading it again")
+    mapping, nutrients = build_tables(stream_foods(source) if stream else load_foods(source))
+    parts_dir.mkdir(exist_ok=True)
+    with part_file.open("w", encoding="utf-8") as f:
+        # A list of pairs keeps the first-seen order for the merge
+        json.dump(list(mapping.items()), f, ensure_ascii=False)
+    with nutrients_part.open("w", encoding="utf-8") as f:
+        json.dump(nutrients, f, ensure_ascii=False)
+    manifest[str(source)] = {"sha256": checksum, "part": str(part_file), "count": len(mapping)}
+    return mapping, nutrients
 
-    # -- c) Store if we haven't seen this key before ------------------------
-    # The first bucket wins to avoid duplicates like "tomato" in multiple forms.
-    if key not in mapping:
-        mapping[key] = bucket
-        bucket_counts[bucket] += 1
 
 # ---------------------------------------------------------------------------
-# 6. WRITE THE TINY JSON FILE
+# 8. BINARY FORMAT — category_map.bin, loaded by the backend without JSON
+#
+#   header   8s  magic b"GCMAP\x00\x02\x00"
+#            I   number of keys            I  number of buckets
+#            I   offset of bucket numbers  I  offset of keys
+#   buckets  for each bucket: H length + UTF-8 bytes
+#   bucket numbers  one byte per key, in key order
+#   keys     the keys sorted, UTF-8, joined by "\n"
+#
+#   All integers are little-endian. Loading is one decode + split of the key
+#   block and a zip with the bucket numbers; no per-key parsing.
 # ---------------------------------------------------------------------------
 
-with OUT_FILE.open("w", encoding="utf-8") as f:
-    json.dump(mapping, f, ensure_ascii=False, indent=2)
+BINARY_MAGIC = b"GCMAP\x00\x02\x00"
+BINARY_HEADER = struct.Struct("<8sIIII")
+
+
+def write_binary_map(mapping: dict, path: Path):
+    buckets = sorted(set(mapping.values()))
+    if len(buckets) > 255:
+        sys.exit("❌  The binary map stores bucket numbers in one byte (max 255 buckets).")
+    bucket_ids = {bucket: i for i, bucket in enumerate(buckets)}
+    keys = sorted(mapping)
+
+    bucket_table = b"".join(
+        struct.pack("<H", len(b)) + b for b in (bucket.encode("utf-8") for bucket in buckets)
+    )
+    ids = bytes(bucket_ids[mapping[key]] for key in keys)
+    key_block = "\n".join(keys).encode("utf-8")
+
+    ids_offset = BINARY_HEADER.size + len(bucket_table)
+    keys_offset = ids_offset + len(ids)
+    with path.open("wb") as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, len(keys), len(buckets), ids_offset, keys_offset))
+        f.write(bucket_table)
+        f.write(ids)
+        f.write(key_block)
+
+
+# ---------------------------------------------------------------------------
+# 9. RUN IT
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Build category_map.json from USDA FoodData Central JSON.")
+    parser.add_argument("sources", nargs="*", type=Path, default=[JSON_FILE],
+                        help=f"USDA JSON files, merged in order (default: {JSON_FILE})")
+    parser.add_argument("--out", type=Path, default=OUT_FILE, help=f"output JSON (default: {OUT_FILE})")
+    parser.add_argument("--stream", action="store_true", help="read foods one at a time (bounded memory)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-read sources whose checksum changed since the last run")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        if not source.exists():
+            sys.exit(f"❌  Cannot find {source}.  Put it next to this script.")
+
+    manifest_file = args.out.with_suffix(".manifest.json")
+    parts_dir = args.out.with_suffix(".parts")
+    manifest = None
+    if args.incremental:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8")) if manifest_file.exists() else {}
+
+    mapping: dict[str, str] = {}
+    nutrients: dict[str, dict] = {}
+    for source in args.sources:
+        source_map, source_nutrients = source_tables(source, args.stream, manifest, parts_dir)
+        for key, bucket in source_map.items():
+            mapping.setdefault(key, bucket)
+        for key, entry in source_nutrients.items():
+            nutrients.setdefault(key, entry)
+
+    bucket_counts = defaultdict(int)
+    for bucket in mapping.values():
+        bucket_counts[bucket] += 1
 
-print(f"✓  {len(mapping):,} grocery names saved to {OUT_FILE}")
-print("Bucket counts:")
-for bucket, cnt in sorted(bucket_counts.items(), key=lambda x: -x[1]):
-    print(f"  {bucket:<15} {cnt:,}")
+    # -- Write the tiny JSON file, its binary twin and the manifest ----------
+    with args.out.open("w", encoding="utf-8") as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2)
+    binary_file = args.out.with_suffix(".bin")
+    write_binary_map(mapping, binary_file)
+    nutrients_file = args.out.with_name(NUTRIENTS_FILE_NAME)
+    with nutrients_file.open("w", encoding="utf-8") as f:
+        json.dump({"nutrients": [field for field, _ in NUTRIENT_SOURCES], "foods": nutrients},
+                  f, ensure_ascii=False, separators=(",", ":"))
+    if manifest is not None:
+        manifest_file.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    print(f"✓  {len(mapping):,} grocery names saved to {args.out} (and {binary_file})")
+    print(f"✓  {len(nutrients):,} nutrient vectors saved to {nutrients_file}")
+    print("Bucket counts:")
+    for bucket, cnt in sorted(bucket_counts.items(), key=lambda x: -x[1]):
+        print(f"  {bucket:<15} {cnt:,}")
+
+
+if __name__ == "__main__":
+    main()
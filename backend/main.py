@@ -1,10 +1,49 @@
-from fastapi import FastAPI, HTTPException, Request
+from dotenv import load_dotenv
+
+# Before the services are imported: they read their settings at import time
+load_dotenv()
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Union, Optional
-from services.chat_generate_recipes import generate_recipe_from_ingredients
-import json
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Dict, Optional
+from functools import lru_cache
+from services import llm_client, metrics
+from services.encoded_page import EncodedPage, accepts_gzip, etag_matches
+from services.generation import (
+    BATCH_MAX_ITEMS,
+    BATCH_MAX_PARALLELISM,
+    generate_batch,
+    generation_stats,
+    get_or_generate_recipe,
+    near_duplicates,
+    stream_or_replay_recipe,
+)
+from services.generation_jobs import generation_jobs
+from services.grocery_catalog import GROCERY_CSV_EXPORT, get_grocery_catalog
+from services.grocery_classifier import get_grocery_classifier
+from services.ingredient_index import get_ingredient_index
+from services.llm_client import LLMBusyError
+from services.nutrition_engine import get_nutrition_engine
+from services.nutrition_matrix import GROUP_BY, NutritionMatrix, per_serving
+from services.pantry_index import PantryIndex
+from services.product_search import get_product_search
+from services.recipe_cache import CategoryCache
+from services.recipe_ndjson import BulkImport, export_ndjson
+from services.recipe_store import SQLiteRecipeStore
 from pathlib import Path
+import datetime
+import json
+import logging
+import os
+import time
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger("guaco.api")
 
 class FoodItem(BaseModel):
     name: str
@@ -52,56 +91,45 @@ class Recipe(BaseModel):
     category: str
     instructions: str
     nutrition: DetailedNutrition
-    servings: int = 1  # Default to 1 serving if not specified
+    servings: int = Field(1, gt=0)  # Default to 1 serving if not specified
     prepTime: str
     cookTime: str
 
+class ExportedRecipe(Recipe):
+    # A line of /api/recipes/export: rows migrated from the legacy recipes.json
+    # were saved before nutrition, servings and the times were required
+    nutrition: Optional[DetailedNutrition] = None
+    servings: Optional[int] = Field(None, gt=0)
+    prepTime: Optional[str] = None
+    cookTime: Optional[str] = None
+
 class RecipeRequest(BaseModel):
     ingredients: List[str]
+    bypass_cache: bool = False  # Skip the generation cache and ask the model again
 
-class NutritionData(BaseModel):
-    calories: Optional[int] = None
-    protein: Optional[float] = None
-    total_carbs: Optional[float] = None
-    net_carbs: Optional[float] = None
-    fiber: Optional[float] = None
-    total_fat: Optional[float] = None
-    saturated_fat: Optional[float] = None
-    monounsaturated_fat: Optional[float] = None
-    polyunsaturated_fat: Optional[float] = None
-    trans_fat: Optional[float] = None
-    cholesterol: Optional[float] = None
-    total_sugars: Optional[float] = None
-    added_sugars: Optional[float] = None
-    sodium: Optional[float] = None
-    potassium: Optional[float] = None
-    calcium: Optional[float] = None
-    iron: Optional[float] = None
-    magnesium: Optional[float] = None
-    zinc: Optional[float] = None
-    selenium: Optional[float] = None
-    vitamin_a: Optional[float] = None
-    vitamin_c: Optional[float] = None
-    vitamin_d: Optional[float] = None
-    vitamin_e: Optional[float] = None
-    vitamin_k: Optional[float] = None
-    thiamin: Optional[float] = None
-    riboflavin: Optional[float] = None
-    niacin: Optional[float] = None
-    vitamin_b6: Optional[float] = None
-    vitamin_b12: Optional[float] = None
-    folate: Optional[float] = None
-
-class RecipeResponse(BaseModel):
-    title: str
-    prep_time: str
-    cook_time: str
-    servings: int
-    ingredients: str
-    spices: str
-    instructions: str
-    nutrition: NutritionData
-    full_text: str
+class BatchRecipeRequest(BaseModel):
+    requests: List[RecipeRequest]
+    parallelism: int = BATCH_MAX_PARALLELISM  # Capped at BATCH_MAX_PARALLELISM
+    stream: bool = False  # Send each result as an NDJSON line as soon as it's ready
+
+class GroceryItems(BaseModel):
+    items: List[str]
+
+class PantryQuery(BaseModel):
+    items: List[str]  # What's in the fridge / on the grocery list
+    min_coverage: float = 0.5  # Share of a recipe's ingredients the items must cover
+    category: Optional[str] = None
+    limit: int = 20
+
+class NutritionSelection(BaseModel):
+    category: str
+    id: str
+    servings: float = Field(1, gt=0)  # Servings eaten, not the recipe's servings
+    date: Optional[datetime.date] = None  # Needed for day/week grouping; defaults to today
+
+class NutritionAggregateRequest(BaseModel):
+    items: List[NutritionSelection]
+    group_by: Optional[str] = None  # "day", "week" or "category"
 
 app = FastAPI()
 
@@ -120,86 +148,223 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],
 )
 
+# Latency per route template (/api/recipes/{category}, not every category),
+# so the label set stays small. Streaming responses are timed to their
+# first byte.
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status,
+        )
+        if status >= 500:
+            metrics.ERRORS.inc(stage="http")
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-# Path to store recipes
+
+# Path to store recipes. recipes.json is the legacy flat-file store; it is
+# imported into the SQLite store once and then left alone.
 RECIPES_FILE = Path("data/recipes.json")
+RECIPES_DB = Path("data/recipes.db")
 
-# Initialize recipes file if it doesn't exist
-if not RECIPES_FILE.exists():
-    RECIPES_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(RECIPES_FILE, "w") as f:
-        json.dump({}, f)
+# Everything heavy is built on first use, so a worker only pays for what it
+# serves. Components listed in PRELOAD (comma-separated names from
+# PRELOADERS) are built at startup instead; each load is timed in the log
+# and in /metrics.
+PRELOAD = os.getenv("PRELOAD", "store,classifier")
 
-def load_recipes():
-    try:
-        with open(RECIPES_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {}
+@lru_cache(maxsize=1)
+def get_store() -> SQLiteRecipeStore:
+    with metrics.load_timer("recipe store"):
+        store = SQLiteRecipeStore(RECIPES_DB)
+        store.migrate_from_json(RECIPES_FILE)
+    return store
 
-def save_recipes(recipes):
-    with open(RECIPES_FILE, "w") as f:
-        json.dump(recipes, f, indent=2)
+@lru_cache(maxsize=1)
+def get_recipe_cache() -> CategoryCache:
+    return CategoryCache(get_store())
 
-@app.post("/api/recipes")
-def save_recipe(recipe: Recipe):
-    recipes = load_recipes()
-    
-    # Initialize category if it doesn't exist
-    if recipe.category not in recipes:
-        recipes[recipe.category] = []
-    
-    # Add recipe with a unique ID
-    recipe_dict = recipe.dict()
-    recipe_dict["id"] = str(len(recipes[recipe.category]) + 1)  # Simple ID generation
+@lru_cache(maxsize=1)
+def get_nutrition_matrix() -> NutritionMatrix:
+    return NutritionMatrix(get_store())
+
+@lru_cache(maxsize=1)
+def get_pantry_index() -> PantryIndex:
+    index = PantryIndex(get_store())
+    with metrics.load_timer("pantry index"):
+        len(index)  # Index every saved recipe now rather than on the first query
+    return index
+
+# Saved recipes are reused for near-duplicate generation requests too
+near_duplicates.follow(get_store)
+
+def sync_near_duplicates():
+    with metrics.load_timer("near-duplicate index"):
+        len(near_duplicates)  # Sign every saved recipe now rather than on the first lookup
+
+PRELOADERS = {
+    "store": get_store,
+    "pantry": get_pantry_index,
+    "near_duplicates": sync_near_duplicates,
+    "grocery": get_grocery_catalog,
+    "classifier": get_grocery_classifier,
+    "search": get_product_search,
+    "ingredients": get_ingredient_index,
+    "nutrition": get_nutrition_engine,
+    "llm": llm_client.get_client,
+}
+
+@app.on_event("startup")
+def preload():
+    start = time.perf_counter()
+    for name in filter(None, (name.strip() for name in PRELOAD.split(","))):
+        if name not in PRELOADERS:
+            raise ValueError(f"Unknown PRELOAD component {name!r}; choose from {', '.join(PRELOADERS)}")
+        PRELOADERS[name]()
+    logger.info("Startup preload (%s) took %.0f ms", PRELOAD or "nothing", (time.perf_counter() - start) * 1000)
+
+def recipe_record(recipe: Recipe) -> Dict:
+    """What the store keeps for a saved recipe."""
+    recipe_dict = recipe.model_dump(exclude_none=True)
     
     # Calculate per-serving nutrition if more than 1 serving
-    if recipe.servings > 1:
-        nutrition = recipe.nutrition
-        recipe_dict["nutrition_per_serving"] = {
-            "calories": round(nutrition.calories / recipe.servings),
-            "protein": round(nutrition.protein / recipe.servings, 1),
-            "total_carbs": round(nutrition.total_carbs / recipe.servings, 1),
-            "net_carbs": round(nutrition.net_carbs / recipe.servings, 1),
-            "fiber": round(nutrition.fiber / recipe.servings, 1),
-            "total_fat": round(nutrition.total_fat / recipe.servings, 1),
-            "saturated_fat": round(nutrition.saturated_fat / recipe.servings, 1),
-            "monounsaturated_fat": round(nutrition.monounsaturated_fat / recipe.servings, 1),
-            "polyunsaturated_fat": round(nutrition.polyunsaturated_fat / recipe.servings, 1),
-            "trans_fat": round(nutrition.trans_fat / recipe.servings, 1),
-            "cholesterol": round(nutrition.cholesterol / recipe.servings, 1),
-            "sodium": round(nutrition.sodium / recipe.servings),
-            "potassium": round(nutrition.potassium / recipe.servings),
-            "total_sugars": round(nutrition.total_sugars / recipe.servings, 1),
-            "added_sugars": round(nutrition.added_sugars / recipe.servings, 1),
-            "vitamin_a": round(nutrition.vitamin_a / recipe.servings, 1),
-            "vitamin_c": round(nutrition.vitamin_c / recipe.servings, 1),
-            "vitamin_d": round(nutrition.vitamin_d / recipe.servings, 1),
-            "vitamin_e": round(nutrition.vitamin_e / recipe.servings, 1),
-            "vitamin_k": round(nutrition.vitamin_k / recipe.servings, 1),
-            "thiamin": round(nutrition.thiamin / recipe.servings, 1),
-            "riboflavin": round(nutrition.riboflavin / recipe.servings, 1),
-            "niacin": round(nutrition.niacin / recipe.servings, 1),
-            "vitamin_b6": round(nutrition.vitamin_b6 / recipe.servings, 1),
-            "folate": round(nutrition.folate / recipe.servings, 1),
-            "vitamin_b12": round(nutrition.vitamin_b12 / recipe.servings, 1),
-            "calcium": round(nutrition.calcium / recipe.servings),
-            "iron": round(nutrition.iron / recipe.servings, 1),
-            "magnesium": round(nutrition.magnesium / recipe.servings),
-            "zinc": round(nutrition.zinc / recipe.servings, 1),
-            "selenium": round(nutrition.selenium / recipe.servings, 1)
-        }
-    
-    recipes[recipe.category].append(recipe_dict)
-    save_recipes(recipes)
+    if recipe.nutrition is not None and (recipe.servings or 1) > 1:
+        recipe_dict["nutrition_per_serving"] = per_serving(recipe_dict["nutrition"], recipe.servings)
     return recipe_dict
 
+@app.post("/api/recipes")
+def save_recipe(recipe: Recipe):
+    # The store assigns the recipe's id within its category
+    with metrics.STORE_SECONDS.time(operation="save"):
+        return get_store().add(recipe.category, recipe_record(recipe))
+
+def parse_import_line(line: bytes) -> tuple[str, Dict]:
+    """
+    One NDJSON line -> (category, record), validated like POST /api/recipes
+    except that legacy rows may leave out nutrition, servings and the times, so
+    that anything the export wrote can be imported again.
+    """
+    try:
+        recipe = ExportedRecipe.model_validate_json(line)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(map(str, error['loc'])) or 'line'}: {error['msg']}" for error in e.errors()
+        ))
+    return recipe.category, recipe_record(recipe)
+
+# Backups and moves between environments: every stored recipe as NDJSON, one
+# per line, streamed chunk by chunk (?category=lunch for a single category).
+# Declared before /api/recipes/{category} so "export" isn't taken for one.
+@app.get("/api/recipes/export")
+def export_recipes(category: Optional[str] = None):
+    return StreamingResponse(
+        export_ndjson(get_store(), category),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="recipes.ndjson"'},
+    )
+
+# The other direction: an NDJSON body, read as it arrives. Lines are checked
+# like POST /api/recipes (legacy rows without nutrition or times are accepted)
+# and stored in batches, with new ids in their category; bad lines are
+# skipped and listed in the report.
+@app.post("/api/recipes/import")
+async def import_recipes(request: Request):
+    return await BulkImport(get_store(), parse_import_line).run(request.stream())
+
+def encoded_response(request: Request, page: EncodedPage) -> Response:
+    """
+    Serve a pre-encoded page: 304 with no body when the client's
+    If-None-Match has its ETag, gzip when the client accepts it.
+    """
+    gzipped = accepts_gzip(request.headers.get("accept-encoding", ""))
+    headers = {
+        # Each encoding is its own representation, with its own strong ETag
+        "ETag": page.gzip_etag if gzipped else page.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Total-Count": str(page.total),
+    }
+    if page.next_cursor is not None:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(page.gzipped if gzipped else page.body, media_type="application/json", headers=headers)
+
+# Without limit/cursor the whole category is returned, as before. With them,
+# the body is one page and X-Next-Cursor holds the cursor for the next one.
+# Bodies are encoded once per state of the category and carry an ETag, so
+# the Recipes page refetching an unchanged category gets a 304.
 @app.get("/api/recipes/{category}")
-def get_recipes(category: str):
-    recipes = load_recipes()
-    return recipes.get(category, [])
+def get_recipes(
+    category: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+):
+    try:
+        with metrics.STORE_SECONDS.time(operation="load"):
+            page = get_recipe_cache().encoded_page(category, limit, cursor, summary=view == "summary")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return encoded_response(request, page)
+
+# "What can I cook now": saved recipes the given items cover, best coverage
+# first, with the matched and missing ingredients of each. No model call.
+@app.post("/api/pantry/recipes")
+def match_pantry_recipes(query: PantryQuery, response: Response):
+    if not query.items:
+        raise HTTPException(status_code=400, detail="No items provided")
+    if not 0 <= query.min_coverage <= 1:
+        raise HTTPException(status_code=400, detail="min_coverage must be between 0 and 1")
+    if not 1 <= query.limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    results, total = get_pantry_index().search(query.items, query.min_coverage, query.category, query.limit)
+    response.headers["X-Total-Count"] = str(total)
+    return results
+
+# Totals, per-serving scaling and % daily value for a selection of saved
+# recipes (e.g. everything logged on the Tracker this week)
+@app.post("/api/nutrition/aggregate")
+def aggregate_nutrition(request: NutritionAggregateRequest):
+    if request.group_by is not None and request.group_by not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {list(GROUP_BY)}")
+    try:
+        return get_nutrition_matrix().aggregate([item.dict() for item in request.items], request.group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail={"message": "Unknown recipes", "recipes": e.args[0]})
+
+@app.get("/api/nutrition/categories")
+def nutrition_by_category():
+    return get_nutrition_matrix().category_summary()
+
+@app.on_event("startup")
+def start_generation_workers():
+    generation_jobs.start()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await generation_jobs.stop()
+    await llm_client.aclose()
 
 @app.get("/api/hello")
 def hello():
@@ -220,10 +385,8 @@ async def generate_recipe(request: RecipeRequest):
         
         if len(request.ingredients) < 1:
             raise HTTPException(status_code=400, detail="At least one ingredient is required")
-            
-        print(f"Received ingredients: {request.ingredients}")  # Enhanced debug log
         
-        recipe_data = generate_recipe_from_ingredients(request.ingredients)
+        recipe_data = await get_or_generate_recipe(request.ingredients, request.bypass_cache)
         
         if not recipe_data:
             raise HTTPException(status_code=500, detail="Failed to generate recipe")
@@ -234,9 +397,200 @@ async def generate_recipe(request: RecipeRequest):
         return recipe_data
         
     except HTTPException as he:
-        print(f"HTTP Exception in generate_recipe: {str(he)}")  # Debug log
+        logger.info("HTTP Exception in generate_recipe: %s", he)
         raise he
+    except LLMBusyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e),
+                            headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
-        print(f"Unexpected error in generate_recipe: {str(e)}")  # Debug log
+        logger.exception("Unexpected error in generate_recipe")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+# Streaming variant of generate_recipe: server-sent events for "start",
+# "metadata" (title/times/servings), "ingredients", "spices", "instructions",
+# "nutrition", and finally "recipe" with the same payload as the endpoint above
+@app.post("/api/generate_recipe_from_ingredients/stream")
+async def generate_recipe_stream(request: RecipeRequest):
+    if not request.ingredients:
+        raise HTTPException(status_code=400, detail="No ingredients provided")
+
+    events = stream_or_replay_recipe(request.ingredients, request.bypass_cache)
+    # Wait for the model to accept the request so "busy" is still a real 503
+    try:
+        first = await events.__anext__()
+    except LLMBusyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e),
+                            headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.exception("Unexpected error in generate_recipe_stream")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    async def event_stream():
+        yield sse_event(*first)
+        try:
+            async for event in events:
+                yield sse_event(*event)
+        except Exception as e:
+            metrics.ERRORS.inc(stage="stream")
+            logger.exception("Error while streaming recipe")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def sse_event(event: str, payload: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+# Generate several recipes at once (e.g. a week of meals). Results come back
+# in request order as {"index", "recipe"} or {"index", "error", "status_code"};
+# with stream=true each one is sent as an NDJSON line when it completes.
+@app.post("/api/generate_recipes/batch")
+async def generate_recipes_batch(batch: BatchRecipeRequest):
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="No recipe requests provided")
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} recipes per batch")
+
+    items = [(r.ingredients, r.bypass_cache) for r in batch.requests]
+    results = generate_batch(items, batch.parallelism)
+
+    if batch.stream:
+        async def ndjson():
+            async for result in results:
+                yield json.dumps(result) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    ordered = [result async for result in results]
+    ordered.sort(key=lambda result: result["index"])
+    return {"results": ordered}
+
+# Job mode: submit returns at once with the job's id, position and ETA
+# (202), or 429 with Retry-After when too many jobs are waiting. Poll the
+# job with ?wait=<seconds> to long-poll until it finishes, or subscribe to
+# its server-sent "status" / "done" events.
+@app.post("/api/generation/jobs", status_code=202)
+async def submit_generation_job(request: RecipeRequest, response: Response):
+    if not request.ingredients:
+        raise HTTPException(status_code=400, detail="No ingredients provided")
+    try:
+        job = await generation_jobs.submit(request.ingredients, request.bypass_cache)
+    except LLMBusyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e),
+                            headers={"Retry-After": str(e.retry_after)})
+    response.headers["Location"] = f"/api/generation/jobs/{job['id']}"
+    return job
+
+@app.get("/api/generation/jobs/{job_id}")
+async def get_generation_job(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    job = await generation_jobs.status(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+@app.get("/api/generation/jobs/{job_id}/events")
+async def generation_job_events(job_id: str):
+    if await generation_jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    async def event_stream():
+        async for event in generation_jobs.events(job_id):
+            yield sse_event(*event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/generation/stats")
+def get_generation_stats():
+    return generation_stats()
+
+# Ingredient autocomplete / grocery-bucket lookup over data/category_map.json
+# (queries are capped at 64 characters: fuzzy matching isn't free)
+@app.get("/api/ingredients/suggest")
+def suggest_ingredients(q: str = Query(..., max_length=64), limit: int = Query(8, ge=1, le=50)):
+    return {"query": q, "suggestions": get_ingredient_index().suggest(q, limit)}
+
+@app.get("/api/ingredients/category")
+def categorize_ingredient(name: str = Query(..., max_length=64)):
+    return get_ingredient_index().categorize(name)
+
+@app.post("/api/ingredients/categorize")
+def categorize_ingredients(grocery_list: GroceryItems):
+    results = get_ingredient_index().categorize_many(grocery_list.items)
+    groups: Dict[str, List[str]] = {}
+    for result in results:
+        groups.setdefault(result["category"], []).append(result["name"])
+    return {"items": results, "groups": groups}
+
+# -- Grocery data (formerly the Flask app in app.py) -------------------------
+
+@app.get("/api/grocery-data/csv")
+async def get_grocery_csv():
+    return FileResponse(GROCERY_CSV_EXPORT, media_type="text/csv")
+
+@app.get("/api/grocery-data/categories")
+def get_grocery_categories():
+    return get_grocery_catalog().categories()
+
+# Sub Category for every item of a grocery list, classified in one batch by
+# the model trained on the CSV's titles (see services/grocery_classifier.py)
+@app.post("/api/grocery-data/classify")
+def classify_grocery_items(grocery_list: GroceryItems):
+    results = get_grocery_classifier().classify_many(grocery_list.items)
+    groups: Dict[str, List[str]] = {}
+    for result in results:
+        groups.setdefault(result["category"], []).append(result["name"])
+    return {"items": results, "groups": groups}
+
+# Catalog rows, optionally for one Sub Category and only some columns:
+#   /api/grocery-data?category=Bakery%20%26%20Desserts&fields=Title,Price&limit=50
+# The body is one page; X-Next-Cursor holds the cursor for the next one.
+@app.get("/api/grocery-data")
+def get_grocery_data(
+    request: Request,
+    category: Optional[str] = None,
+    fields: str = "",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    try:
+        page = get_grocery_catalog().page(
+            category=category,
+            fields=[f.strip() for f in fields.split(",") if f.strip()],
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return encoded_response(request, page)
+
+# Full-text product search (BM25 over Title, Feature and Product Description):
+#   /api/grocery-data/search?q=peanut+butter&category=Snacks&max_price=20&min_rating=4
+@app.get("/api/grocery-data/search")
+def search_grocery_data(
+    response: Response,
+    q: str = "",
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q is required")
+    results, total = get_product_search().search(
+        q.strip(),
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        min_rating=min_rating,
+        limit=limit,
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return results
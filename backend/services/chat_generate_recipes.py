@@ -1,67 +1,153 @@
 # backend/services/chat_generate_recipes.py
+import json
+import logging
 import os
 import re
-from dotenv import load_dotenv
-from openai import OpenAI
-from typing import Dict, Union
+from typing import AsyncIterator, Dict, Union
+
+from services import metrics
+from services.llm_client import LLMBusyError, chat_completion, chat_stream
+from services.nutrition_engine import get_nutrition_engine, ingredient_lines
+from services.nutrition_matrix import NUTRIENTS
+from services.recipe_schema import RecipeResponse
+
+# Where recipe nutrition comes from:
+#   llm    the model writes the nutrition facts and we parse them
+#   local  the model writes only the recipe; nutrition is computed from the
+#          ingredient lines with the USDA vectors in data/food_nutrients.json
+#   auto   local when data/food_nutrients.json exists, llm otherwise
+NUTRITION_SOURCE = os.getenv("NUTRITION_SOURCE", "auto").lower()
+
+# How the model is asked for the recipe:
+#   GENERATION_MODE    text  the bullet format below, parsed with one regex pass
+#                      json  one compact JSON object, validated into RecipeResponse
+#   RECIPE_MODEL       model used in text mode
+#   RECIPE_JSON_MODEL  model used in json mode (it must support JSON mode)
+# Either one is only the head of the chain: see llm_providers for fallbacks.
+GENERATION_MODE = os.getenv("GENERATION_MODE", "text").lower()
+RECIPE_MODEL = os.getenv("RECIPE_MODEL", "gpt-4")
+RECIPE_JSON_MODEL = os.getenv("RECIPE_JSON_MODEL", "gpt-4-turbo")
+
+# Raw model output is only logged for a sample of requests (see metrics.sampled)
+logger = logging.getLogger("guaco.generation")
+
+# ---------------------------------------------------------------------------
+# Parsing the model's text response
+#
+# The response is read in two linear passes: one sweep of a single compiled
+# regex for all nutrient fields, and one walk over the lines for the
+# metadata and the sections. The results match the earlier regex-per-field
+# parser exactly (benchmarks/bench_parser.py checks this against a frozen
+# copy of it).
+# ---------------------------------------------------------------------------
+
+# (field, label patterns, unit) in the order fields appear in the output.
+# Labels are lowercase and matched case-insensitively anywhere in the text;
+# a label with an optional prefix is listed once per spelling.
+NUTRIENT_FIELDS = [
+    ("calories", [r"calories:"], "kcal"),
+    ("protein", [r"protein:"], "g"),
+    ("total_carbs", [r"total carbs?:", r"carbs?:"], "g"),
+    ("fiber", [r"fiber:"], "g"),
+    ("total_fat", [r"total fat:", r"fat:"], "g"),
+    ("saturated_fat", [r"saturated fat:"], "g"),
+    ("monounsaturated_fat", [r"monounsaturated fat:"], "g"),
+    ("polyunsaturated_fat", [r"polyunsaturated fat:"], "g"),
+    ("trans_fat", [r"trans fat:"], "g"),
+    ("cholesterol", [r"cholesterol:"], "mg"),
+    ("total_sugars", [r"total sugars:"], "g"),
+    ("added_sugars", [r"added sugars:"], "g"),
+    ("sodium", [r"sodium:"], "mg"),
+    ("potassium", [r"potassium:"], "mg"),
+    ("calcium", [r"calcium:"], "mg"),
+    ("iron", [r"iron:"], "mg"),
+    ("magnesium", [r"magnesium:"], "mg"),
+    ("zinc", [r"zinc:"], "mg"),
+    ("selenium", [r"selenium:"], "mcg"),
+    ("vitamin_a", [r"vitamin a:"], "iu"),
+    ("vitamin_c", [r"vitamin c:"], "mg"),
+    ("vitamin_d", [r"vitamin d:"], "iu"),
+    ("vitamin_e", [r"vitamin e:"], "mg"),
+    ("vitamin_k", [r"vitamin k:"], "mcg"),
+    ("thiamin", [r"thiamin:?\s*(?:\(b1\):)?"], "mg"),
+    ("riboflavin", [r"riboflavin:?\s*(?:\(b2\):)?"], "mg"),
+    ("niacin", [r"niacin:?\s*(?:\(b3\):)?"], "mg"),
+    ("vitamin_b6", [r"vitamin b6:", r"b6:"], "mg"),
+    ("vitamin_b12", [r"vitamin b12:", r"b12:"], "mcg"),
+    ("folate", [r"folate:"], "mcg"),
+]
+NUTRIENT_UNITS = {field: unit for field, _, unit in NUTRIENT_FIELDS}
+
+# Some labels end with another label ("Monounsaturated Fat:" ends with
+# "Saturated Fat:" and "Fat:"). A match for the longer label therefore also
+# counts for the shorter ones, unless they were already found earlier.
+NUTRIENT_SUFFIX_FIELDS = {
+    "saturated_fat": ("total_fat",),
+    "monounsaturated_fat": ("saturated_fat", "total_fat"),
+    "polyunsaturated_fat": ("saturated_fat", "total_fat"),
+    "trans_fat": ("total_fat",),
+}
+
+# One alternative per spelling: label\s*(value) followed by an empty named
+# group, so match.lastgroup says which field matched and the value is the
+# group just before it. Every alternative starts with a literal, which lets
+# the regex engine skip ahead to possible first letters instead of trying
+# every alternative at every position.
+_NUTRIENT_PATTERN = "|".join(
+    rf"{label}\s*([\d.]+)(?P<{field}__{n}>)"
+    for field, labels, _ in NUTRIENT_FIELDS
+    for n, label in enumerate(labels)
+)
+NUTRIENT_RE = re.compile(_NUTRIENT_PATTERN)
+NUTRIENT_RE_IGNORECASE = re.compile(_NUTRIENT_PATTERN, re.IGNORECASE)
+NUTRIENT_GROUPS = {
+    name: (name.split("__")[0], index - 1) for name, index in NUTRIENT_RE.groupindex.items()
+}
+UNIT_RE = re.compile(r"\s*(kcal|mcg|mg|iu|g)")
+UNIT_RE_IGNORECASE = re.compile(r"\s*(kcal|mcg|mg|iu|g)", re.IGNORECASE)
+
+# The only non-ASCII characters IGNORECASE treats as equal to ASCII letters.
+# Without them, matching the lowercased text case-sensitively is the same
+# as matching the original text case-insensitively, and much faster.
+CASE_FOLDING_SPECIALS = re.compile("[İıſK]")
+
+PREP_TIME_RE = re.compile(r"Prep Time: (\d+)")
+COOK_TIME_RE = re.compile(r"Cook Time: (\d+)")
+SERVINGS_RE = re.compile(r"Servings: (\d+)")
+
+NUTRITION_DELIMITER = "---Detailed Nutrition Facts---"
+SECTION_HEADERS = [
+    ("ingredients", "Ingredients:"),
+    ("spices", "Spices & Seasonings:"),
+    ("instructions", "Instructions:"),
+]
+UPPERCASE = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def parse_nutrition_values(text: str) -> Dict[str, Union[float, int]]:
     """Parse all nutrition values from the recipe text."""
-    nutrition = {}
-    
-    # Helper function to extract numeric value with unit
-    def extract_value(pattern: str) -> Union[float, int, None]:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if not match:
-            return None
-        try:
-            value = float(match.group(1))
-            return int(value) if value.is_integer() else value
-        except (ValueError, IndexError):
-            return None
-
-    # Basic nutrition
-    nutrition["calories"] = extract_value(r"Calories:\s*([\d.]+)\s*kcal")
-    nutrition["protein"] = extract_value(r"Protein:\s*([\d.]+)\s*g")
-    nutrition["total_carbs"] = extract_value(r"(?:Total )?Carbs?:\s*([\d.]+)\s*g")
-    nutrition["fiber"] = extract_value(r"Fiber:\s*([\d.]+)\s*g")
-    nutrition["total_fat"] = extract_value(r"(?:Total )?Fat:\s*([\d.]+)\s*g")
-
-    # Detailed fats
-    nutrition["saturated_fat"] = extract_value(r"Saturated Fat:\s*([\d.]+)\s*g")
-    nutrition["monounsaturated_fat"] = extract_value(r"Monounsaturated Fat:\s*([\d.]+)\s*g")
-    nutrition["polyunsaturated_fat"] = extract_value(r"Polyunsaturated Fat:\s*([\d.]+)\s*g")
-    nutrition["trans_fat"] = extract_value(r"Trans Fat:\s*([\d.]+)\s*g")
-    nutrition["cholesterol"] = extract_value(r"Cholesterol:\s*([\d.]+)\s*mg")
-
-    # Sugars
-    nutrition["total_sugars"] = extract_value(r"Total Sugars:\s*([\d.]+)\s*g")
-    nutrition["added_sugars"] = extract_value(r"Added Sugars:\s*([\d.]+)\s*g")
-
-    # Minerals
-    nutrition["sodium"] = extract_value(r"Sodium:\s*([\d.]+)\s*mg")
-    nutrition["potassium"] = extract_value(r"Potassium:\s*([\d.]+)\s*mg")
-    nutrition["calcium"] = extract_value(r"Calcium:\s*([\d.]+)\s*mg")
-    nutrition["iron"] = extract_value(r"Iron:\s*([\d.]+)\s*mg")
-    nutrition["magnesium"] = extract_value(r"Magnesium:\s*([\d.]+)\s*mg")
-    nutrition["zinc"] = extract_value(r"Zinc:\s*([\d.]+)\s*mg")
-    nutrition["selenium"] = extract_value(r"Selenium:\s*([\d.]+)\s*mcg")
-
-    # Vitamins
-    nutrition["vitamin_a"] = extract_value(r"Vitamin A:\s*([\d.]+)\s*IU")
-    nutrition["vitamin_c"] = extract_value(r"Vitamin C:\s*([\d.]+)\s*mg")
-    nutrition["vitamin_d"] = extract_value(r"Vitamin D:\s*([\d.]+)\s*IU")
-    nutrition["vitamin_e"] = extract_value(r"Vitamin E:\s*([\d.]+)\s*mg")
-    nutrition["vitamin_k"] = extract_value(r"Vitamin K:\s*([\d.]+)\s*mcg")
-    nutrition["thiamin"] = extract_value(r"Thiamin:?\s*(?:\(B1\):)?\s*([\d.]+)\s*mg")
-    nutrition["riboflavin"] = extract_value(r"Riboflavin:?\s*(?:\(B2\):)?\s*([\d.]+)\s*mg")
-    nutrition["niacin"] = extract_value(r"Niacin:?\s*(?:\(B3\):)?\s*([\d.]+)\s*mg")
-    nutrition["vitamin_b6"] = extract_value(r"(?:Vitamin )?B6:\s*([\d.]+)\s*mg")
-    nutrition["vitamin_b12"] = extract_value(r"(?:Vitamin )?B12:\s*([\d.]+)\s*mcg")
-    nutrition["folate"] = extract_value(r"Folate:\s*([\d.]+)\s*mcg")
+    found: Dict[str, Union[float, int, None]] = {}
+
+    if CASE_FOLDING_SPECIALS.search(text):
+        haystack, nutrient_re, unit_re = text, NUTRIENT_RE_IGNORECASE, UNIT_RE_IGNORECASE
+    else:
+        haystack, nutrient_re, unit_re = text.lower(), NUTRIENT_RE, UNIT_RE
+
+    for match in nutrient_re.finditer(haystack):
+        field, value_group = NUTRIENT_GROUPS[match.lastgroup]
+        unit_match = unit_re.match(haystack, match.end())
+        unit = unit_match.group(1).lower() if unit_match else ""
+        for name in (field, *NUTRIENT_SUFFIX_FIELDS.get(field, ())):
+            # The first occurrence with the right unit wins
+            if name in found or unit != NUTRIENT_UNITS[name]:
+                continue
+            try:
+                value = float(match.group(value_group))
+                found[name] = int(value) if value.is_integer() else value
+            except ValueError:
+                found[name] = None
+
+    nutrition = {field: found.get(field) for field, _, _ in NUTRIENT_FIELDS}
 
     # Calculate net carbs if possible
     if nutrition["total_carbs"] is not None and nutrition["fiber"] is not None:
@@ -72,53 +158,87 @@ def parse_nutrition_values(text: str) -> Dict[str, Union[float, int]]:
     # Remove None values
     return {k: v for k, v in nutrition.items() if v is not None}
 
+
+def _scan_lines(text: str) -> tuple[Dict[str, Union[str, int]], Dict[str, str]]:
+    """
+    One walk over the lines for the metadata and the three sections.
+
+    A section starts after the first line ending with its header and runs
+    until a line that starts with an uppercase letter, or a blank line, in
+    the part of the response before the detailed nutrition block.
+    """
+    title = prep = cook = servings = None
+    main_end = text.find(NUTRITION_DELIMITER)
+    if main_end == -1:
+        main_end = len(text)
+
+    # Per section: index of the header line, then the finished text
+    header_at: Dict[str, int] = {}
+    sections: Dict[str, str] = {}
+
+    lines = text.split("\n")
+    offset = 0
+    for i, line in enumerate(lines):
+        if title is None and "Title: " in line:
+            title = line[line.index("Title: ") + 7:]
+        if prep is None and "Prep Time: " in line:
+            match = PREP_TIME_RE.search(line)
+            prep = match.group(1) if match else None
+        if cook is None and "Cook Time: " in line:
+            match = COOK_TIME_RE.search(line)
+            cook = match.group(1) if match else None
+        if servings is None and "Servings: " in line:
+            match = SERVINGS_RE.search(line)
+            servings = int(match.group(1)) if match else None
+
+        if offset < main_end and len(sections) < len(SECTION_HEADERS):
+            # The last line of the main part may be cut by the delimiter and
+            # has no newline after it
+            last_main_line = offset + len(line) >= main_end
+            main_line = line[:main_end - offset] if last_main_line else line
+            ends_section = main_line[:1] in UPPERCASE if main_line else not last_main_line
+
+            for name, header in SECTION_HEADERS:
+                if name in sections:
+                    continue
+                start = header_at.get(name)
+                if start is None:
+                    if not last_main_line and main_line.endswith(header):
+                        header_at[name] = i
+                elif ends_section and i >= start + 2:
+                    sections[name] = "\n".join(lines[start + 1:i]).strip()
+
+        offset += len(line) + 1
+
+    metadata = {
+        "title": title if title is not None else "Generated Recipe",
+        "prep_time": prep if prep is not None else "15",
+        "cook_time": cook if cook is not None else "20",
+        "servings": servings if servings is not None else 4,
+    }
+    return metadata, {name: sections.get(name, "") for name, _ in SECTION_HEADERS}
+
+
 def parse_recipe_metadata(text: str) -> Dict[str, Union[str, int]]:
     """Parse recipe metadata like title, prep time, etc."""
-    metadata = {}
-    
-    # Extract title
-    title_match = re.search(r"Title: (.*?)(?:\n|$)", text)
-    metadata["title"] = title_match.group(1) if title_match else "Generated Recipe"
-    
-    # Extract times
-    prep_match = re.search(r"Prep Time: (\d+)", text)
-    cook_match = re.search(r"Cook Time: (\d+)", text)
-    metadata["prep_time"] = prep_match.group(1) if prep_match else "15"
-    metadata["cook_time"] = cook_match.group(1) if cook_match else "20"
-    
-    # Extract servings
-    servings_match = re.search(r"Servings: (\d+)", text)
-    metadata["servings"] = int(servings_match.group(1)) if servings_match else 4
-    
-    return metadata
+    return _scan_lines(text)[0]
+
 
 def parse_recipe_sections(text: str) -> Dict[str, str]:
     """Parse recipe sections (ingredients, spices, instructions)."""
-    sections = {}
-    
-    # Split into main content and detailed nutrition
-    main_content = text.split('---Detailed Nutrition Facts---')[0]
-    
-    # Extract ingredients section
-    ingredients_match = re.search(r"Ingredients:\n(.*?)(?=\n\n|\n[A-Z])", main_content, re.DOTALL)
-    sections["ingredients"] = ingredients_match.group(1).strip() if ingredients_match else ""
-    
-    # Extract spices section
-    spices_match = re.search(r"Spices & Seasonings:\n(.*?)(?=\n\n|\n[A-Z])", main_content, re.DOTALL)
-    sections["spices"] = spices_match.group(1).strip() if spices_match else ""
-    
-    # Extract instructions section
-    instructions_match = re.search(r"Instructions:\n(.*?)(?=\n\n|\n[A-Z])", main_content, re.DOTALL)
-    sections["instructions"] = instructions_match.group(1).strip() if instructions_match else ""
-    
-    return sections
+    return _scan_lines(text)[1]
 
-def generate_recipe_from_ingredients(ingredients: list[str]) -> Dict:
-    """Generate a recipe and return structured data."""
-    ingredients_list = ", ".join(ingredients)
-    print("Ingredients received:", ingredients_list)
 
-    prompt = f"""
+def parse_recipe_text(text: str) -> tuple[Dict, Dict, Dict]:
+    """Return (metadata, sections, nutrition) for a full model response."""
+    metadata, sections = _scan_lines(text)
+    return metadata, sections, parse_nutrition_values(text)
+
+SYSTEM_PROMPT = "You are a professional chef and certified nutritionist with expertise in detailed nutritional analysis."
+
+# The prompt in pieces, so the nutrition blocks can be left out when the
+# nutrition is computed locally (see services/nutrition_engine.py)
+RECIPE_FORMAT = """
 You are Guaco's expert recipe engine and nutritionist. Generate a recipe following this EXACT format:
 
 Title: [Recipe Name]
@@ -142,7 +262,9 @@ Instructions:
 2. [Step 2]
 [etc...]
 
-Basic Nutrition (per serving):
+"""
+
+NUTRITION_FORMAT = """Basic Nutrition (per serving):
 • Calories: [kcal]
 • Protein: [g]
 • Total Carbs: [g]
@@ -184,7 +306,14 @@ Vitamins:
 • Vitamin B12: [mcg]
 • Folate: [mcg]
 
-Rules:
+"""
+
+# Ends the instructions section when there is no nutrition block after it
+TIPS_FORMAT = """Tips: [one short serving tip]
+
+"""
+
+RULES_WITH_NUTRITION = """Rules:
 1. Use ONLY the ingredients provided, plus basic pantry items (Seasonings, oils, vinegars, etc.)
 2. Include realistic quantities for all ingredients.
 3. Separate main ingredients from seasonings and spices.
@@ -193,36 +322,263 @@ Rules:
 6. Round appropriately: calories to nearest 10, grams to nearest 0.1, mg to nearest 10, mcg to nearest 10.
 7. Include serving size and number of servings.
 
-Now generate a recipe using exactly these ingredients: {ingredients_list}
 """
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a professional chef and certified nutritionist with expertise in detailed nutritional analysis."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
+
+RULES = """Rules:
+1. Use ONLY the ingredients provided, plus basic pantry items (Seasonings, oils, vinegars, etc.)
+2. Include realistic quantities for all ingredients, in cups, tbsp, tsp, grams or ounces.
+3. Separate main ingredients from seasonings and spices.
+4. Include serving size and number of servings.
+
+"""
+
+def build_recipe_messages(ingredients: list[str], local_nutrition: bool = False) -> list[Dict]:
+    """
+    Chat messages asking the model for a recipe in our text format. With
+    local_nutrition the model is not asked for nutrition facts at all.
+    """
+    ingredients_list = ", ".join(ingredients)
+
+    if local_nutrition:
+        prompt = RECIPE_FORMAT + TIPS_FORMAT + RULES
+    else:
+        prompt = RECIPE_FORMAT + NUTRITION_FORMAT + RULES_WITH_NUTRITION
+    prompt += f"Now generate a recipe using exactly these ingredients: {ingredients_list}\n"
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def use_local_nutrition() -> bool:
+    if NUTRITION_SOURCE == "llm":
+        return False
+    if get_nutrition_engine() is not None:
+        return True
+    if NUTRITION_SOURCE == "local":
+        logger.warning("NUTRITION_SOURCE=local but data/food_nutrients.json is missing; asking the model instead")
+    return False
+
+def local_nutrition_source(nutrition: Dict) -> str:
+    # Too few lines matched a food: the values are all None, not zeros
+    return "usda" if nutrition["calories"] is not None else "unknown"
+
+def build_recipe_data(recipe_text: str, local_nutrition: bool = False) -> Dict:
+    """Parse a full model response into the structured recipe payload."""
+    if not local_nutrition:
+        # Parse all recipe components
+        metadata, sections, nutrition = parse_recipe_text(recipe_text)
+
+        # Combine all data
+        return {
+            **metadata,
+            **sections,
+            "nutrition": nutrition,
+            "nutrition_source": "model",
+            "full_text": recipe_text  # Include full text for frontend formatting
+        }
+
+    metadata, sections = _scan_lines(recipe_text)
+    nutrition, coverage = get_nutrition_engine().compute(
+        ingredient_lines(sections["ingredients"], sections["spices"]), metadata["servings"]
+    )
+    return {
+        **metadata,
+        **sections,
+        "nutrition": nutrition,
+        "nutrition_source": local_nutrition_source(nutrition),
+        "nutrition_coverage": coverage,  # Which ingredient lines were counted
+        "full_text": recipe_text
+    }
+
+# ---------------------------------------------------------------------------
+# Structured (JSON) mode
+# ---------------------------------------------------------------------------
+
+STRUCTURED_PROMPT = """Create a recipe using exactly these ingredients: {ingredients}.
+Use only them plus basic pantry items (seasonings, oils, vinegars), with realistic quantities; keep seasonings separate.
+Reply with one JSON object and nothing else:
+{{"title":str,"prep_time":int minutes,"cook_time":int minutes,"servings":int,"ingredients":[str],"spices":[str],"instructions":[str]{nutrition}}}"""
+
+# Nutrition keys with their units, e.g. "protein g"
+STRUCTURED_NUTRITION = ',"nutrition":{per serving, USDA values: %s}' % ", ".join(
+    f"{name} {'kcal' if name == 'calories' else NUTRIENT_UNITS[name].replace('iu', 'IU')}"
+    for name, _, _ in NUTRIENTS if name != "net_carbs"
+)
+
+def build_structured_messages(ingredients: list[str], local_nutrition: bool = False) -> list[Dict]:
+    """Chat messages asking for the recipe as compact JSON (RecipeResponse fields)."""
+    nutrition = "" if local_nutrition else STRUCTURED_NUTRITION
+    prompt = STRUCTURED_PROMPT.format(ingredients=", ".join(ingredients), nutrition=nutrition)
+    return [{"role": "user", "content": prompt}]
+
+def build_structured_recipe_data(content: str, local_nutrition: bool = False) -> Dict:
+    """Validate a JSON-mode response into RecipeResponse and return the recipe payload."""
+    data = json.loads(content.strip().removeprefix("```json").removeprefix("```").removesuffix("```"))
+    if local_nutrition:
+        data["nutrition"] = {}
+    recipe = RecipeResponse.model_validate(data)
+
+    recipe_data = recipe.model_dump(exclude={"nutrition", "full_text"})
+    recipe_data["nutrition"] = recipe.nutrition.model_dump(exclude_none=True)
+    recipe_data["nutrition_source"] = "model"
+    if local_nutrition:
+        nutrition, coverage = get_nutrition_engine().compute(
+            ingredient_lines(recipe.ingredients, recipe.spices), recipe.servings
+        )
+        recipe_data.update(
+            nutrition=nutrition, nutrition_source=local_nutrition_source(nutrition), nutrition_coverage=coverage
         )
+    recipe_data["full_text"] = recipe.render_text()
+    return recipe_data
+
+def completion_args(ingredients: list[str], local_nutrition: bool) -> Dict:
+    """Model, messages and options for one recipe request in GENERATION_MODE."""
+    if GENERATION_MODE == "json":
+        return {
+            "model": RECIPE_JSON_MODEL,
+            "messages": build_structured_messages(ingredients, local_nutrition),
+            "temperature": 0.7,
+            "response_format": {"type": "json_object"},
+        }
+    return {
+        "model": RECIPE_MODEL,
+        "messages": build_recipe_messages(ingredients, local_nutrition),
+        "temperature": 0.7,
+    }
+
+async def generate_recipe_from_ingredients(ingredients: list[str]) -> Dict:
+    """Generate a recipe and return structured data."""
+    local_nutrition = use_local_nutrition()
+    try:
+        response = await chat_completion(**completion_args(ingredients, local_nutrition))
+    except LLMBusyError:
+        raise
     except Exception as e:
-        print(f"Error generating recipe:", e)
+        logger.error("Error generating recipe: %s", e)
         return {'error': str(e)}
     
     recipe_text = response.choices[0].message.content
-    print("RAW AI RESPONSE CONTENT:\n", recipe_text)
-    
-    # Parse all recipe components
-    metadata = parse_recipe_metadata(recipe_text)
-    sections = parse_recipe_sections(recipe_text)
-    nutrition = parse_nutrition_values(recipe_text)
+    if metrics.sampled():
+        logger.debug("Raw model response for %s:\n%s", ingredients, recipe_text)
     
-    # Combine all data
-    recipe_data = {
-        **metadata,
-        **sections,
-        "nutrition": nutrition,
-        "full_text": recipe_text  # Include full text for frontend formatting
-    }
-    print(recipe_data)
+    if GENERATION_MODE == "json":
+        try:
+            with metrics.PARSE_SECONDS.time(mode="json"):
+                recipe_data = build_structured_recipe_data(recipe_text, local_nutrition)
+        except ValueError as e:  # Bad JSON or a ValidationError
+            metrics.ERRORS.inc(stage="parse")
+            logger.warning("Invalid structured recipe: %s", e)
+            return {'error': f"The model returned an invalid recipe: {e}"}
+    else:
+        with metrics.PARSE_SECONDS.time(mode="text"):
+            recipe_data = build_recipe_data(recipe_text, local_nutrition)
     return recipe_data
 
+METADATA_FIELDS = ("title", "prep_time", "cook_time", "servings")
+
+def recipe_events(recipe_data: Dict) -> list[tuple[str, Dict]]:
+    """Every stream event for a finished recipe, as a live text-mode stream sends them."""
+    events = []
+    for name, _ in STREAM_SECTIONS:
+        if name == "metadata":
+            events.append((name, {k: recipe_data.get(k) for k in METADATA_FIELDS}))
+        else:
+            events.append((name, {name: recipe_data.get(name, "")}))
+    events.append(("nutrition", recipe_data.get("nutrition", {})))
+    events.append(("recipe", recipe_data))
+    return events
+
+# Section headers in the order the prompt asks for them. When a header line
+# arrives, every section before it is complete and can be sent.
+STREAM_SECTIONS = [
+    ("metadata", "Ingredients:"),
+    ("ingredients", "Spices & Seasonings:"),
+    ("spices", "Instructions:"),
+    ("instructions", "Basic Nutrition"),
+]
+
+class RecipeStreamParser:
+    """
+    Incremental parser for a streamed response. feed() takes text deltas and
+    returns (event, payload) pairs for every section completed so far;
+    finish() returns the rest, the nutrition block and the final recipe.
+    Payloads come from the same parse_* functions as the non-streaming path.
+    """
+
+    def __init__(self, local_nutrition: bool = False):
+        self.local_nutrition = local_nutrition
+        self.text = ""
+        self._line_start = 0
+        self._sent = 0  # Number of STREAM_SECTIONS already sent
+
+    def feed(self, delta: str) -> list[tuple[str, Dict]]:
+        self.text += delta
+        events = []
+        newline = self.text.find("\n", self._line_start)
+        while newline != -1:
+            line = self.text[self._line_start:newline].strip()
+            self._line_start = newline + 1
+            for index in range(self._sent + 1, len(STREAM_SECTIONS)):
+                if line.startswith(STREAM_SECTIONS[index][1]):
+                    events += self._send_up_to(index)
+                    break
+            newline = self.text.find("\n", self._line_start)
+        return events
+
+    def finish(self) -> list[tuple[str, Dict]]:
+        events = self._send_up_to(len(STREAM_SECTIONS))
+        with metrics.PARSE_SECONDS.time(mode="text"):
+            recipe_data = build_recipe_data(self.text, self.local_nutrition)
+        events.append(("nutrition", recipe_data["nutrition"]))
+        events.append(("recipe", recipe_data))
+        return events
+
+    def _send_up_to(self, index: int) -> list[tuple[str, Dict]]:
+        events = []
+        sections = None
+        for name, _ in STREAM_SECTIONS[self._sent:index]:
+            if name == "metadata":
+                events.append((name, parse_recipe_metadata(self.text)))
+            else:
+                sections = sections or parse_recipe_sections(self.text)
+                events.append((name, {name: sections[name]}))
+        self._sent = max(self._sent, index)
+        return events
+
+class StructuredStreamParser:
+    """
+    JSON-mode counterpart of RecipeStreamParser. A partial JSON object isn't
+    worth parsing, so every event is sent by finish().
+    """
+
+    def __init__(self, local_nutrition: bool = False):
+        self.local_nutrition = local_nutrition
+        self.text = ""
+
+    def feed(self, delta: str) -> list[tuple[str, Dict]]:
+        self.text += delta
+        return []
+
+    def finish(self) -> list[tuple[str, Dict]]:
+        with metrics.PARSE_SECONDS.time(mode="json"):
+            recipe_data = build_structured_recipe_data(self.text, self.local_nutrition)
+        return recipe_events(recipe_data)
+
+async def stream_recipe_from_ingredients(ingredients: list[str]) -> AsyncIterator[tuple[str, Dict]]:
+    """
+    Streaming version of generate_recipe_from_ingredients. Yields ("start", {})
+    once the model has accepted the request, then section events as they
+    complete, and finally ("recipe", <same payload as the non-streaming call>).
+    """
+    local_nutrition = use_local_nutrition()
+    parser_class = StructuredStreamParser if GENERATION_MODE == "json" else RecipeStreamParser
+    async with chat_stream(**completion_args(ingredients, local_nutrition)) as deltas:
+        yield "start", {}
+        parser = parser_class(local_nutrition)
+        async for delta in deltas:
+            for event in parser.feed(delta):
+                yield event
+        if metrics.sampled():
+            logger.debug("Raw model stream for %s:\n%s", ingredients, parser.text)
+        for event in parser.finish():
+            yield event
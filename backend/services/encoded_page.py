@@ -0,0 +1,101 @@
+# backend/services/encoded_page.py
+"""
+Pre-encoded JSON responses for the read endpoints.
+
+A page is encoded once (JSON bytes plus their gzip form) and served from
+memory until the data under it changes, so a repeated read costs a dict
+lookup instead of validation and encoding. Every page has a strong ETag,
+which lets clients revalidate with If-None-Match and get a 304 back with no
+body. The gzip body is a different representation, so it has its own ETag
+(the same one with a "-gz" suffix).
+
+orjson is used when it's installed (several times faster than the stdlib
+encoder on recipe lists). The json.dumps fallback produces equivalent JSON
+but not the same bytes (float formatting, escaping), so ETags change when
+orjson is installed or removed; clients then simply refetch once.
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class EncodedPage:
+    body: bytes
+    gzipped: bytes
+    etag: str
+    next_cursor: Optional[str]
+    total: int
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gz"'
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: listed with a q-value
+    above 0, or not listed while "*" is. "gzip;q=0" refuses it.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    if "gzip" in weights:
+        return weights["gzip"] > 0
+    return weights.get("*", 0.0) > 0
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header lists etag (or is "*"). The comparison
+    is the weak one RFC 9110 prescribes for If-None-Match: a W/ prefix on
+    either side is ignored.
+    """
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def encode_page(data: Any, next_cursor: Optional[str], total: int, etag: Optional[str] = None) -> EncodedPage:
+    """Encode a page; without an explicit etag, one is derived from the content."""
+    body = dumps(data)
+    if etag is None:
+        digest = hashlib.sha256(body)
+        digest.update((next_cursor or "").encode("utf-8"))
+        etag = digest.hexdigest()[:20]
+    return EncodedPage(
+        body=body,
+        gzipped=gzip.compress(body, compresslevel=6, mtime=0),
+        etag=f'"{etag}"',
+        next_cursor=next_cursor,
+        total=total,
+    )
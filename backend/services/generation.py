@@ -0,0 +1,207 @@
+# backend/services/generation.py
+"""
+Everything that sits in front of the LLM call when a recipe is requested:
+the content-addressed result cache, near-duplicate reuse and request
+coalescing.
+
+A request is answered without the model when the cache has its exact
+ingredient list, or when near_duplicates finds an earlier generated or
+saved recipe made from a similar enough subset of the requested
+ingredients. A reused recipe carries "reused": {"source", "similarity",
+"ingredients"} so clients can tell. A saved recipe is only reused when its
+text still has the ingredients and instructions sections to rebuild the
+payload from; its title, times and servings are the saved ones and its
+nutrition is per serving, like a generated recipe's.
+"""
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List, Optional
+
+from services.chat_generate_recipes import (
+    build_recipe_data,
+    generate_recipe_from_ingredients,
+    recipe_events,
+    stream_recipe_from_ingredients,
+)
+from services import metrics
+from services.generation_cache import cache_from_env
+from services.llm_client import LLMBusyError, provider_stats
+from services.near_duplicates import NearDuplicate, index_from_env
+from services.normalize import ingredient_key
+from services.nutrition_matrix import per_serving
+from services.singleflight import SingleFlight
+
+generation_cache = cache_from_env()
+in_flight_generations = SingleFlight()
+near_duplicates = index_from_env()
+
+# Batch generation limits (environment variables)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "14"))
+BATCH_MAX_PARALLELISM = int(os.getenv("BATCH_MAX_PARALLELISM", "4"))
+
+CACHE_COUNTERS = ("memory_hits", "disk_hits", "misses", "puts", "evictions")
+SINGLEFLIGHT_COUNTERS = ("calls", "coalesced", "failures")
+NEAR_DUPLICATE_COUNTERS = ("generated_hits", "saved_hits", "misses")
+
+metrics.register_collector(
+    "guaco_generation_cache_total", "Generation cache lookups and writes", "counter",
+    lambda: [("guaco_generation_cache_total", {"event": name}, value)
+             for name, value in generation_cache.stats().items() if name in CACHE_COUNTERS],
+)
+metrics.register_collector(
+    "guaco_generation_singleflight_total", "Generations started vs coalesced onto one in flight", "counter",
+    lambda: [("guaco_generation_singleflight_total", {"event": name}, value)
+             for name, value in in_flight_generations.stats().items() if name in SINGLEFLIGHT_COUNTERS],
+)
+metrics.register_collector(
+    "guaco_near_duplicate_lookups_total", "Cache misses answered by a near-duplicate recipe, or not", "counter",
+    lambda: [("guaco_near_duplicate_lookups_total", {"outcome": name}, value)
+             for name, value in near_duplicates.stats().items() if name in NEAR_DUPLICATE_COUNTERS],
+)
+metrics.register_collector(
+    "guaco_generation_in_flight", "Model calls in flight in this worker", "gauge",
+    lambda: [("guaco_generation_in_flight", {}, in_flight_generations.stats()["in_flight"])],
+)
+
+
+async def get_or_generate_recipe(ingredients: List[str], bypass_cache: bool = False) -> Dict:
+    """
+    Return a cached recipe for this ingredient set, or generate one.
+    bypass_cache skips the lookup but still refreshes the cache entry.
+    Concurrent requests for the same ingredient set share one model call.
+    """
+    key = ingredient_key(ingredients)
+    if not bypass_cache:
+        cached = await reusable_recipe(ingredients)
+        if cached is not None:
+            return cached
+
+    return await in_flight_generations.do(key, lambda: _generate_and_cache(key, ingredients))
+
+
+async def reusable_recipe(ingredients: List[str]) -> Optional[Dict]:
+    """The cached recipe for these ingredients, or one for a near-duplicate list."""
+    # The disk tier is SQLite: keep its reads off the event loop
+    cached = await asyncio.to_thread(generation_cache.get, ingredient_key(ingredients))
+    if cached is not None:
+        return cached
+    # May catch up with the store (SQLite reads, MinHash of new saved recipes)
+    match = await asyncio.to_thread(near_duplicates.find, ingredients)
+    return reused_recipe(match) if match is not None else None
+
+
+def reused_recipe(match: NearDuplicate) -> Optional[Dict]:
+    """The payload for a near-duplicate match, or None when it can't be rebuilt."""
+    reused = {
+        "source": match.source,
+        "similarity": round(match.similarity, 3),
+        "ingredients": list(match.ingredients),
+    }
+    if match.source == "generated":
+        return {**match.recipe, "reused": reused}
+    saved = match.recipe
+    # Saved recipes keep the model's full text as their instructions
+    recipe_data = build_recipe_data(saved.get("instructions") or "")
+    if not recipe_data["ingredients"] or not recipe_data["instructions"]:
+        # e.g. only numbered steps were kept: nothing to show, generate instead
+        return None
+    servings = saved.get("servings") or recipe_data["servings"]
+    recipe_data.update(
+        title=(saved.get("title") or "").strip() or recipe_data["title"],
+        servings=servings,
+        prep_time=str(saved.get("prepTime") or recipe_data["prep_time"]),
+        cook_time=str(saved.get("cookTime") or recipe_data["cook_time"]),
+    )
+    if saved.get("nutrition"):
+        # Saved nutrition is for the whole recipe; generated recipes report per serving
+        recipe_data["nutrition"] = per_serving(saved["nutrition"], servings)
+        recipe_data["nutrition_source"] = "saved"
+    reused.update(category=saved.get("category"), id=saved.get("id"))
+    return {**recipe_data, "reused": reused}
+
+
+async def _remember(key: str, ingredients: List[str], recipe_data: Dict):
+    # A SQLite write and a MinHash signature: both in a worker thread
+    def remember():
+        generation_cache.put(key, recipe_data)
+        near_duplicates.add_generated(ingredients, recipe_data)
+
+    await asyncio.to_thread(remember)
+
+
+async def _generate_and_cache(key: str, ingredients: List[str]) -> Dict:
+    recipe_data = await generate_recipe_from_ingredients(ingredients)
+    # Only keep real recipes; errors should be retried next time
+    if recipe_data and "error" not in recipe_data:
+        await _remember(key, ingredients, recipe_data)
+    return recipe_data
+
+
+async def stream_or_replay_recipe(
+    ingredients: List[str], bypass_cache: bool = False
+) -> AsyncIterator[tuple[str, Dict]]:
+    """
+    Streaming counterpart of get_or_generate_recipe. A cache hit is replayed
+    as the same sequence of events a live generation would produce.
+    """
+    key = ingredient_key(ingredients)
+    if not bypass_cache:
+        cached = await reusable_recipe(ingredients)
+        if cached is not None:
+            for event in replay_events(cached):
+                yield event
+            return
+
+    async for event, payload in stream_recipe_from_ingredients(ingredients):
+        if event == "recipe":
+            await _remember(key, ingredients, payload)
+        yield event, payload
+
+
+def replay_events(recipe_data: Dict) -> List[tuple[str, Dict]]:
+    return [("start", {"cached": True})] + recipe_events(recipe_data)
+
+
+async def generate_batch(
+    items: List[tuple[List[str], bool]], parallelism: int = BATCH_MAX_PARALLELISM
+) -> AsyncIterator[Dict]:
+    """
+    Generate several recipes concurrently, at most `parallelism` at a time.
+    items are (ingredients, bypass_cache) pairs. Yields one result per item
+    as soon as it is ready: {"index", "recipe"} or {"index", "error",
+    "status_code"}. One failing item doesn't affect the others.
+    """
+    limiter = asyncio.Semaphore(max(1, min(parallelism, BATCH_MAX_PARALLELISM)))
+
+    async def run(index: int, ingredients: List[str], bypass_cache: bool) -> Dict:
+        if not ingredients:
+            return {"index": index, "error": "No ingredients provided", "status_code": 400}
+        async with limiter:
+            try:
+                recipe_data = await get_or_generate_recipe(ingredients, bypass_cache)
+            except LLMBusyError as e:
+                return {"index": index, "error": str(e), "status_code": e.status_code}
+            except Exception as e:
+                return {"index": index, "error": str(e), "status_code": 500}
+        if not recipe_data or "error" in recipe_data:
+            error = recipe_data.get("error") if recipe_data else "Failed to generate recipe"
+            return {"index": index, "error": error, "status_code": 500}
+        return {"index": index, "recipe": recipe_data}
+
+    tasks = [asyncio.ensure_future(run(i, *item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The client went away: stop whatever hasn't finished
+        for task in tasks:
+            task.cancel()
+
+
+def generation_stats() -> Dict:
+    return {
+        "cache": generation_cache.stats(),
+        "singleflight": in_flight_generations.stats(),
+        "near_duplicates": near_duplicates.stats(),
+        "providers": provider_stats(),
+    }
@@ -0,0 +1,159 @@
+# backend/services/generation_cache.py
+"""
+Two-tier cache for generated recipes, keyed by ingredient_key().
+
+• Memory tier: a small LRU per worker, answers repeated lists in microseconds.
+• Disk tier: a SQLite table shared by all workers and kept across restarts.
+
+Both tiers expire entries after a TTL and evict the least recently used
+entries once they are full. The database file is opened (and created) on
+the first lookup or write, not when the cache is built at import time.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generation_cache (
+    key       TEXT PRIMARY KEY,
+    value     TEXT NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generation_cache_by_last_used ON generation_cache (last_used);
+"""
+
+
+class GenerationCache:
+    def __init__(
+        self,
+        disk_path: Optional[Path],
+        memory_size: int = 256,
+        disk_size: int = 10_000,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # First use in this thread; the schema is IF NOT EXISTS, so repeating it is cheap
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.disk_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # -- lookups ----------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        if self.disk_path:
+            row = self._conn().execute(
+                "SELECT value, created FROM generation_cache WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row:
+                value = json.loads(row[0])
+                self._conn().execute(
+                    "UPDATE generation_cache SET last_used = ? WHERE key = ?", (now, key)
+                )
+                self._remember(key, row[1], value)
+                self._count("disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    # -- writes -----------------------------------------------------------
+
+    def put(self, key: str, value: Dict):
+        now = time.time()
+        self._remember(key, now, value)
+        self._count("puts")
+
+        if self.disk_path:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO generation_cache (key, value, created, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict_disk(conn, now)
+
+    def _remember(self, key: str, created: float, value: Dict):
+        with self._lock:
+            self._memory[key] = (created, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _evict_disk(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute(
+            "DELETE FROM generation_cache WHERE created <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()[0] - self.disk_size
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM generation_cache WHERE key IN "
+                "(SELECT key FROM generation_cache ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+        self._count("evictions", expired + max(overflow, 0))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_path:
+            self._conn().execute("DELETE FROM generation_cache")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def cache_from_env() -> GenerationCache:
+    """Build the cache from GENERATION_CACHE_* environment variables."""
+    disk_path = os.getenv("GENERATION_CACHE_PATH", "data/generation_cache.db")
+    return GenerationCache(
+        disk_path=Path(disk_path) if disk_path else None,
+        memory_size=int(os.getenv("GENERATION_CACHE_MEMORY_SIZE", "256")),
+        disk_size=int(os.getenv("GENERATION_CACHE_DISK_SIZE", "10000")),
+        ttl_seconds=float(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    )
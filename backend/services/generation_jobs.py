@@ -0,0 +1,364 @@
+# backend/services/generation_jobs.py
+"""
+Job mode for recipe generation.
+
+Submitting a job returns its id at once; a fixed pool of workers takes jobs
+off a FIFO queue and runs them through get_or_generate_recipe (so the
+result cache, coalescing and the provider chain all still apply). Clients
+long-poll the job or subscribe to its events. While a job waits they are
+told its position in the queue and an ETA: position x recent average job
+time / workers.
+
+Admission control: a job that would make the queue longer than
+JOB_MAX_QUEUE is refused with LLMBusyError (429) and a Retry-After of
+about when the queue will have room, instead of piling up. A cache hit (or
+reusable near-duplicate) never queues; its job is done when it's created.
+
+Backends:
+  memory  jobs and queue live in this process (the default)
+  redis   jobs and queue live in a Redis server, or a protocol-compatible
+          one such as Valkey or KeyDB, that you run yourself (locally for
+          development), so several uvicorn workers share one queue. This
+          is only a client: no server is bundled. Needs the optional
+          `redis` package (pip install redis, or -r requirements-dev.txt);
+          tests/test_redis_job_backend.py runs it against fakeredis.
+
+Settings (environment variables):
+  JOB_BACKEND        memory | redis                        (default memory)
+  JOB_REDIS_URL      redis backend address   (default redis://localhost:6379/0)
+  JOB_WORKERS        jobs run at the same time per process  (default 4)
+  JOB_MAX_QUEUE      jobs allowed to wait                   (default 100)
+  JOB_TTL_SECONDS    how long finished jobs are kept        (default 3600)
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+
+from services import metrics
+from services.generation import get_or_generate_recipe, reusable_recipe
+from services.llm_client import LLMBusyError
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Only needed for JOB_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger("guaco.jobs")
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory").lower()
+JOB_REDIS_URL = os.getenv("JOB_REDIS_URL", "redis://localhost:6379/0")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "100"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+
+# A busy upstream doesn't fail a job; it is retried this many times first
+BUSY_RETRIES = 5
+# Until a job has finished, assume this many seconds per job
+DEFAULT_JOB_SECONDS = 10.0
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+JOBS = metrics.Counter("guaco_generation_jobs_total", "Generation jobs by outcome", ("outcome",))
+JOB_SECONDS = metrics.Histogram("guaco_generation_job_seconds", "Time from submit to finish", ("stage",))
+
+
+def new_job(ingredients: List[str], bypass_cache: bool) -> Dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "ingredients": ingredients,
+        "bypass_cache": bypass_cache,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "recipe": None,
+        "error": None,
+        "status_code": None,
+    }
+
+
+class MemoryJobBackend:
+    """Jobs in a dict, the queue in a deque; one asyncio.Event per job for waiters."""
+
+    def __init__(self, ttl_seconds: float = JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Dict] = {}
+        self._queue: deque = deque()
+        self._queued = asyncio.Condition()
+        self._finished: Dict[str, asyncio.Event] = {}
+        # (finished_at, job id) in the order jobs finished, for _expire
+        self._finish_order: deque = deque()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def save(self, job: Dict):
+        self._jobs[job["id"]] = job
+        if job["status"] in FINISHED:
+            self._finished.pop(job["id"], asyncio.Event()).set()
+            self._finish_order.append((job["finished_at"] or time.time(), job["id"]))
+            self._expire()
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+
+    async def push(self, job_id: str):
+        async with self._queued:
+            self._queue.append(job_id)
+            self._queued.notify()
+
+    async def pop(self) -> str:
+        async with self._queued:
+            await self._queued.wait_for(lambda: self._queue)
+            return self._queue.popleft()
+
+    async def depth(self) -> int:
+        return len(self._queue)
+
+    async def position(self, job_id: str) -> Optional[int]:
+        try:
+            return self._queue.index(job_id) + 1
+        except ValueError:
+            return None
+
+    async def wait(self, job_id: str, timeout: float):
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _expire(self):
+        # Only finished jobs are in _finish_order, so a long-running job
+        # doesn't hold back the expiry of the ones that finished after it
+        cutoff = time.time() - self.ttl_seconds
+        while self._finish_order and self._finish_order[0][0] <= cutoff:
+            _, job_id = self._finish_order.popleft()
+            self._jobs.pop(job_id, None)
+
+
+class RedisJobBackend:
+    """
+    Jobs as JSON strings with a TTL, the queue as a list (LPUSH / BRPOP),
+    and a pub/sub channel per job to wake up waiters.
+    """
+
+    PREFIX = "guaco:jobs:"
+
+    def __init__(self, url: str = JOB_REDIS_URL, ttl_seconds: float = JOB_TTL_SECONDS, client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("JOB_BACKEND=redis needs the redis package (pip install redis)")
+            client = redis.from_url(url)
+        self.redis = client
+        self.ttl_seconds = ttl_seconds
+        self.queue_key = self.PREFIX + "queue"
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.PREFIX}job:{job_id}"
+
+    async def save(self, job: Dict):
+        await self.redis.set(self._key(job["id"]), json.dumps(job), ex=int(self.ttl_seconds))
+        if job["status"] in FINISHED:
+            await self.redis.publish(self._key(job["id"]), job["status"])
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        raw = await self.redis.get(self._key(job_id))
+        return json.loads(raw) if raw is not None else None
+
+    async def push(self, job_id: str):
+        await self.redis.lpush(self.queue_key, job_id)
+
+    async def pop(self) -> str:
+        while True:
+            item = await self.redis.brpop(self.queue_key, timeout=5)
+            if item is not None:
+                return item[1].decode() if isinstance(item[1], bytes) else item[1]
+
+    async def depth(self) -> int:
+        return await self.redis.llen(self.queue_key)
+
+    async def position(self, job_id: str) -> Optional[int]:
+        # LPUSH puts the newest job first; the next to run is at the end
+        index = await self.redis.lpos(self.queue_key, job_id)
+        if index is None:
+            return None
+        return await self.redis.llen(self.queue_key) - index
+
+    async def wait(self, job_id: str, timeout: float):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._key(job_id))
+        try:
+            # Subscribe first, then check, so a job finishing in between isn't missed
+            job = await self.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                return
+            deadline = time.monotonic() + timeout
+            while (left := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=left)
+                if message is not None:
+                    return
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+
+class JobQueue:
+    def __init__(self, backend, workers: int = JOB_WORKERS, max_queue: int = JOB_MAX_QUEUE):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._tasks: List[asyncio.Task] = []
+        self._job_seconds = DEFAULT_JOB_SECONDS  # Moving average of run time
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, ingredients: List[str], bypass_cache: bool = False) -> Dict:
+        """Create a job, queue it and return its status; LLMBusyError if the queue is full."""
+        job = new_job(ingredients, bypass_cache)
+        if not bypass_cache:
+            cached = await reusable_recipe(ingredients)
+            if cached is not None:
+                job.update(status=DONE, recipe=cached, finished_at=job["created_at"])
+                await self.backend.save(job)
+                JOBS.inc(outcome="cached")
+                return await self.status(job["id"])
+
+        depth = await self.backend.depth()
+        if depth >= self.max_queue:
+            JOBS.inc(outcome="rejected")
+            raise LLMBusyError(
+                f"{depth} recipes are already waiting, please retry shortly",
+                status_code=429, retry_after=max(1, round(self._eta(depth - self.max_queue + 1))),
+            )
+        await self.backend.save(job)
+        await self.backend.push(job["id"])
+        JOBS.inc(outcome="queued")
+        return await self.status(job["id"])
+
+    async def status(self, job_id: str, wait: float = 0) -> Optional[Dict]:
+        """The job as clients see it, after waiting up to `wait` seconds for it to finish."""
+        if wait > 0:
+            await self.backend.wait(job_id, wait)
+        job = await self.backend.get(job_id)
+        if job is None:
+            return None
+        view = {key: job[key] for key in ("id", "status", "created_at", "started_at", "finished_at")}
+        if job["status"] == QUEUED:
+            position = await self.backend.position(job_id)
+            view["position"] = position
+            view["eta_seconds"] = round(self._eta(position or 0), 1)
+        elif job["status"] == RUNNING:
+            view["eta_seconds"] = round(max(0.0, job["started_at"] + self._job_seconds - time.time()), 1)
+        elif job["status"] == DONE:
+            view["recipe"] = job["recipe"]
+        else:
+            view["error"] = job["error"]
+            view["status_code"] = job["status_code"]
+        return view
+
+    async def events(self, job_id: str, interval: float = 2.0) -> AsyncIterator[tuple[str, Dict]]:
+        """("status", job) every `interval` seconds while it waits, then ("done", job)."""
+        while True:
+            job = await self.status(job_id, wait=interval)
+            if job is None:
+                yield "error", {"detail": "Unknown job"}
+                return
+            if job["status"] in FINISHED:
+                yield "done", job
+                return
+            yield "status", job
+
+    def _eta(self, position: int) -> float:
+        """Seconds until a job at this queue position has finished."""
+        rounds = (position + self.workers - 1) // self.workers + 1
+        return rounds * self._job_seconds
+
+    async def _worker(self):
+        while True:
+            job_id = await self.backend.pop()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Most likely the backend (e.g. Redis went away); keep the worker alive
+                logger.exception("Generation job %s failed outside the model call", job_id)
+                JOBS.inc(outcome=FAILED)
+                await self._mark_failed(job_id)
+
+    async def _mark_failed(self, job_id: str):
+        try:
+            job = await self.backend.get(job_id)
+            if job is not None:
+                job.update(status=FAILED, recipe=None, error="Internal error while running the job",
+                           status_code=500, finished_at=time.time())
+                await self.backend.save(job)
+        except Exception:
+            logger.exception("Could not mark generation job %s as failed", job_id)
+
+    async def _process(self, job_id: str):
+        job = await self.backend.get(job_id)
+        if job is None:  # Expired while it waited
+            return
+        job.update(status=RUNNING, started_at=time.time())
+        await self.backend.save(job)
+        JOB_SECONDS.observe(job["started_at"] - job["created_at"], stage="queued")
+        await self._run(job)
+        job["finished_at"] = time.time()
+        await self.backend.save(job)
+        run_seconds = job["finished_at"] - job["started_at"]
+        JOB_SECONDS.observe(run_seconds, stage="running")
+        JOBS.inc(outcome=job["status"])
+        self._job_seconds = 0.8 * self._job_seconds + 0.2 * run_seconds
+
+    async def _run(self, job: Dict):
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                recipe_data = await get_or_generate_recipe(job["ingredients"], job["bypass_cache"])
+            except LLMBusyError as e:
+                if attempt == BUSY_RETRIES:
+                    job.update(status=FAILED, error=str(e), status_code=e.status_code)
+                    return
+                await asyncio.sleep(e.retry_after)
+                continue
+            except Exception as e:
+                job.update(status=FAILED, error=str(e), status_code=500)
+                return
+            if not recipe_data or "error" in recipe_data:
+                error = recipe_data.get("error") if recipe_data else "Failed to generate recipe"
+                job.update(status=FAILED, error=error, status_code=500)
+            else:
+                job.update(status=DONE, recipe=recipe_data)
+            return
+
+
+def queue_from_env() -> JobQueue:
+    backend = RedisJobBackend() if JOB_BACKEND == "redis" else MemoryJobBackend()
+    return JobQueue(backend)
+
+
+generation_jobs = queue_from_env()
+metrics.register_collector(
+    "guaco_generation_queue_depth", "Generation jobs waiting for a worker", "gauge",
+    # The redis queue is shared between processes; its depth is Redis's to report
+    lambda: [("guaco_generation_queue_depth", {}, len(generation_jobs.backend))]
+    if isinstance(generation_jobs.backend, MemoryJobBackend) else [],
+)
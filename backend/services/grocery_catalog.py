@@ -0,0 +1,164 @@
+# backend/services/grocery_catalog.py
+"""
+In-memory grocery catalog over GroceryDataset.csv.
+
+The CSV is read once at startup into one list per column, plus the row
+numbers of each Sub Category, so a request is a slice of a few lists
+instead of a trip through the whole file.
+
+Responses are encoded once and kept: JSON bytes, their gzip form and an
+ETag derived from the file's checksum and the query. Every category's
+default listing is encoded up front; other pages and projections are
+encoded on first use.
+"""
+import csv
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services import metrics
+from services.encoded_page import EncodedPage, encode_page
+from services.recipe_cache import decode_cursor
+
+GROCERY_CSV = Path("data/GroceryDataset/GroceryDataset.csv")
+# The trimmed copy the frontend downloads as-is from /api/grocery-data/csv
+GROCERY_CSV_EXPORT = Path("data/GroceryDataset/GroceryDataset4Guaco.csv")
+
+CATEGORY_FIELD = "Sub Category"
+# Projection used when the caller doesn't ask for specific columns
+DEFAULT_FIELDS = ("Sub Category", "Title")
+
+# "$56.99", "$1,399.99", "$32.99through-$83.99" (we keep the lowest price)
+_PRICE = re.compile(r"\$?\s*([\d,]+(?:\.\d+)?)")
+# "Rated 4.3 out of 5 stars based on 265 reviews."
+_RATING = re.compile(r"Rated\s+([\d.]+)\s+out of\s+[\d.]+\s+stars(?:\s+based on\s+([\d,]+))?", re.I)
+
+
+def parse_price(text: str) -> Optional[float]:
+    match = _PRICE.search(text)
+    return float(match.group(1).replace(",", "")) if match else None
+
+
+def parse_rating(text: str) -> Tuple[Optional[float], int]:
+    """(stars, number of reviews); (None, 0) for "No Reviews" and blanks."""
+    match = _RATING.search(text)
+    if not match:
+        return None, 0
+    return float(match.group(1)), int((match.group(2) or "0").replace(",", ""))
+
+
+class GroceryCatalog:
+    def __init__(self, path: Path = GROCERY_CSV, cache_size: int = 512):
+        self.path = Path(path)
+        raw = self.path.read_bytes()
+        self.checksum = hashlib.sha256(raw).hexdigest()[:16]
+
+        reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig"), newline=""))
+        self.fields: Tuple[str, ...] = tuple(reader.fieldnames or ())
+        self.columns: Dict[str, List[str]] = {field: [] for field in self.fields}
+        for row in reader:
+            for field in self.fields:
+                self.columns[field].append((row.get(field) or "").strip())
+
+        # Numbers the filters need, parsed once
+        self.prices = [parse_price(text) for text in self.columns.get("Price", ())]
+        ratings = [parse_rating(text) for text in self.columns.get("Rating", ())]
+        self.ratings = [stars for stars, _ in ratings]
+        self.review_counts = [reviews for _, reviews in ratings]
+
+        self._rows_by_category: Dict[str, List[int]] = {}
+        for i, category in enumerate(self.columns.get(CATEGORY_FIELD, ())):
+            self._rows_by_category.setdefault(category, []).append(i)
+
+        # The per-category listings the frontend asks for all the time are
+        # encoded now and kept; anything else goes through a small LRU
+        self._slices: Dict[tuple, EncodedPage] = {}
+        for category in self._rows_by_category:
+            key = (category, DEFAULT_FIELDS, 0, None)
+            self._slices[key] = self._encode(key)
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[tuple, EncodedPage]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def categories(self) -> List[Dict]:
+        return [{"name": name, "count": len(rows)} for name, rows in self._rows_by_category.items()]
+
+    def rows(self, category: Optional[str] = None) -> Sequence[int]:
+        if category is None:
+            return range(len(self))
+        return self._rows_by_category.get(category, [])
+
+    def select(
+        self,
+        category: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """One slice of the catalog as dicts, and the number of matching rows."""
+        fields = self.check_fields(fields)
+        rows = self.rows(category)
+        end = len(rows) if limit is None else min(offset + limit, len(rows))
+        columns = [(field, self.columns[field]) for field in fields]
+        items = [{field: column[i] for field, column in columns} for i in rows[offset:end]]
+        return items, len(rows)
+
+    def check_fields(self, fields: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        if not fields:
+            return DEFAULT_FIELDS
+        unknown = [field for field in fields if field not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}; available: {list(self.fields)}")
+        return tuple(fields)
+
+    def page(
+        self,
+        category: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> EncodedPage:
+        """
+        Encoded page of the catalog. Cursors are row positions within the
+        selection, as for recipe pages; the next one is None on the last page.
+        """
+        fields = self.check_fields(fields)
+        offset = decode_cursor(cursor)
+        key = (category, fields, offset, limit)
+        page = self._slices.get(key)
+        if page is not None:
+            return page
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+
+        page = self._encode(key)
+        with self._lock:
+            self._pages[key] = page
+            while len(self._pages) > self._cache_size:
+                self._pages.popitem(last=False)
+        return page
+
+    def _encode(self, key: tuple) -> EncodedPage:
+        category, fields, offset, limit = key
+        items, total = self.select(category, fields, offset, limit)
+        end = offset + len(items)
+        tag = hashlib.sha256(repr((self.checksum,) + key).encode("utf-8")).hexdigest()[:20]
+        return encode_page(items, str(end) if end < total else None, total, etag=tag)
+
+
+@lru_cache(maxsize=1)
+def get_grocery_catalog() -> GroceryCatalog:
+    """The shared catalog, read on first use."""
+    with metrics.load_timer("grocery catalog"):
+        return GroceryCatalog()
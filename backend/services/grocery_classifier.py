@@ -0,0 +1,169 @@
+# backend/services/grocery_classifier.py
+"""
+Grocery item classifier: which Sub Category a free-text item belongs in.
+
+Trained at startup (PRELOAD includes "classifier" by default; ~0.1 s) from
+GroceryDataset4Guaco.csv, whose product Titles are labelled with a Sub
+Category. category_map.json adds a second, smaller signal: its names are
+short ingredient names like the ones users type ("oats", "hummus"). They
+are labelled with a UI bucket, a different taxonomy, so each bucket is
+translated to the CSV Sub Category it corresponds to (SUB_CATEGORY_BY_BUCKET)
+and buckets the CSV has no counterpart for ("Produce", "Dairy & Eggs") are
+left out. Every label the classifier returns is a CSV Sub Category, or
+FALLBACK_BUCKET.
+
+The model is a nearest centroid over hashed character n-grams:
+
+• An item is slugged and padded (" red onion "), and every 3-, 4- and
+  5-character window is hashed into one of 2**HASH_BITS columns. Hashes are
+  computed for a whole batch at once over one byte array, so there is no
+  per-item Python loop.
+• Counts are weighted 1 + log(tf) times idf and L2-normalised; the sparse
+  batch is three flat arrays (row, column, value), like a COO matrix.
+• Each class is the normalised mean of its training vectors. A batch is
+  scored against every class with one gather and one reduceat, and each
+  item gets the class with the highest cosine similarity, or
+  FALLBACK_BUCKET when nothing comes close (MIN_SCORE).
+
+benchmarks/bench_classifier.py reports accuracy on a held-out split of the
+CSV and items/second.
+"""
+import csv
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services import metrics
+from services.grocery_catalog import CATEGORY_FIELD, GROCERY_CSV_EXPORT
+from services.ingredient_index import CATEGORY_MAP_FILE, FALLBACK_BUCKET, load_category_map
+from services.normalize import slug
+
+# 2**16 columns x ~27 classes of float32 is 7 MB; 2**18 scores no better
+HASH_BITS = 16
+NGRAMS = (3, 4, 5)
+# Below this cosine similarity an item is FALLBACK_BUCKET; gibberish scores ~0.02
+MIN_SCORE = 0.05
+
+# category_map.json bucket -> the CSV Sub Category its names are trained as
+SUB_CATEGORY_BY_BUCKET = {
+    "Pantry": "Pantry & Dry Goods",
+    "Bakery & Breakfast": "Pantry & Dry Goods",  # mostly grains and flours
+    "Meat & Seafood": "Meat & Seafood",
+    "Beverages": "Beverages & Water",
+    "Snacks & Sweets": "Snacks",
+}
+
+_FNV_PRIME = np.uint32(16777619)
+_GOLDEN = np.uint32(2654435761)
+
+
+def ngram_features(items: Sequence[str], bits: int = HASH_BITS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashed n-gram counts of a batch as (row, column, count) arrays, sorted
+    by row then column, one entry per distinct (item, n-gram column).
+    """
+    padded = [f" {slug(item)} " for item in items]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    # slug() leaves only ASCII
+    codes = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8).astype(np.uint32)
+    ends = np.cumsum(lengths)
+    owner = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)
+    room = ends[owner] - np.arange(len(codes))  # characters left in the item from here
+
+    rows, columns = [], []
+    h = codes.copy()
+    with np.errstate(over="ignore"):
+        for n in range(2, max(NGRAMS) + 1):
+            # h[p] becomes the FNV-style hash of codes[p:p + n]
+            h[:-(n - 1)] = (h[:-(n - 1)] * _FNV_PRIME) ^ codes[n - 1:]
+            if n in NGRAMS:
+                valid = room >= n
+                rows.append(owner[valid])
+                columns.append((h[valid] * _GOLDEN) >> np.uint32(32 - bits))
+    rows = np.concatenate(rows)
+    columns = np.concatenate(columns).astype(np.int64)
+
+    keys, counts = np.unique((rows << bits) | columns, return_counts=True)
+    return keys >> bits, keys & ((1 << bits) - 1), counts
+
+
+class GroceryClassifier:
+    def __init__(self, items: Sequence[str], labels: Sequence[str], bits: int = HASH_BITS):
+        self.bits = bits
+        self.labels: Tuple[str, ...] = tuple(sorted(set(labels)))
+        label_ids = {label: i for i, label in enumerate(self.labels)}
+        y = np.array([label_ids[label] for label in labels], dtype=np.int64)
+
+        rows, columns, counts = ngram_features(items, bits)
+        document_frequency = np.bincount(columns, minlength=1 << bits)
+        self.idf = (np.log((1 + len(items)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        centroids = np.zeros((len(self.labels), 1 << bits), dtype=np.float32)
+        np.add.at(centroids, (y[rows], columns), self._weights(rows, columns, counts, len(items)))
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        # Column-major for scoring: one row per hashed n-gram, one column per class
+        self._centroids_by_column = np.ascontiguousarray(centroids.T)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _weights(self, rows: np.ndarray, columns: np.ndarray, counts: np.ndarray, n_items: int) -> np.ndarray:
+        weights = (1 + np.log(counts)).astype(np.float32) * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_items)).astype(np.float32)
+        return weights / norms[rows]
+
+    def scores(self, items: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of every item to every class, shape (items, classes)."""
+        scores = np.zeros((len(items), len(self.labels)), dtype=np.float32)
+        if not items:
+            return scores
+        rows, columns, counts = ngram_features(items, self.bits)
+        if not len(rows):
+            return scores
+        contributions = self._centroids_by_column[columns] * self._weights(rows, columns, counts, len(items))[:, None]
+        starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        scores[rows[starts]] = np.add.reduceat(contributions, starts, axis=0)
+        return scores
+
+    def classify_many(self, items: Sequence[str], min_score: float = MIN_SCORE) -> List[Dict]:
+        """[{"name", "category", "score"}] for a whole grocery list in one pass."""
+        scores = self.scores(items)
+        best = scores.argmax(axis=1) if len(items) else np.zeros(0, dtype=np.int64)
+        best_scores = scores[np.arange(len(items)), best]
+        return [
+            {
+                "name": item,
+                "category": self.labels[label] if score >= min_score else FALLBACK_BUCKET,
+                "score": round(float(score), 3),
+            }
+            for item, label, score in zip(items, best.tolist(), best_scores.tolist())
+        ]
+
+
+def load_training_data(
+    csv_path: Path = GROCERY_CSV_EXPORT,
+    map_path: Optional[Path] = CATEGORY_MAP_FILE,
+) -> Tuple[List[str], List[str]]:
+    """
+    (items, labels): the CSV's Titles and Sub Categories, then the category
+    map's names with their bucket translated to a Sub Category.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = [(row["Title"], row[CATEGORY_FIELD]) for row in csv.DictReader(f) if row["Title"]]
+    if map_path is not None:
+        sub_categories = {label for _, label in rows}
+        rows += [
+            (name, SUB_CATEGORY_BY_BUCKET[bucket])
+            for name, bucket in load_category_map(map_path).items()
+            if SUB_CATEGORY_BY_BUCKET.get(bucket) in sub_categories
+        ]
+    return [item for item, _ in rows], [label for _, label in rows]
+
+
+@lru_cache(maxsize=1)
+def get_grocery_classifier() -> GroceryClassifier:
+    """The shared classifier, trained on first use."""
+    with metrics.load_timer("grocery classifier"):
+        return GroceryClassifier(*load_training_data())
@@ -0,0 +1,276 @@
+# backend/services/ingredient_index.py
+"""
+Ingredient autocomplete and grocery-bucket lookup over category_map.json.
+
+category_map.json (built by data/build_map_from_json.py) maps normalised
+food names to UI buckets. It is loaded once into:
+
+• a sorted array of every name and of every "word onwards" tail of a name,
+  searched with bisect, so "chee" finds "cheese" and "cheddar cheese";
+• a symmetric-delete index over the words, for typo tolerance: "tomatos"
+  and "chedar" still find "tomatoes" and "cheddar" without comparing the
+  query against the whole vocabulary.
+
+Queries are normalised with the same slug() rules as the map's keys.
+When category_map.bin (written next to the JSON by the build script) is
+present, the map is read from it instead, which needs no JSON parsing.
+"""
+import json
+import logging
+import mmap
+import struct
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from services import metrics
+from services.normalize import slug
+
+CATEGORY_MAP_FILE = Path("data/category_map.json")
+CATEGORY_MAP_BINARY = Path("data/category_map.bin")
+FALLBACK_BUCKET = "Other"  # Same fallback as build_map_from_json.py
+
+logger = logging.getLogger("guaco.ingredients")
+
+
+# Longer words are matched exactly: the depth-2 delete neighbourhood grows
+# with the square of the length, and no ingredient word is this long
+MAX_FUZZY_WORD = 20
+
+
+def max_edits(word: str) -> int:
+    """How many typos we tolerate in a word of this length."""
+    if len(word) <= 3 or len(word) > MAX_FUZZY_WORD:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+def _deletes(word: str, depth: int) -> set:
+    """Every string reachable from word by deleting up to depth characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """Levenshtein distance, or bound + 1 as soon as it must exceed bound."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+class IngredientIndex:
+    def __init__(self, mapping: Dict[str, str]):
+        self.mapping = mapping
+
+        # (tail, name) pairs: the name itself plus the name from each later
+        # word on, e.g. "cheddar cheese" -> "cheddar cheese", "cheese"
+        tails = []
+        for name in mapping:
+            words = name.split(" ")
+            for i in range(len(words)):
+                tails.append((" ".join(words[i:]), name))
+        tails.sort()
+        self._tails = [tail for tail, _ in tails]
+        self._tail_names = [name for _, name in tails]
+
+        # word -> names containing it, and the delete index over those words
+        self._names_by_word: Dict[str, List[str]] = {}
+        for name in mapping:
+            for word in set(name.split(" ")):
+                self._names_by_word.setdefault(word, []).append(name)
+        self._words = sorted(self._names_by_word)
+        self._words_by_delete: Dict[str, List[str]] = {}
+        for word in self._names_by_word:
+            for deleted in _deletes(word, max_edits(word)):
+                self._words_by_delete.setdefault(deleted, []).append(word)
+
+    # -- lookups ----------------------------------------------------------
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, str]]:
+        """Names starting with (a word starting with) the query, then close misspellings."""
+        q = slug(query)
+        if not q:
+            return []
+
+        # Whole-name prefix matches rank above matches on a later word
+        starts, inner = [], []
+        seen = set()
+        i = bisect_left(self._tails, q)
+        while i < len(self._tails) and self._tails[i].startswith(q):
+            name = self._tail_names[i]
+            if name not in seen:
+                seen.add(name)
+                (starts if name.startswith(q) else inner).append(name)
+            i += 1
+        ranked = sorted(starts, key=len) + sorted(inner, key=len)
+
+        if len(ranked) < limit:
+            for name, _ in self._fuzzy(q):
+                if name not in seen:
+                    seen.add(name)
+                    ranked.append(name)
+
+        return [{"name": name, "category": self.mapping[name]} for name in ranked[:limit]]
+
+    def categorize(self, item: str) -> Dict[str, Optional[str]]:
+        """
+        Bucket for a grocery item. Tries, in order: the exact name, its
+        singular/plural, the longest trailing words that are a known name
+        ("shredded cheddar cheese" -> "cheddar cheese"), the longest leading
+        words ("chicken breasts" -> "chicken"), then the closest misspelling.
+        Unknown items land in FALLBACK_BUCKET.
+        """
+        q = slug(item)
+        result = {"name": item, "key": None, "category": FALLBACK_BUCKET, "match": "none"}
+        if not q:
+            return result
+
+        for candidate in _plural_variants(q):
+            if candidate in self.mapping:
+                return {**result, "key": candidate, "category": self.mapping[candidate], "match": "exact"}
+
+        words = q.split(" ")
+        partials = [" ".join(words[i:]) for i in range(1, len(words))]
+        partials += [" ".join(words[:i]) for i in range(len(words) - 1, 0, -1)]
+        for partial in partials:
+            for candidate in _plural_variants(partial):
+                if candidate in self.mapping:
+                    return {**result, "key": candidate, "category": self.mapping[candidate], "match": "partial"}
+
+        fuzzy = self._fuzzy(q, whole_words=True)
+        if fuzzy:
+            name = fuzzy[0][0]
+            return {**result, "key": name, "category": self.mapping[name], "match": "fuzzy"}
+        return result
+
+    def categorize_many(self, items: List[str]) -> List[Dict[str, Optional[str]]]:
+        # Grocery lists repeat items a lot; look each distinct one up once
+        seen: Dict[str, Dict] = {}
+        results = []
+        for item in items:
+            key = slug(item)
+            if key not in seen:
+                seen[key] = self.categorize(item)
+            results.append({**seen[key], "name": item})
+        return results
+
+    # -- fuzzy matching ---------------------------------------------------
+
+    def _close_words(self, word: str) -> Dict[str, int]:
+        """Known words within max_edits(word) of word, with their distance."""
+        bound = max_edits(word)
+        close = {}
+        for deleted in _deletes(word, bound):
+            for candidate in self._words_by_delete.get(deleted, ()):
+                if candidate not in close:
+                    distance = edit_distance(word, candidate, bound)
+                    if distance <= bound:
+                        close[candidate] = distance
+        return close
+
+    def _fuzzy(self, q: str, whole_words: bool = False) -> List[Tuple[str, int]]:
+        """
+        Names whose words cover every query word within the typo budget,
+        best first. Unless whole_words is set, the last query word may also
+        be the start of a word, as it is while the user is still typing.
+        """
+        words = q.split(" ")
+        scores: Optional[Dict[str, int]] = None
+        for position, word in enumerate(words):
+            close = self._close_words(word)
+            if not whole_words and position == len(words) - 1:
+                i = bisect_left(self._words, word)
+                while i < len(self._words) and self._words[i].startswith(word):
+                    close.setdefault(self._words[i], 0)
+                    i += 1
+
+            word_scores: Dict[str, int] = {}
+            for known, distance in close.items():
+                for name in self._names_by_word[known]:
+                    if distance < word_scores.get(name, distance + 1):
+                        word_scores[name] = distance
+
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {n: s + word_scores[n] for n, s in scores.items() if n in word_scores}
+            if not scores:
+                return []
+
+        return sorted(scores.items(), key=lambda item: (item[1], len(item[0])))
+
+
+def _plural_variants(name: str) -> List[str]:
+    variants = [name]
+    if name.endswith("ies"):
+        variants.append(name[:-3] + "y")
+    if name.endswith("es"):
+        variants.append(name[:-2])
+    if name.endswith("s"):
+        variants.append(name[:-1])
+    else:
+        variants += [name + "s", name + "es"]
+    return variants
+
+
+def load_category_map(path: Path = CATEGORY_MAP_FILE) -> Dict[str, str]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Layout of category_map.bin; see "BINARY FORMAT" in data/build_map_from_json.py
+BINARY_MAGIC = b"GCMAP\x00\x02\x00"
+BINARY_HEADER = struct.Struct("<8sIIII")
+
+
+def load_binary_category_map(path: Path = CATEGORY_MAP_BINARY) -> Dict[str, str]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, n_keys, n_buckets, ids_offset, keys_offset = BINARY_HEADER.unpack_from(data, 0)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a category map (bad magic {magic!r})")
+
+        buckets, pos = [], BINARY_HEADER.size
+        for _ in range(n_buckets):
+            (length,) = struct.unpack_from("<H", data, pos)
+            buckets.append(data[pos + 2:pos + 2 + length].decode("utf-8"))
+            pos += 2 + length
+
+        keys = data[keys_offset:].decode("utf-8").split("\n") if n_keys else []
+        ids = data[ids_offset:ids_offset + n_keys]
+        return dict(zip(keys, map(buckets.__getitem__, ids)))
+
+
+def binary_map_is_current(binary_path: Path = CATEGORY_MAP_BINARY, json_path: Path = CATEGORY_MAP_FILE) -> bool:
+    """Whether the binary map exists and isn't older than the JSON it was built from."""
+    if not binary_path.exists():
+        return False
+    # A little slack: a fresh checkout writes both files a moment apart
+    if json_path.exists() and binary_path.stat().st_mtime + 2 < json_path.stat().st_mtime:
+        logger.warning(
+            "%s is older than %s; using the JSON (rerun data/build_map_from_json.py to rebuild it)",
+            binary_path, json_path,
+        )
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_ingredient_index() -> IngredientIndex:
+    """The shared index, built on first use from the binary map if it is up to date."""
+    with metrics.load_timer("ingredient index"):
+        if binary_map_is_current():
+            return IngredientIndex(load_binary_category_map())
+        return IngredientIndex(load_category_map())
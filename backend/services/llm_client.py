@@ -0,0 +1,255 @@
+# backend/services/llm_client.py
+"""
+Shared async OpenAI client.
+
+• One AsyncOpenAI client per worker, on a pooled httpx connection, built on
+  first use.
+• Every call has a timeout and is retried with exponential backoff + jitter
+  on timeouts, connection errors, rate limits and 5xx responses.
+• A semaphore caps in-flight upstream calls. A request that can't get a slot
+  within LLM_QUEUE_TIMEOUT_SECONDS fails fast with LLMBusyError instead of
+  piling up behind the others.
+• The requested model is the head of a provider chain (llm_providers):
+  slow calls are hedged with, and failed calls handed to, fallback models.
+  A hedged call only starts if a slot is free right away.
+
+Settings (environment variables):
+  LLM_TIMEOUT_SECONDS        per-attempt timeout               (default 60)
+  LLM_MAX_RETRIES            retries after the first attempt   (default 2)
+  LLM_RETRY_BASE_SECONDS     first backoff step                (default 0.5)
+  LLM_MAX_CONCURRENCY        in-flight upstream calls/worker   (default 8)
+  LLM_QUEUE_TIMEOUT_SECONDS  wait for a free slot              (default 2)
+
+Every attempt is timed into metrics.LLM_SECONDS, and the token usage the
+API reports is added to metrics.LLM_TOKENS.
+
+The openai SDK takes longer to import than the rest of the app, so it is
+only imported when the first client is built; workers that never generate
+never load it.
+"""
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional
+
+import httpx
+
+from services import metrics
+from services.llm_providers import Provider, chain_for, chain_stats
+
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "2"))
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Filled in with the SDK's timeout, connection, rate limit and 5xx errors
+# when the first client is built
+RETRYABLE_ERRORS: tuple = ()
+
+
+class LLMBusyError(Exception):
+    """Raised when we can't take another generation right now."""
+
+    def __init__(self, message: str, status_code: int = 503, retry_after: int = 5):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# base URL (None for the default) -> client
+_clients: Dict[Optional[str], "AsyncOpenAI"] = {}
+_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+_in_flight = 0
+
+
+def get_client(base_url: Optional[str] = None) -> "AsyncOpenAI":
+    global RETRYABLE_ERRORS
+    if base_url not in _clients:
+        with metrics.load_timer("OpenAI client"):
+            import openai
+
+            RETRYABLE_ERRORS = (
+                openai.APITimeoutError,
+                openai.APIConnectionError,
+                openai.RateLimitError,
+                openai.InternalServerError,
+            )
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONCURRENCY * 2,
+                    max_keepalive_connections=MAX_CONCURRENCY,
+                ),
+                timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=10.0),
+            )
+            # We retry ourselves (with jitter), so the SDK shouldn't
+            _clients[base_url] = openai.AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=0,
+            )
+    return _clients[base_url]
+
+
+async def aclose():
+    while _clients:
+        await _clients.popitem()[1].close()
+
+
+def in_flight() -> int:
+    """Upstream calls currently holding a slot in this worker."""
+    return _in_flight
+
+
+def provider_stats() -> Dict:
+    return chain_stats()
+
+
+@asynccontextmanager
+async def upstream_slot():
+    """Hold one of the MAX_CONCURRENCY upstream slots, or raise LLMBusyError."""
+    global _in_flight
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise LLMBusyError(
+            f"All {MAX_CONCURRENCY} recipe generation slots are busy, please retry shortly"
+        )
+    _in_flight += 1
+    try:
+        yield
+    finally:
+        _release_slot()
+
+
+def _release_slot():
+    global _in_flight
+    _in_flight -= 1
+    _slots.release()
+
+
+async def _spare_slot():
+    """Take a slot only if one is free right now; returns its release function."""
+    global _in_flight
+    if _slots.locked():
+        return None
+    # Not locked: a slot is free and nobody is queued, so this doesn't wait
+    await _slots.acquire()
+    _in_flight += 1
+    return _release_slot
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, base * 2**attempt)."""
+    return random.uniform(0, RETRY_BASE_SECONDS * (2 ** attempt))
+
+
+async def _create_with_retries(provider: Provider, retries: int, timeout: Optional[float], **kwargs):
+    kind = "stream" if kwargs.get("stream") else "completion"
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            response = await get_client(provider.base_url).chat.completions.create(
+                timeout=timeout or TIMEOUT_SECONDS, **{**kwargs, "model": provider.model}
+            )
+        except asyncio.CancelledError:
+            # Lost a hedged race
+            metrics.LLM_SECONDS.observe(time.perf_counter() - start, kind=kind, model=provider.name, outcome="cancelled")
+            raise
+        except Exception as e:
+            metrics.LLM_SECONDS.observe(time.perf_counter() - start, kind=kind, model=provider.name, outcome=type(e).__name__)
+            metrics.ERRORS.inc(stage="llm")
+            if not isinstance(e, RETRYABLE_ERRORS):
+                raise
+            if attempt == retries:
+                import openai  # Loaded by get_client() by now
+
+                if isinstance(e, openai.RateLimitError):
+                    raise LLMBusyError("The recipe model is rate limited, please retry shortly",
+                                       status_code=429, retry_after=10)
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+        else:
+            # For a stream this is the time to the response headers
+            metrics.LLM_SECONDS.observe(time.perf_counter() - start, kind=kind, model=provider.name, outcome="ok")
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                metrics.LLM_TOKENS.inc(usage.prompt_tokens, kind="prompt")
+                metrics.LLM_TOKENS.inc(usage.completion_tokens, kind="completion")
+            return response
+
+
+class _PrimedStream:
+    """A stream whose first chunk has already been read."""
+
+    def __init__(self, stream, first):
+        self._stream = stream
+        self._first = first
+
+    async def __aiter__(self):
+        if self._first is not None:
+            yield self._first
+        async for chunk in self._stream:
+            yield chunk
+
+    async def close(self):
+        await self._stream.close()
+
+
+async def _open_stream(provider: Provider, retries: int, timeout: Optional[float], **kwargs) -> _PrimedStream:
+    # Headers arrive long before the model starts writing; race on the first chunk
+    stream = await _create_with_retries(provider, retries, timeout, **kwargs)
+    try:
+        return _PrimedStream(stream, await stream.__anext__())
+    except StopAsyncIteration:
+        return _PrimedStream(stream, None)
+    except BaseException:
+        await stream.close()
+        raise
+
+
+async def _create(timeout: Optional[float], **kwargs):
+    """One request along the chain for kwargs["model"]: hedged, with fallbacks and retries."""
+    kind = "stream" if kwargs.get("stream") else "completion"
+    create = _open_stream if kind == "stream" else _create_with_retries
+    return await chain_for(kwargs["model"]).run(
+        lambda provider, retries: create(provider, retries, timeout, **kwargs),
+        kind, MAX_RETRIES, spare_slot=_spare_slot,
+    )
+
+
+async def chat_completion(timeout: Optional[float] = None, **kwargs):
+    """
+    client.chat.completions.create with a slot, a timeout, retries and
+    fallback models. Keyword arguments are passed straight to the SDK.
+    """
+    async with upstream_slot():
+        return await _create(timeout, **kwargs)
+
+
+@asynccontextmanager
+async def chat_stream(timeout: Optional[float] = None, **kwargs) -> AsyncIterator[AsyncIterator[str]]:
+    """
+    Streaming chat completion. Entering the block takes a slot and opens the
+    stream (retrying like chat_completion), so LLMBusyError is raised before
+    any output is produced; the block then yields an iterator of text deltas.
+    The slot is held until the block exits.
+    """
+    async with upstream_slot():
+        stream = await _create(timeout, stream=True, **kwargs)
+        try:
+            yield _text_deltas(stream)
+        finally:
+            await stream.close()
+
+
+async def _text_deltas(stream) -> AsyncIterator[str]:
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
@@ -0,0 +1,226 @@
+# backend/services/llm_providers.py
+"""
+Model chains for the recipe LLM calls: hedging and fallback.
+
+A request names one model; its chain is that model followed by
+LLM_FALLBACK_MODELS. The chain runs the first provider and
+
+• hedges: if it hasn't answered within its hedge deadline, the next
+  provider is started as well and whichever answers first wins (the other
+  request is cancelled). The deadline is the LLM_HEDGE_PERCENTILE latency
+  of the provider's recent successful calls, so only its slow tail is
+  hedged; until LLM_HEDGE_MIN_SAMPLES calls have been seen it is
+  LLM_HEDGE_DEFAULT_SECONDS;
+• falls back: if it fails, the next provider is tried straight away.
+
+Earlier providers retry at most once (see llm_client) before handing over
+to the next one, so a single transient error on the requested model doesn't
+switch models; the last provider gets all LLM_MAX_RETRIES. For a stream the race is over its first
+chunk, not over the whole response.
+
+A provider is a model name, optionally at its own OpenAI-compatible base
+URL ("model@http://host/v1"), which is how a local fake provider such as
+benchmarks/fake_openai.py is plugged in.
+
+Settings (environment variables):
+  LLM_FALLBACK_MODELS         models tried after the requested one,
+                              comma-separated     (default gpt-3.5-turbo)
+  LLM_HEDGE                   1 to hedge, 0 for fallback only (default 1)
+  LLM_HEDGE_PERCENTILE        latency percentile that triggers
+                              the hedge                    (default 0.95)
+  LLM_HEDGE_MIN_SAMPLES       calls before the percentile is used (default 20)
+  LLM_HEDGE_DEFAULT_SECONDS   deadline until then            (default 20)
+  LLM_HEDGE_MIN_SECONDS       lowest deadline ever used      (default 1)
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from services import metrics
+
+FALLBACK_MODELS = os.getenv("LLM_FALLBACK_MODELS", "gpt-3.5-turbo")
+HEDGE = os.getenv("LLM_HEDGE", "1") == "1"
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", "20"))
+HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "1"))
+LATENCY_WINDOW = 200  # Recent calls kept per provider
+FALLBACK_RETRIES = 1  # Retries for a provider that has a fallback after it
+
+HEDGES = metrics.Counter(
+    "guaco_llm_hedges_total", "Hedged requests started, and how many of them won", ("model", "outcome"))
+FALLBACKS = metrics.Counter(
+    "guaco_llm_fallbacks_total", "Failed provider calls handed over to the next model", ("model",))
+
+
+@dataclass(frozen=True)
+class Provider:
+    model: str
+    base_url: Optional[str] = None  # None: the OpenAI API (or OPENAI_BASE_URL)
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}@{self.base_url}" if self.base_url else self.model
+
+    @classmethod
+    def parse(cls, spec: str) -> "Provider":
+        """'gpt-4' or 'gpt-4@http://127.0.0.1:8089/v1'."""
+        model, _, base_url = spec.strip().partition("@")
+        return cls(model, base_url or None)
+
+
+class LatencyTracker:
+    """Latencies of a provider's last LATENCY_WINDOW successful calls."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+# call(provider, retries) starts one request; spare_slot() returns a
+# release function when there is capacity for a hedged request, else None
+Call = Callable[[Provider, int], Awaitable]
+SpareSlot = Callable[[], Awaitable[Optional[Callable[[], None]]]]
+
+
+class ProviderChain:
+    def __init__(self, providers: List[Provider], hedge: bool = HEDGE):
+        self.providers = providers
+        self.hedge = hedge and len(providers) > 1
+        # (provider name, kind) -> latencies; streams and completions differ a lot
+        self._latency: Dict[tuple, LatencyTracker] = {}
+
+    def latency(self, provider: Provider, kind: str) -> LatencyTracker:
+        key = (provider.name, kind)
+        if key not in self._latency:
+            self._latency[key] = LatencyTracker()
+        return self._latency[key]
+
+    def hedge_deadline(self, provider: Provider, kind: str) -> float:
+        tracker = self.latency(provider, kind)
+        if len(tracker) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_SECONDS
+        return max(HEDGE_MIN_SECONDS, tracker.percentile(HEDGE_PERCENTILE))
+
+    async def run(self, call: Call, kind: str, max_retries: int, spare_slot: Optional[SpareSlot] = None):
+        """
+        The first successful result of call() along the chain. If every
+        provider fails, the last provider's error is raised.
+        """
+        tasks: Dict[asyncio.Task, tuple] = {}  # task -> (provider, start time)
+        next_index = 0
+        hedged = False
+        hedge: Optional[Provider] = None
+        error: Optional[BaseException] = None
+
+        def launch(release=None):
+            nonlocal next_index
+            provider = self.providers[next_index]
+            next_index += 1
+            retries = max_retries if next_index == len(self.providers) else min(max_retries, FALLBACK_RETRIES)
+            task = asyncio.ensure_future(call(provider, retries))
+            if release is not None:
+                task.add_done_callback(lambda _: release())
+            tasks[task] = (provider, time.perf_counter())
+            return provider
+
+        launch()
+        try:
+            while tasks:
+                timeout = None
+                if self.hedge and not hedged and next_index < len(self.providers):
+                    first, started = next(iter(tasks.values()))
+                    timeout = max(0.0, self.hedge_deadline(first, kind) - (time.perf_counter() - started))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Past the deadline: hedge with the next provider if there's room
+                    hedged = True
+                    release = await spare_slot() if spare_slot is not None else (lambda: None)
+                    if release is not None:
+                        hedge = launch(release)
+                        HEDGES.inc(model=hedge.name, outcome="started")
+                    continue
+
+                for task in done:
+                    provider, started = tasks.pop(task)
+                    if task.exception() is None:
+                        self.latency(provider, kind).record(time.perf_counter() - started)
+                        if provider is hedge:
+                            HEDGES.inc(model=provider.name, outcome="won")
+                        # Anything else still in `tasks` (even if it also just
+                        # finished) is discarded below
+                        return task.result()
+                    error = task.exception()
+                    if tasks or next_index < len(self.providers):
+                        FALLBACKS.inc(model=provider.name)
+
+                if not tasks and next_index < len(self.providers):
+                    launch()
+            raise error
+        finally:
+            for task in tasks:
+                _discard(task)
+
+    def stats(self) -> Dict:
+        return {
+            "providers": [provider.name for provider in self.providers],
+            "hedge": self.hedge,
+            "latency": {
+                f"{name} {kind}": {
+                    "samples": len(tracker),
+                    "p50_seconds": round(tracker.percentile(0.5) or 0.0, 3),
+                    "hedge_deadline_seconds": round(self.hedge_deadline(Provider.parse(name), kind), 3),
+                }
+                for (name, kind), tracker in self._latency.items()
+            },
+        }
+
+
+def _discard(task: asyncio.Task):
+    """Cancel a losing request; a stream that still opened is closed."""
+    def cleanup(task: asyncio.Task):
+        if task.cancelled() or task.exception() is not None:
+            return
+        close = getattr(task.result(), "close", None)
+        if close is not None:
+            asyncio.ensure_future(close())
+
+    task.cancel()
+    task.add_done_callback(cleanup)
+
+
+_chains: Dict[str, ProviderChain] = {}
+
+
+def chain_for(model: str) -> ProviderChain:
+    """The chain for a request that names `model`: it, then LLM_FALLBACK_MODELS."""
+    if model not in _chains:
+        providers = [Provider(model)]
+        for spec in FALLBACK_MODELS.split(","):
+            if spec.strip() and Provider.parse(spec) not in providers:
+                providers.append(Provider.parse(spec))
+        _chains[model] = ProviderChain(providers)
+    return _chains[model]
+
+
+def chain_stats() -> Dict:
+    return {model: chain.stats() for model, chain in _chains.items()}
@@ -0,0 +1,181 @@
+# backend/services/metrics.py
+"""
+In-process metrics in the Prometheus text format, plus sampled debug logs.
+
+Counters and histograms keep one small array per label set behind a lock;
+observing is a bisect and two additions, cheap enough for every request.
+render() writes everything out for GET /metrics. Numbers that already live
+elsewhere (cache and single-flight stats) are exported through collectors
+that are read only when /metrics is scraped.
+
+Settings (environment variables):
+  LOG_LEVEL               level for the backend's loggers     (default INFO)
+  DEBUG_LOG_SAMPLE_RATE   share of requests whose raw model
+                          output is logged at DEBUG level      (default 0.01)
+"""
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEBUG_LOG_SAMPLE_RATE = float(os.getenv("DEBUG_LOG_SAMPLE_RATE", "0.01"))
+
+# Parent of the backend's loggers (guaco.api, guaco.generation, ...)
+logger = logging.getLogger("guaco")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Seconds; LLM calls take seconds, parsing and store calls take microseconds
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (name, labels, value) rows added to /metrics when it is scraped
+Sample = Tuple[str, Dict[str, str], float]
+
+_metrics: List["_Metric"] = []
+_collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (+Inf last)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def register_collector(name: str, help: str, kind: str, collect: Callable[[], Iterable[Sample]]):
+    """Export numbers kept elsewhere; collect() runs on every scrape."""
+    _collectors.append((name, help, kind, collect))
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+        lines += metric.render()
+    for name, help, kind, collect in _collectors:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for sample_name, labels, value in collect():
+            names = tuple(labels)
+            lines.append(f"{sample_name}{_format_labels(names, tuple(labels[n] for n in names))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def load_timer(component: str):
+    """Time loading a lazily built component into LOAD_SECONDS and the log."""
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    LOAD_SECONDS.observe(seconds, component=component)
+    logger.info("Loaded %s in %.0f ms", component, seconds * 1000)
+
+
+def sampled() -> bool:
+    """True for DEBUG_LOG_SAMPLE_RATE of the calls, and only if DEBUG logging is on."""
+    return logger.isEnabledFor(logging.DEBUG) and random.random() < DEBUG_LOG_SAMPLE_RATE
+
+
+# -- the backend's metrics -------------------------------------------------
+
+REQUEST_SECONDS = Histogram(
+    "guaco_http_request_seconds", "Request latency per route", ("method", "route", "status"))
+LLM_SECONDS = Histogram(
+    "guaco_llm_request_seconds", "Latency of one upstream LLM attempt", ("kind", "model", "outcome"))
+PARSE_SECONDS = Histogram(
+    "guaco_recipe_parse_seconds", "Time to turn a model response into a recipe", ("mode",))
+STORE_SECONDS = Histogram(
+    "guaco_store_seconds", "Recipe store load/save time", ("operation",))
+LLM_TOKENS = Counter(
+    "guaco_llm_tokens_total", "Tokens reported by the upstream API", ("kind",))
+LOAD_SECONDS = Histogram(
+    "guaco_load_seconds", "Time to load datasets, indexes and clients on first use", ("component",))
+ERRORS = Counter(
+    "guaco_errors_total", "Errors by where they happened", ("stage",))
@@ -0,0 +1,254 @@
+# backend/services/near_duplicates.py
+"""
+Near-duplicate lookup for generation requests.
+
+The generation cache only answers the exact same ingredient list. "chicken,
+rice, onion" and "chicken breast, rice, onions, garlic" get different keys
+but the model writes practically the same recipe for both. This index finds
+the earlier request (or saved recipe) whose ingredients are most like the
+new one, so its recipe can be reused instead of calling the model.
+Only a recipe made from a subset of the requested ingredients qualifies:
+the prompt promises to use only what the user listed, so a recipe that
+needs something else is never reused, however similar.
+
+• An ingredient list becomes a set of words: each ingredient normalised
+  with pantry_index.ingredient_term() (singular, no "fresh"/"diced"...),
+  pantry staples dropped, then split. The example above is {chicken, rice,
+  onion} vs {chicken, breast, rice, onion, garlic}: a subset, at Jaccard
+  3/5 = 0.6. The other way round (the earlier request had garlic, the new
+  one doesn't) it is not reused.
+• Each set gets a MinHash signature (NUM_PERM hash minimums). Signatures
+  are cut into BANDS bands; sets that share any band are candidates. With
+  32 bands of 4 rows a pair at Jaccard 0.6 becomes a candidate 99% of the
+  time and one at 0.3 about 23% of the time, so a lookup touches a few
+  buckets instead of every entry.
+• Candidates are checked for the subset rule and their exact Jaccard
+  similarity; the best one at or above the threshold is the match.
+
+Entries come from two places: every recipe this worker generates (kept in
+memory, least recently used dropped first) and every saved recipe in the
+store, whose summary lists the ingredients it was generated from. Saved
+recipes follow the store's version counter like CategoryCache. Catching up
+with the store reads and signs every new saved recipe, so find() is meant
+to run off the event loop (generation.reusable_recipe runs it in a thread;
+PRELOAD=near_duplicates does the first catch-up at startup).
+
+Settings (environment variables):
+  NEAR_DUPLICATE_REUSE          reuse near-duplicates at all         (default 1)
+  NEAR_DUPLICATE_THRESHOLD      Jaccard similarity needed to reuse   (default 0.6)
+  NEAR_DUPLICATE_MAX_GENERATED  generated recipes remembered/worker  (default 10000)
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from services import metrics
+from services.pantry_index import STAPLES, SUMMARY_PREFIX, ingredient_term, recipe_terms
+from services.recipe_store import SQLiteRecipeStore
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MASK = np.uint64(0xFFFFFFFF)
+# Fixed seed: signatures must agree between workers and restarts
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+SIMILARITY = metrics.Histogram(
+    "guaco_near_duplicate_similarity", "Best Jaccard similarity found per lookup (hits and misses)",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+Tokens = FrozenSet[str]
+
+
+class NearDuplicate(NamedTuple):
+    similarity: float
+    source: str  # "generated" or "saved"
+    ingredients: Tuple[str, ...]  # what the matched recipe was made from
+    recipe: Dict  # the generated payload, or the saved recipe as stored
+
+
+def ingredient_tokens(ingredients: Iterable[str]) -> Tokens:
+    """The words near-duplicate matching compares: 'Fresh Tomatoes' -> {'tomato'}."""
+    terms = (ingredient_term(i) for i in ingredients)
+    return frozenset(word for term in terms if term and term not in STAPLES for word in term.split())
+
+
+def saved_ingredients(recipe: Dict) -> List[str]:
+    """The ingredient list a saved recipe was generated from."""
+    summary = recipe.get("summary") or ""
+    if summary.startswith(SUMMARY_PREFIX):
+        return [i.strip() for i in summary[len(SUMMARY_PREFIX):].split(",") if i.strip()]
+    return recipe_terms(recipe)
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def signature(tokens: Tokens) -> np.ndarray:
+    """MinHash of a non-empty token set: NUM_PERM uint32 minimums."""
+    hashes = np.array([_token_hash(t) for t in tokens], dtype=np.uint64)[:, None]
+    # Wraps around in uint64 like datasketch; the low 32 bits are still well mixed
+    permuted = ((hashes * _A + _B) % _MERSENNE) & _MASK
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.6, max_generated: int = 10_000, enabled: bool = True):
+        self.threshold = threshold
+        self.max_generated = max_generated
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._tokens: Dict[int, Tokens] = {}
+        self._bands: Dict[int, List[bytes]] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(BANDS)]
+        # Generated entries, oldest first: id -> (ingredients, payload)
+        self._generated: "OrderedDict[int, Tuple[Tuple[str, ...], Dict]]" = OrderedDict()
+        self._generated_by_tokens: Dict[Tokens, int] = {}
+        # Saved entries: id -> (category, recipe id)
+        self._saved: Dict[int, Tuple[str, str]] = {}
+        self._store_getter: Optional[Callable[[], SQLiteRecipeStore]] = None
+        self._version = -1
+        self._last_pk = 0
+        self._counters = {"lookups": 0, "generated_hits": 0, "saved_hits": 0, "misses": 0, "entries_evicted": 0}
+
+    def follow(self, store_getter: Callable[[], SQLiteRecipeStore]):
+        """Also match saved recipes; the store is opened on the first lookup."""
+        self._store_getter = store_getter
+
+    # -- entries ----------------------------------------------------------
+
+    def _insert(self, tokens: Tokens) -> int:
+        entry_id = self._next_id
+        self._next_id += 1
+        sig = signature(tokens)
+        bands = [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+        for bucket, band in zip(self._buckets, bands):
+            bucket.setdefault(band, set()).add(entry_id)
+        self._tokens[entry_id] = tokens
+        self._bands[entry_id] = bands
+        return entry_id
+
+    def _remove(self, entry_id: int):
+        for bucket, band in zip(self._buckets, self._bands.pop(entry_id)):
+            members = bucket[band]
+            members.discard(entry_id)
+            if not members:
+                del bucket[band]
+        del self._tokens[entry_id]
+
+    def add_generated(self, ingredients: List[str], recipe: Dict):
+        """Remember a freshly generated recipe for later near-duplicate requests."""
+        tokens = ingredient_tokens(ingredients)
+        if not self.enabled or not tokens:
+            return
+        with self._lock:
+            # A newer recipe for the same words replaces the older one
+            previous = self._generated_by_tokens.pop(tokens, None)
+            if previous is not None:
+                del self._generated[previous]
+                self._remove(previous)
+            entry_id = self._insert(tokens)
+            self._generated[entry_id] = (tuple(ingredients), recipe)
+            self._generated_by_tokens[tokens] = entry_id
+            while len(self._generated) > self.max_generated:
+                oldest, _ = self._generated.popitem(last=False)
+                del self._generated_by_tokens[self._tokens[oldest]]
+                self._remove(oldest)
+                self._counters["entries_evicted"] += 1
+
+    def _sync(self) -> Optional[SQLiteRecipeStore]:
+        if self._store_getter is None:
+            return None
+        store = self._store_getter()
+        version = store.version()
+        if version == self._version:
+            return store
+        with self._lock:
+            if version != self._version:
+                for pk, category, recipe in store.rows_since(self._last_pk):
+                    tokens = ingredient_tokens(saved_ingredients(recipe))
+                    if tokens:
+                        self._saved[self._insert(tokens)] = (category, str(recipe.get("id")))
+                    self._last_pk = pk
+                self._version = version
+        return store
+
+    def __len__(self) -> int:
+        self._sync()
+        return len(self._tokens)
+
+    # -- lookups ----------------------------------------------------------
+
+    def find(self, ingredients: List[str]) -> Optional[NearDuplicate]:
+        """The most similar earlier recipe at or above the threshold, if any."""
+        tokens = ingredient_tokens(ingredients)
+        if not self.enabled or not tokens:
+            return None
+        store = self._sync()
+        sig = signature(tokens)
+        with self._lock:
+            self._counters["lookups"] += 1
+            candidates: Set[int] = set()
+            for b, bucket in enumerate(self._buckets):
+                candidates.update(bucket.get(sig[b * ROWS:(b + 1) * ROWS].tobytes(), ()))
+            # Most similar first; on a tie prefer a generated payload, then the newest
+            best, best_key, size = None, (0.0, False, -1), len(tokens)
+            for entry_id in candidates:
+                other = self._tokens[entry_id]
+                # A subset of the request has Jaccard |other| / |request|
+                if len(other) < best_key[0] * size or not other <= tokens:
+                    continue
+                key = (len(other) / size, entry_id in self._generated, entry_id)
+                if key > best_key:
+                    best, best_key = entry_id, key
+            similarity = best_key[0]
+            SIMILARITY.observe(similarity)
+            if similarity < self.threshold:
+                self._counters["misses"] += 1
+                return None
+            if best in self._generated:
+                self._counters["generated_hits"] += 1
+                made_from, recipe = self._generated[best]
+                self._generated.move_to_end(best)
+                return NearDuplicate(similarity, "generated", made_from, recipe)
+            category, recipe_id = self._saved[best]
+
+        recipe = store.get(category, recipe_id)
+        with self._lock:
+            if recipe is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["saved_hits"] += 1
+        return NearDuplicate(similarity, "saved", tuple(saved_ingredients(recipe)), recipe)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["generated_entries"] = len(self._generated)
+            stats["saved_entries"] = len(self._saved)
+        hits = stats["generated_hits"] + stats["saved_hits"]
+        stats["hit_rate"] = round(hits / stats["lookups"], 4) if stats["lookups"] else 0.0
+        stats["threshold"] = self.threshold
+        return stats
+
+
+def index_from_env() -> NearDuplicateIndex:
+    """Build the index from NEAR_DUPLICATE_* environment variables."""
+    return NearDuplicateIndex(
+        threshold=float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.6")),
+        max_generated=int(os.getenv("NEAR_DUPLICATE_MAX_GENERATED", "10000")),
+        enabled=os.getenv("NEAR_DUPLICATE_REUSE", "1") == "1",
+    )
@@ -0,0 +1,38 @@
+# backend/services/normalize.py
+"""
+Text normalisation shared by the backend.
+
+slug() applies the same rules as slug() in data/build_map_from_json.py, so
+keys computed here line up with the keys in category_map.json.
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, List
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def slug(text: str) -> str:
+    """Return a lowercase, accent-less, punctuation-less version of text."""
+    # Remove accents: café ➜ cafe
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    # Remove anything that's not a letter/number/space
+    text = _NON_WORD.sub(" ", text)
+    # Collapse multiple spaces to one, trim, and lowercase
+    return _SPACES.sub(" ", text).strip().lower()
+
+
+def normalize_ingredients(ingredients: Iterable[str]) -> List[str]:
+    """Slug every ingredient, drop empties and duplicates, and sort."""
+    return sorted({s for s in (slug(i) for i in ingredients) if s})
+
+
+def ingredient_key(ingredients: Iterable[str]) -> str:
+    """
+    Content address of an ingredient list: "Eggs, rice" and "rice,  EGGS!"
+    get the same key.
+    """
+    canonical = "\n".join(normalize_ingredients(ingredients))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
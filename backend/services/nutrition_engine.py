@@ -0,0 +1,231 @@
+# backend/services/nutrition_engine.py
+"""
+Local, deterministic recipe nutrition from USDA nutrient vectors.
+
+data/food_nutrients.json (written by data/build_map_from_json.py) holds
+every food's nutrients per 100 g and the gram weight of its household
+portions. An ingredient line such as "• 2 tbsp olive oil" is read as
+(quantity, unit, name); the name is matched to a food with the same
+exact / partial / fuzzy rules as ingredient categorisation, the quantity
+is turned into grams, and the recipe's nutrition is one
+(grams x nutrients-per-gram) product over all matched lines. When too few
+of the measured lines match a food (MIN_COVERAGE) the nutrition is unknown:
+every value is None rather than a misleading near-zero total.
+"""
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services import metrics
+from services.ingredient_index import IngredientIndex
+from services.normalize import slug
+from services.nutrition_matrix import NUTRIENTS
+
+FOOD_NUTRIENTS_FILE = Path("data/food_nutrients.json")
+
+# Weight and volume units, in grams (volumes as water when the food has
+# no portion of that name)
+UNIT_GRAMS = {
+    "g": 1, "kg": 1000, "oz": 28.35, "lb": 453.6, "ml": 1, "l": 1000, "fl oz": 29.57,
+    "cup": 240, "tbsp": 15, "tsp": 5,
+    "pint": 473, "quart": 946, "pinch": 0.3, "dash": 0.6,
+}
+# Countable units, with a typical weight used when the food has no portion
+# of that name
+COUNT_GRAMS = {
+    "clove": 5, "slice": 30, "piece": 50, "can": 400, "stalk": 40, "head": 500,
+    "bunch": 100, "sprig": 1, "handful": 30, "small": 100, "medium": 150, "large": 200,
+    "whole": 150,
+}
+UNIT_ALIASES = {
+    "tablespoon": "tbsp", "tbs": "tbsp", "tbl": "tbsp", "teaspoon": "tsp", "c": "cup",
+    "gram": "g", "kilogram": "kg", "ounce": "oz", "pound": "lb", "lbs": "lb",
+    "milliliter": "ml", "liter": "l", "fluid ounce": "fl oz", "fl. oz": "fl oz",
+}
+# Case matters for these: "T" is a tablespoon, "t" a teaspoon
+CASED_UNITS = {"T": "tbsp", "Tbsp": "tbsp", "t": "tsp"}
+# Portions tried, in order, for a bare count like "2 eggs"
+DEFAULT_PORTIONS = ("medium", "large", "whole", "each", "piece", "small")
+DEFAULT_GRAMS = 100.0
+# Share of the lines with a quantity that must match a food for the totals
+# to be reported at all
+MIN_COVERAGE = 0.5
+
+FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅛": 0.125}
+# "1/2" and "1 1/2" are tried before a plain number, which would take the numerator
+_QUANTITY = re.compile(
+    r"^(?:(?:(?P<whole>\d+)\s+)?(?P<num>\d+)\s*/\s*(?P<den>\d+)"
+    r"|(?P<number>\d+(?:\.\d+)?)?\s*(?P<frac>[½⅓⅔¼¾⅛])?)"
+    r"(?:\s*(?:-|–|to)\s*(?P<upper>\d+(?:\.\d+)?))?\s*"
+)
+# "(15 oz)" / "(15-ounce)" after the count: the size of each can or package
+_SIZE = re.compile(r"^\((?P<amount>\d+(?:\.\d+)?)\s*-?\s*(?P<unit>[a-zA-Z. ]+?)\)\s*")
+_BULLET = re.compile(r"^\s*(?:[•\-\*]|\d+\.(?!\d))\s*")
+_UNIT_WORD = re.compile(r"^([a-zA-Z]+\.?(?:\s+oz\b)?)\s*")
+_NAME_END = re.compile(r"[,(;]| for | to taste| or ")
+
+
+@dataclass(frozen=True)
+class IngredientLine:
+    text: str
+    quantity: Optional[float]
+    unit: str
+    name: str
+
+
+def canonical_unit(word: str) -> str:
+    """'Tablespoons' -> 'tbsp', 'cloves' -> 'clove', 'bunches' -> 'bunch', 'T' -> 'tbsp'."""
+    word = word.rstrip(".").strip()
+    if word in CASED_UNITS:
+        return CASED_UNITS[word]
+    word = " ".join(word.lower().split())
+    for candidate in (word, word[:-2] if word.endswith("es") else word, word[:-1] if word.endswith("s") else word):
+        candidate = UNIT_ALIASES.get(candidate, candidate)
+        if candidate in UNIT_GRAMS or candidate in COUNT_GRAMS:
+            return candidate
+    return UNIT_ALIASES.get(word, word)
+
+
+def parse_ingredient_line(line: str) -> Optional[IngredientLine]:
+    """'• 1 ½ cups cooked rice, warm' -> IngredientLine(1.5, 'cup', 'cooked rice')."""
+    text = _BULLET.sub("", line).strip()
+    if not text:
+        return None
+
+    match = _QUANTITY.match(text)
+    quantity = None
+    if match.group("number") or match.group("num") or match.group("frac"):
+        quantity = float(match.group("whole") or match.group("number") or 0)
+        if match.group("num"):
+            quantity += int(match.group("num")) / max(int(match.group("den")), 1)
+        elif match.group("frac"):
+            quantity += FRACTIONS[match.group("frac")]
+        if match.group("upper"):
+            # "2-3 cloves": take the middle
+            quantity = (quantity + float(match.group("upper"))) / 2
+    rest = text[match.end():]
+    size = _SIZE.match(rest)
+    size_unit = canonical_unit(size.group("unit")) if size else ""
+    # Any other aside before the unit ("1 (large) onion") is dropped
+    rest = re.sub(r"^\([^)]*\)\s*", "", rest)
+
+    unit = ""
+    unit_match = _UNIT_WORD.match(rest)
+    if unit_match:
+        word = canonical_unit(unit_match.group(1))
+        if word in UNIT_GRAMS or word in COUNT_GRAMS:
+            unit = word
+            rest = rest[unit_match.end():]
+    rest = re.sub(r"^of\s+", "", rest)
+
+    if size_unit in UNIT_GRAMS and unit not in UNIT_GRAMS:
+        # "2 (15 oz) cans beans" is 30 oz of beans, not two typical cans
+        quantity = (1 if quantity is None else quantity) * float(size.group("amount"))
+        unit = size_unit
+
+    name = slug(_NAME_END.split(rest, maxsplit=1)[0])
+    if not name:
+        return None
+    return IngredientLine(text=line.strip(), quantity=quantity, unit=unit, name=name)
+
+
+class NutritionEngine:
+    def __init__(self, table: Dict):
+        names = table["nutrients"]
+        columns = [names.index(name) for name, _, _ in NUTRIENTS]
+        foods = table["foods"]
+        self._keys = list(foods)
+        self._row = {key: i for i, key in enumerate(self._keys)}
+        # nutrients per gram, in nutrition_matrix.NUTRIENTS order
+        per_100g = np.array([foods[key]["per_100g"] for key in self._keys], dtype=float).reshape(len(self._keys), -1)
+        self._per_gram = per_100g[:, columns] / 100.0
+        self._portions = [
+            {canonical_unit(unit): grams for unit, grams in reversed(list(foods[key].get("portions", {}).items()))}
+            for key in self._keys
+        ]
+        self._index = IngredientIndex({key: key for key in self._keys})
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def grams(self, line: IngredientLine, row: int) -> Optional[float]:
+        """Weight of the line's quantity of food `row`, or None if it has no quantity."""
+        if line.quantity is None:
+            return None
+        portions = self._portions[row]
+        if line.unit in portions:
+            per_unit = portions[line.unit]
+        elif line.unit in UNIT_GRAMS:
+            per_unit = UNIT_GRAMS[line.unit]
+        elif line.unit in COUNT_GRAMS:
+            per_unit = COUNT_GRAMS[line.unit]
+        else:
+            per_unit = next((portions[p] for p in DEFAULT_PORTIONS if p in portions), None)
+            if per_unit is None:
+                per_unit = next(iter(portions.values()), DEFAULT_GRAMS)
+        return line.quantity * per_unit
+
+    def match(self, text: str) -> Tuple[Optional[IngredientLine], Optional[int], Optional[float]]:
+        line = parse_ingredient_line(text)
+        if line is None:
+            return None, None, None
+        found = self._index.categorize(line.name)
+        if found["key"] is None:
+            return line, None, None
+        row = self._row[found["key"]]
+        return line, row, self.grams(line, row)
+
+    def compute(self, lines: Sequence[str], servings: int = 1) -> Tuple[Dict, Dict]:
+        """
+        Nutrition per serving for the given ingredient lines, plus a
+        coverage report: which lines matched which food and how many grams,
+        which lines couldn't be used ("salt to taste", unknown foods) and
+        the share of lines with a quantity that matched. Below MIN_COVERAGE
+        every nutrient is None.
+        """
+        rows, grams, matched, skipped = [], [], [], []
+        unmatched = 0  # Lines with a quantity but no food
+        for text in lines:
+            if not text.strip():
+                continue
+            line, row, weight = self.match(text)
+            if line is None:
+                continue
+            if row is None or weight is None:
+                skipped.append(line.text)
+                unmatched += line.quantity is not None
+                continue
+            rows.append(row)
+            grams.append(weight)
+            matched.append({"line": line.text, "food": self._keys[row], "grams": round(weight, 1)})
+
+        share = len(matched) / (len(matched) + unmatched) if matched else 0.0
+        coverage = {"matched": matched, "skipped": skipped, "share": round(share, 3)}
+        if share < MIN_COVERAGE:
+            return {name: None for name, _, _ in NUTRIENTS}, coverage
+
+        totals = np.asarray(grams, dtype=float) @ self._per_gram[np.asarray(rows, dtype=np.intp)]
+        per_serving = totals / max(servings, 1)
+        nutrition = {
+            name: int(round(value)) if decimals == 0 else round(float(value), decimals)
+            for (name, decimals, _), value in zip(NUTRIENTS, per_serving)
+        }
+        return nutrition, coverage
+
+
+def ingredient_lines(*sections: str) -> List[str]:
+    return [line for section in sections for line in section.split("\n") if line.strip()]
+
+
+@lru_cache(maxsize=1)
+def get_nutrition_engine() -> Optional[NutritionEngine]:
+    """The shared engine, or None when food_nutrients.json hasn't been built."""
+    if not FOOD_NUTRIENTS_FILE.exists():
+        return None
+    with metrics.load_timer("nutrition engine"), open(FOOD_NUTRIENTS_FILE, encoding="utf-8") as f:
+        return NutritionEngine(json.load(f))
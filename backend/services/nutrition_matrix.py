@@ -0,0 +1,219 @@
+# backend/services/nutrition_matrix.py
+"""
+Columnar nutrition data for saved recipes.
+
+Every saved recipe carries the 31 DetailedNutrition fields. This module
+keeps them as one NumPy matrix (recipes x nutrients) next to the recipe
+store, caught up incrementally from store.rows_since() like CategoryCache.
+Totals for any selection of recipes and servings are then a single
+weighted sum over rows instead of a loop over 31 fields per recipe.
+"""
+import datetime
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.recipe_store import SQLiteRecipeStore
+
+# (field, decimals kept when rounding, daily value or None). Field order is
+# the DetailedNutrition order; daily values are the FDA adult reference
+# values, with vitamins A and D in IU because that's what we store.
+NUTRIENTS: Tuple[Tuple[str, int, Optional[float]], ...] = (
+    ("calories", 0, 2000),
+    ("protein", 1, 50),
+    ("total_carbs", 1, 275),
+    ("net_carbs", 1, None),
+    ("fiber", 1, 28),
+    ("total_fat", 1, 78),
+    ("saturated_fat", 1, 20),
+    ("monounsaturated_fat", 1, None),
+    ("polyunsaturated_fat", 1, None),
+    ("trans_fat", 1, None),
+    ("cholesterol", 1, 300),
+    ("sodium", 0, 2300),
+    ("potassium", 0, 4700),
+    ("total_sugars", 1, None),
+    ("added_sugars", 1, 50),
+    ("vitamin_a", 1, 3000),
+    ("vitamin_c", 1, 90),
+    ("vitamin_d", 1, 800),
+    ("vitamin_e", 1, 15),
+    ("vitamin_k", 1, 120),
+    ("thiamin", 1, 1.2),
+    ("riboflavin", 1, 1.3),
+    ("niacin", 1, 16),
+    ("vitamin_b6", 1, 1.7),
+    ("folate", 1, 400),
+    ("vitamin_b12", 1, 2.4),
+    ("calcium", 0, 1300),
+    ("iron", 1, 18),
+    ("magnesium", 0, 420),
+    ("zinc", 1, 11),
+    ("selenium", 1, 55),
+)
+NUTRIENT_NAMES = tuple(name for name, _, _ in NUTRIENTS)
+DAILY_VALUES = np.array([dv if dv is not None else np.nan for _, _, dv in NUTRIENTS])
+
+GROUP_BY = ("day", "week", "category")
+
+
+def per_serving(nutrition: Dict, servings: int) -> Dict:
+    """A recipe's nutrition divided by its servings, rounded like the UI shows it."""
+    result = {}
+    for name, decimals, _ in NUTRIENTS:
+        value = nutrition.get(name, 0) / servings
+        result[name] = round(value) if decimals == 0 else round(value, decimals)
+    return result
+
+
+def _as_dict(vector: np.ndarray) -> Dict[str, float]:
+    return {
+        name: round(float(value)) if decimals == 0 else round(float(value), decimals)
+        for (name, decimals, _), value in zip(NUTRIENTS, vector)
+    }
+
+
+def _percent_dv(vector: np.ndarray) -> Dict[str, Optional[float]]:
+    with np.errstate(invalid="ignore"):
+        percent = np.round(vector / DAILY_VALUES * 100, 1)
+    return {name: (None if np.isnan(p) else float(p)) for name, p in zip(NUTRIENT_NAMES, percent)}
+
+
+class NutritionMatrix:
+    def __init__(self, store: SQLiteRecipeStore, initial_capacity: int = 256):
+        self.store = store
+        self._lock = threading.Lock()
+        self._values = np.zeros((initial_capacity, len(NUTRIENTS)))
+        self._servings = np.ones(initial_capacity)
+        self._row_by_key: Dict[Tuple[str, str], int] = {}
+        self._categories: List[str] = []
+        self._size = 0
+        self._version = -1
+        self._last_pk = 0
+
+    def __len__(self) -> int:
+        self._sync()
+        return self._size
+
+    def _sync(self):
+        version = self.store.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            for pk, category, recipe in self.store.rows_since(self._last_pk):
+                self._append(category, recipe)
+                self._last_pk = pk
+            self._version = version
+
+    def _append(self, category: str, recipe: Dict):
+        if self._size == len(self._values):
+            self._values = np.resize(self._values, (2 * len(self._values), len(NUTRIENTS)))
+            self._servings = np.resize(self._servings, 2 * len(self._servings))
+        row = self._size
+        nutrition = recipe.get("nutrition") or {}
+        self._values[row] = [float(nutrition.get(name) or 0) for name in NUTRIENT_NAMES]
+        self._servings[row] = max(int(recipe.get("servings") or 1), 1)
+        self._row_by_key[(category, str(recipe.get("id")))] = row
+        self._categories.append(category)
+        self._size += 1
+
+    # -- aggregation ------------------------------------------------------
+
+    def aggregate(
+        self,
+        items: Sequence[Dict],
+        group_by: Optional[str] = None,
+    ) -> Dict:
+        """
+        Totals for a selection of recipes. Each item is
+        {"category", "id", "servings" (eaten, default 1), "date" (optional)}.
+
+        The nutrition of a recipe is for the whole recipe, so each item
+        contributes servings_eaten / recipe_servings of its row. With
+        group_by "day", "week" (ISO week) or "category" the same totals are
+        also broken down per group; day and week groups carry a daily
+        average over the days that have entries.
+        """
+        self._sync()
+        rows, weights, missing = [], [], []
+        for item in items:
+            row = self._row_by_key.get((item["category"], str(item["id"])))
+            if row is None:
+                missing.append({"category": item["category"], "id": str(item["id"])})
+                continue
+            rows.append(row)
+            weights.append(float(item.get("servings", 1)))
+        if missing:
+            raise KeyError(missing)
+
+        rows = np.array(rows, dtype=np.intp)
+        weights = np.array(weights) / self._servings[rows]
+        # One (items x nutrients) product: every item's share of its recipe
+        contributions = self._values[rows] * weights[:, None]
+        totals = contributions.sum(axis=0)
+
+        result = {
+            "items": len(rows),
+            "totals": _as_dict(totals),
+            "percent_daily_value": _percent_dv(totals),
+        }
+        if group_by:
+            result["groups"] = self._groups(items, rows, contributions, group_by)
+        return result
+
+    def _groups(self, items: Sequence[Dict], rows: np.ndarray, contributions: np.ndarray, group_by: str) -> List[Dict]:
+        if group_by == "category":
+            keys = [self._categories[row] for row in rows]
+            days = None
+        else:
+            dates = [_as_date(item.get("date")) for item in items]
+            if group_by == "day":
+                keys = [d.isoformat() for d in dates]
+            else:
+                keys = ["%d-W%02d" % d.isocalendar()[:2] for d in dates]
+            days = [d.isoformat() for d in dates]
+
+        labels, codes = np.unique(np.array(keys, dtype=object), return_inverse=True)
+        sums = np.zeros((len(labels), len(NUTRIENTS)))
+        np.add.at(sums, codes, contributions)
+
+        groups = []
+        for g, label in enumerate(labels):
+            group = {"key": label, "items": int((codes == g).sum()), "totals": _as_dict(sums[g])}
+            if days is not None:
+                logged_days = len({days[i] for i in np.flatnonzero(codes == g)})
+                daily = sums[g] / logged_days
+                group["days"] = logged_days
+                group["daily_average"] = _as_dict(daily)
+                group["percent_daily_value"] = _percent_dv(daily)
+            else:
+                group["percent_daily_value"] = _percent_dv(sums[g])
+            groups.append(group)
+        return groups
+
+    def category_summary(self) -> List[Dict]:
+        """Per category: number of recipes and mean nutrition per serving."""
+        self._sync()
+        if not self._size:
+            return []
+        per_serving_rows = self._values[:self._size] / self._servings[:self._size, None]
+        labels, codes = np.unique(np.array(self._categories, dtype=object), return_inverse=True)
+        sums = np.zeros((len(labels), len(NUTRIENTS)))
+        np.add.at(sums, codes, per_serving_rows)
+        counts = np.bincount(codes, minlength=len(labels))
+        means = sums / counts[:, None]
+        return [
+            {"category": label, "recipes": int(counts[g]), "mean_per_serving": _as_dict(means[g])}
+            for g, label in enumerate(labels)
+        ]
+
+
+def _as_date(value) -> datetime.date:
+    if value is None:
+        return datetime.date.today()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
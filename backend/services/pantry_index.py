@@ -0,0 +1,240 @@
+# backend/services/pantry_index.py
+"""
+"What can I cook now": saved recipes ranked by how much of them a grocery
+list covers, without asking the model.
+
+Every saved recipe is reduced to the ingredient terms it needs: the names
+in its "Ingredients:" lines plus the list in its summary ("A recipe created
+using: ..."), normalised with ingredient_term() and without pantry staples
+(salt, pepper, oil, water). An inverted index maps each term to the rows of
+the recipes that need it, so a query only touches the postings of the terms
+on the grocery list:
+
+    counts[postings[term]] += 1   for every matched term
+    coverage = counts / terms per recipe
+
+Postings are int32 arrays that NumPy reads without copying, so a query
+costs the total length of the matched postings plus one vector pass over
+all recipes, which stays in the low milliseconds at hundreds of thousands of
+recipes (benchmarks/bench_pantry.py).
+
+A grocery item matches a recipe term when they are the same term, when the
+item is more specific ("chicken breast" covers "chicken"), or when the term
+is a kind of the item ("tomato" covers "cherry tomato", but "rice" does not
+cover "rice vinegar").
+
+Like CategoryCache, the index follows the store's version counter and
+reads only the rows saved since its last sync, so every save_recipe (from
+any worker) is in the next query's results without a rebuild.
+"""
+import re
+import threading
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services import metrics
+from services.normalize import slug
+from services.nutrition_engine import parse_ingredient_line
+from services.recipe_store import SQLiteRecipeStore
+
+# Assumed to be in every kitchen; never required, never reported missing
+STAPLES = frozenset({
+    "salt", "pepper", "black pepper", "salt and pepper", "sea salt", "kosher salt",
+    "water", "oil", "olive oil", "vegetable oil", "cooking oil", "cooking spray",
+})
+# Preparation and size words that don't change what the ingredient is
+DESCRIPTORS = frozenset({
+    "fresh", "freshly", "chopped", "diced", "minced", "sliced", "grated", "shredded",
+    "crushed", "peeled", "cubed", "halved", "quartered", "trimmed", "finely", "roughly",
+    "thinly", "large", "medium", "small", "boneless", "skinless", "ripe", "raw",
+    "cooked", "frozen", "canned", "organic", "extra", "virgin", "ground", "dried",
+    "optional", "whole", "unsalted", "low", "sodium", "about", "of",
+})
+SUMMARY_PREFIX = "A recipe created using:"
+
+PANTRY_SECONDS = metrics.Histogram("guaco_pantry_search_seconds", "Pantry index query time")
+_HEADER = re.compile(r"^[A-Z][^:•]*:")
+
+
+def singular(word: str) -> str:
+    if len(word) <= 3 or word.endswith("ss"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def ingredient_term(name: str) -> str:
+    """'2 Fresh Roma Tomatoes' -> 'roma tomato'; '' if nothing is left."""
+    words = [singular(w) for w in slug(name).split() if w not in DESCRIPTORS and not w.isdigit()]
+    return " ".join(words)
+
+
+def recipe_terms(recipe: Dict) -> List[str]:
+    """The non-staple ingredient terms a saved recipe needs."""
+    names: List[str] = []
+    summary = recipe.get("summary") or ""
+    if summary.startswith(SUMMARY_PREFIX):
+        names += summary[len(SUMMARY_PREFIX):].split(",")
+
+    in_ingredients = False
+    for line in (recipe.get("instructions") or "").split("\n"):
+        line = line.strip()
+        if _HEADER.match(line):
+            in_ingredients = line.startswith("Ingredients")
+            continue
+        if in_ingredients and line:
+            name = _line_name(line)
+            if name:
+                names.append(name)
+
+    terms = []
+    for name in names:
+        term = ingredient_term(name)
+        if term and term not in STAPLES and term not in terms:
+            terms.append(term)
+    return terms
+
+
+@lru_cache(maxsize=65536)
+def _line_name(line: str) -> str:
+    # The same "• 1 onion, diced" line turns up in thousands of recipes
+    parsed = parse_ingredient_line(line)
+    return parsed.name if parsed is not None else ""
+
+
+def covers(item_words: Set[str], term_words: Tuple[str, ...]) -> bool:
+    """Does a grocery item (as a word set) cover a recipe term?"""
+    term_set = set(term_words)
+    if term_set <= item_words:
+        return True
+    return item_words <= term_set and term_words[-1] in item_words
+
+
+class PantryIndex:
+    def __init__(self, store: SQLiteRecipeStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = -1
+        self._last_pk = 0
+        # Per recipe row
+        self._keys: List[Tuple[str, str]] = []  # (category, id)
+        self._titles: List[str] = []
+        self._recipe_terms: List[Tuple[int, ...]] = []
+        self._sizes = array("i")
+        self._category_of = array("i")
+        self._category_ids: Dict[str, int] = {}
+        # Per term
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[Tuple[str, ...]] = []  # words of each term
+        self._postings: List[array] = []
+        self._terms_by_word: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        self._sync()
+        return len(self._keys)
+
+    def _sync(self):
+        version = self.store.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            for pk, category, recipe in self.store.rows_since(self._last_pk):
+                self._add(category, recipe)
+                self._last_pk = pk
+            self._version = version
+
+    def _add(self, category: str, recipe: Dict):
+        row = len(self._keys)
+        term_ids = tuple(self._term_id(term) for term in recipe_terms(recipe))
+        for term_id in term_ids:
+            self._postings[term_id].append(row)
+        self._keys.append((category, str(recipe.get("id"))))
+        self._titles.append((recipe.get("title") or "").strip())
+        self._recipe_terms.append(term_ids)
+        self._sizes.append(len(term_ids))
+        self._category_of.append(self._category_ids.setdefault(category, len(self._category_ids)))
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._terms)
+            words = tuple(term.split())
+            self._terms.append(words)
+            self._postings.append(array("i"))
+            for word in words:
+                self._terms_by_word.setdefault(word, set()).add(term_id)
+        return term_id
+
+    def matching_terms(self, items: Iterable[str]) -> Set[int]:
+        """Ids of every indexed term some grocery item covers."""
+        matched: Set[int] = set()
+        for item in items:
+            words = set(ingredient_term(item).split())
+            candidates = set().union(*(self._terms_by_word.get(word, ()) for word in words)) if words else set()
+            matched.update(t for t in candidates if covers(words, self._terms[t]))
+        return matched
+
+    def search(
+        self,
+        items: List[str],
+        min_coverage: float = 0.5,
+        category: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Saved recipes whose terms the items cover at least min_coverage of,
+        best coverage first (then most matched terms, then oldest). Returns
+        one page of results and the number of recipes that qualified.
+        """
+        self._sync()
+        with self._lock, PANTRY_SECONDS.time():
+            n = len(self._keys)
+            matched = self.matching_terms(items)
+            if not n or not matched:
+                return [], 0
+            counts = np.zeros(n, dtype=np.int32)
+            for term_id in matched:
+                # Rows in a posting are unique, so plain fancy-index += is enough
+                counts[np.frombuffer(self._postings[term_id], dtype=np.int32)] += 1
+            # Copied: a live view would stop _sync() from appending to the array
+            sizes = np.array(self._sizes, dtype=np.int32)
+            coverage = counts / np.maximum(sizes, 1)
+
+            qualifies = (counts > 0) & (coverage >= min_coverage)
+            if category is not None:
+                category_id = self._category_ids.get(category)
+                if category_id is None:
+                    return [], 0
+                qualifies &= np.array(self._category_of, dtype=np.int32) == category_id
+            rows = np.flatnonzero(qualifies)
+            total = len(rows)
+            if len(rows) > limit:
+                # Coverage first, matched terms as the tie-break
+                score = coverage[rows] + counts[rows] * 1e-6
+                rows = rows[np.argpartition(-score, limit - 1)[:limit]]
+            rows = rows[np.lexsort((rows, -counts[rows], -coverage[rows]))]
+
+            results = []
+            for row in rows.tolist():
+                terms = self._recipe_terms[row]
+                category_name, recipe_id = self._keys[row]
+                results.append({
+                    "category": category_name,
+                    "id": recipe_id,
+                    "title": self._titles[row],
+                    "coverage": round(float(coverage[row]), 3),
+                    "matched": [" ".join(self._terms[t]) for t in terms if t in matched],
+                    "missing": [" ".join(self._terms[t]) for t in terms if t not in matched],
+                })
+            return results, total
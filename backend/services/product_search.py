@@ -0,0 +1,116 @@
+# backend/services/product_search.py
+"""
+BM25 full-text search over the grocery catalog.
+
+Title, Feature and Product Description are tokenised with slug() (the
+rules used for category_map.json keys) and indexed together, with Title
+and Feature counting more than the description. The collection never
+changes after startup, so each posting stores its final BM25 contribution:
+a query adds up a few precomputed floats per term, then applies the
+category / price / rating filters and keeps the best `limit` rows.
+"""
+import heapq
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from services import metrics
+from services.grocery_catalog import CATEGORY_FIELD, GroceryCatalog, get_grocery_catalog
+from services.normalize import slug
+
+# Term-frequency weight of each indexed column
+FIELD_WEIGHTS = {"Title": 3.0, "Feature": 1.5, "Product Description": 1.0}
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return slug(text).split()
+
+
+class ProductSearch:
+    def __init__(self, catalog: GroceryCatalog):
+        self.catalog = catalog
+        weights = [(catalog.columns[f], w) for f, w in FIELD_WEIGHTS.items() if f in catalog.columns]
+
+        # Weighted term frequencies and length of every document
+        doc_terms: List[Dict[str, float]] = []
+        lengths: List[float] = []
+        for i in range(len(catalog)):
+            tf: Dict[str, float] = {}
+            length = 0.0
+            for column, weight in weights:
+                tokens = tokenize(column[i])
+                length += weight * len(tokens)
+                for token in tokens:
+                    tf[token] = tf.get(token, 0.0) + weight
+            doc_terms.append(tf)
+            lengths.append(length)
+
+        n = len(doc_terms)
+        average = (sum(lengths) / n) if n else 1.0
+        document_frequency: Dict[str, int] = {}
+        for tf in doc_terms:
+            for term in tf:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+
+        # term -> [(row, BM25 contribution)]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, tf in enumerate(doc_terms):
+            norm = K1 * (1 - B + B * lengths[i] / (average or 1.0))
+            for term, freq in tf.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                self._postings.setdefault(term, []).append((i, idf * freq * (K1 + 1) / (freq + norm)))
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Dict], int]:
+        """Best matches as dicts with a score, and how many rows matched in total."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            for row, contribution in self._postings.get(term, ()):
+                scores[row] = scores.get(row, 0.0) + contribution
+
+        catalog = self.catalog
+        categories = catalog.columns.get(CATEGORY_FIELD)
+        if category is not None or min_price is not None or max_price is not None or min_rating is not None:
+            prices, ratings = catalog.prices, catalog.ratings
+            scores = {
+                row: score for row, score in scores.items()
+                if (category is None or categories[row] == category)
+                and (min_price is None or (prices[row] is not None and prices[row] >= min_price))
+                and (max_price is None or (prices[row] is not None and prices[row] <= max_price))
+                and (min_rating is None or (ratings[row] is not None and ratings[row] >= min_rating))
+            }
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        results = [
+            {
+                "title": catalog.columns["Title"][row],
+                "category": categories[row],
+                "price": catalog.prices[row],
+                "rating": catalog.ratings[row],
+                "reviews": catalog.review_counts[row],
+                "score": round(score, 4),
+            }
+            for row, score in best
+        ]
+        return results, len(scores)
+
+
+@lru_cache(maxsize=1)
+def get_product_search() -> ProductSearch:
+    """The shared index over the shared catalog, built on first use."""
+    catalog = get_grocery_catalog()
+    with metrics.load_timer("product search index"):
+        return ProductSearch(catalog)
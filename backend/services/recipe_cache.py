@@ -0,0 +1,117 @@
+# backend/services/recipe_cache.py
+"""
+Process-local cache of the recipe store, grouped by category.
+
+Reads far outnumber writes, so every worker keeps the parsed recipes in
+memory. The store's version counter changes on every write (from any
+worker); when it moves we pull only the rows added since the last sync,
+so listing a category is a dict lookup instead of a query + JSON parse.
+
+Pages are also kept encoded (services/encoded_page.py) for the API. When a
+sync brings in new recipes, only the encoded pages of their categories are
+dropped; the other categories keep their bytes and ETags.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.encoded_page import EncodedPage, encode_page
+from services.recipe_store import SQLiteRecipeStore
+
+# Fields returned by the lightweight "summary" projection
+SUMMARY_FIELDS = ("id", "title", "summary")
+
+
+class CategoryCache:
+    def __init__(self, store: SQLiteRecipeStore, encoded_pages: int = 256):
+        self.store = store
+        self._lock = threading.Lock()
+        self._by_category: Dict[str, List[Dict]] = {}
+        self._version = -1
+        self._last_pk = 0
+        # (category, recipes in it, start, limit, summary) -> page, least recently used first
+        self._encoded: "OrderedDict[tuple, EncodedPage]" = OrderedDict()
+        self._encoded_size = encoded_pages
+
+    def _sync(self):
+        version = self.store.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            # The store is append-only, so catching up means reading the new rows
+            changed = set()
+            for pk, category, recipe in self.store.rows_since(self._last_pk):
+                self._by_category.setdefault(category, []).append(recipe)
+                changed.add(category)
+                self._last_pk = pk
+            for key in [key for key in self._encoded if key[0] in changed]:
+                del self._encoded[key]
+            self._version = version
+
+    def invalidate(self):
+        """Drop everything; the next read reloads from the store."""
+        with self._lock:
+            self._by_category = {}
+            self._encoded.clear()
+            self._version = -1
+            self._last_pk = 0
+
+    def list_category(self, category: str) -> List[Dict]:
+        self._sync()
+        return self._by_category.get(category, [])
+
+    def page(
+        self,
+        category: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return one page of a category and the cursor for the next page
+        (None on the last page). Cursors are positions in the category,
+        which stay valid because recipes are only ever appended.
+        """
+        recipes = self.list_category(category)
+        start = decode_cursor(cursor)
+        end = len(recipes) if limit is None else min(start + limit, len(recipes))
+        items = recipes[start:end]
+        if summary:
+            items = [{field: recipe.get(field) for field in SUMMARY_FIELDS} for recipe in items]
+        next_cursor = str(end) if end < len(recipes) else None
+        return items, next_cursor
+
+    def encoded_page(
+        self,
+        category: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+    ) -> EncodedPage:
+        """page(), encoded once per state of the category."""
+        # The category's length pins its state: a page encoded from an older
+        # list can't be served after a save, even if it races the sync
+        key = (category, len(self.list_category(category)), decode_cursor(cursor), limit, summary)
+        with self._lock:
+            page = self._encoded.get(key)
+            if page is not None:
+                self._encoded.move_to_end(key)
+                return page
+
+        items, next_cursor = self.page(category, limit, cursor, summary)
+        page = encode_page(items, next_cursor, key[1])
+        with self._lock:
+            self._encoded[key] = page
+            while len(self._encoded) > self._encoded_size:
+                self._encoded.popitem(last=False)
+        return page
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if cursor is None or cursor == "":
+        return 0
+    if not cursor.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return int(cursor)
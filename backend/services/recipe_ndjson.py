@@ -0,0 +1,130 @@
+# backend/services/recipe_ndjson.py
+"""
+Bulk export and import of the recipe store as NDJSON (one recipe per line).
+
+Export reads the store in pk-ordered chunks and yields each chunk as soon
+as it's read, so a response of any size needs one chunk of memory.
+
+Import reads the request body as it arrives, splits it into lines and, every
+IMPORT_BATCH_SIZE lines, validates the batch and stores the valid recipes in
+one transaction (SQLiteRecipeStore.add_many). Validation and the insert run
+in a worker thread so the event loop keeps serving other requests. Bad lines
+don't stop the import: each one is counted and the first IMPORT_MAX_ERRORS
+are listed with their line number. Batches already committed stay committed
+if the import fails part way.
+
+Settings (environment variables):
+  IMPORT_BATCH_SIZE      recipes validated and committed together  (default 1000)
+  IMPORT_MAX_ERRORS      per-line errors listed in the report     (default 100)
+  IMPORT_MAX_LINE_BYTES  longest line accepted                    (default 1000000)
+  EXPORT_CHUNK_SIZE      recipes read per query on export         (default 1000)
+"""
+import asyncio
+import os
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services import metrics
+from services.recipe_store import SQLiteRecipeStore
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", "1000000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+IMPORTED = metrics.Counter("guaco_recipe_import_lines_total", "Lines read by bulk recipe imports", ("outcome",))
+
+# A line's bytes -> (category, recipe to store); raises ValueError when invalid
+LineParser = Callable[[bytes], Tuple[str, Dict]]
+
+
+def export_ndjson(store: SQLiteRecipeStore, category: Optional[str] = None) -> Iterator[bytes]:
+    """Every stored recipe (of one category, if given) as NDJSON, one chunk at a time."""
+    for chunk in store.export_chunks(category, EXPORT_CHUNK_SIZE):
+        yield ("\n".join(chunk) + "\n").encode("utf-8")
+
+
+async def ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = IMPORT_MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    (line number, line) for every non-blank line of a byte stream, counting
+    from 1. A line longer than max_line_bytes comes through as None, without
+    ever being held in memory whole.
+    """
+    number, pending, too_long = 0, b"", False
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            number += 1
+            if too_long or len(line) > max_line_bytes:
+                too_long = False
+                yield number, None
+            elif line.strip():
+                yield number, line
+        if len(pending) > max_line_bytes:
+            pending, too_long = b"", True
+    if too_long or len(pending) > max_line_bytes:
+        yield number + 1, None
+    elif pending.strip():
+        yield number + 1, pending
+
+
+class BulkImport:
+    def __init__(
+        self,
+        store: SQLiteRecipeStore,
+        parse: LineParser,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        max_errors: int = IMPORT_MAX_ERRORS,
+        max_line_bytes: int = IMPORT_MAX_LINE_BYTES,
+    ):
+        self.store = store
+        self.parse = parse
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.max_line_bytes = max_line_bytes
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def _fail(self, line_number: int, message: str):
+        self.failed += 1
+        IMPORTED.inc(outcome="failed")
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_number, "error": message})
+
+    def _commit(self, batch: List[Tuple[int, bytes]]):
+        items = []
+        for line_number, line in batch:
+            try:
+                items.append(self.parse(line))
+            except ValueError as e:
+                self._fail(line_number, str(e))
+        with metrics.STORE_SECONDS.time(operation="import"):
+            self.store.add_many(items)
+        self.imported += len(items)
+        IMPORTED.inc(len(items), outcome="imported")
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> Dict:
+        """Import a whole NDJSON body and return the report."""
+        batch: List[Tuple[int, bytes]] = []
+        async for line_number, line in ndjson_lines(chunks, self.max_line_bytes):
+            if line is None:
+                self._fail(line_number, f"Line is longer than {self.max_line_bytes} bytes")
+                continue
+            batch.append((line_number, line))
+            if len(batch) >= self.batch_size:
+                await asyncio.to_thread(self._commit, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self._commit, batch)
+        return self.report()
+
+    def report(self) -> Dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
@@ -0,0 +1,103 @@
+# backend/services/recipe_schema.py
+"""
+Pydantic models for a generated recipe.
+
+RecipeResponse is what the generate endpoints return. In structured
+generation mode the model is asked for exactly these fields as one compact
+JSON object and its reply is validated straight into RecipeResponse: the
+list-valued ingredients / spices / instructions it sends are joined into
+the same bullet and numbered text the text mode produces, and full_text
+is left out (render_text() rebuilds it when a caller wants it).
+"""
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, field_validator, model_validator
+
+
+class NutritionData(BaseModel):
+    calories: Optional[int] = None
+    protein: Optional[float] = None
+    total_carbs: Optional[float] = None
+    net_carbs: Optional[float] = None
+    fiber: Optional[float] = None
+    total_fat: Optional[float] = None
+    saturated_fat: Optional[float] = None
+    monounsaturated_fat: Optional[float] = None
+    polyunsaturated_fat: Optional[float] = None
+    trans_fat: Optional[float] = None
+    cholesterol: Optional[float] = None
+    total_sugars: Optional[float] = None
+    added_sugars: Optional[float] = None
+    sodium: Optional[float] = None
+    potassium: Optional[float] = None
+    calcium: Optional[float] = None
+    iron: Optional[float] = None
+    magnesium: Optional[float] = None
+    zinc: Optional[float] = None
+    selenium: Optional[float] = None
+    vitamin_a: Optional[float] = None
+    vitamin_c: Optional[float] = None
+    vitamin_d: Optional[float] = None
+    vitamin_e: Optional[float] = None
+    vitamin_k: Optional[float] = None
+    thiamin: Optional[float] = None
+    riboflavin: Optional[float] = None
+    niacin: Optional[float] = None
+    vitamin_b6: Optional[float] = None
+    vitamin_b12: Optional[float] = None
+    folate: Optional[float] = None
+
+    @field_validator("calories", mode="before")
+    @classmethod
+    def _whole_calories(cls, value):
+        return round(value) if isinstance(value, float) else value
+
+    @model_validator(mode="after")
+    def _net_carbs(self):
+        # Same rule as the text parser
+        if self.net_carbs is None and self.total_carbs is not None and self.fiber is not None:
+            self.net_carbs = self.total_carbs - self.fiber
+        return self
+
+
+class RecipeResponse(BaseModel):
+    title: str
+    prep_time: str
+    cook_time: str
+    servings: int
+    ingredients: str
+    spices: str
+    instructions: str
+    nutrition: NutritionData
+    full_text: Optional[str] = None
+
+    @field_validator("prep_time", "cook_time", mode="before")
+    @classmethod
+    def _minutes(cls, value):
+        return str(value)
+
+    @field_validator("ingredients", "spices", mode="before")
+    @classmethod
+    def _bullets(cls, value: Union[str, List[str]]):
+        if isinstance(value, list):
+            return "\n".join(f"• {item}" for item in value)
+        return value
+
+    @field_validator("instructions", mode="before")
+    @classmethod
+    def _numbered(cls, value: Union[str, List[str]]):
+        if isinstance(value, list):
+            return "\n".join(f"{i}. {step}" for i, step in enumerate(value, start=1))
+        return value
+
+    def render_text(self) -> str:
+        """The recipe in the text mode's layout, for clients that show full_text."""
+        return (
+            f"Title: {self.title}\n\n"
+            f"Prep Time: {self.prep_time} minutes\n"
+            f"Cook Time: {self.cook_time} minutes\n"
+            f"Servings: {self.servings}\n\n"
+            f"Ingredients:\n{self.ingredients}\n\n"
+            f"Spices & Seasonings:\n{self.spices}\n\n"
+            f"Instructions:\n{self.instructions}\n"
+        )
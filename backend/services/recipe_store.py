@@ -0,0 +1,320 @@
+# backend/services/recipe_store.py
+"""
+Recipe storage backed by SQLite in WAL mode.
+
+Replaces the old "load all of recipes.json, append one dict, rewrite the
+whole file" approach. Inserts are a single indexed INSERT inside a short
+write transaction, lookups by category / id hit an index, and several
+uvicorn workers can share the same database file safely.
+
+One-shot migration from the legacy JSON file:
+
+> python -m services.recipe_store data/recipes.json data/recipes.db
+"""
+import json
+import logging
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from services.encoded_page import dumps
+
+logger = logging.getLogger("guaco.store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    pk        INTEGER PRIMARY KEY AUTOINCREMENT,
+    category  TEXT NOT NULL,
+    recipe_id TEXT NOT NULL,
+    data      TEXT NOT NULL,
+    UNIQUE (category, recipe_id)
+);
+CREATE INDEX IF NOT EXISTS recipes_by_category ON recipes (category, pk);
+CREATE TABLE IF NOT EXISTS categories (
+    name    TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class RecipeRepository(ABC):
+    """The small interface the API needs from a recipe store."""
+
+    @abstractmethod
+    def add(self, category: str, recipe: Dict) -> Dict:
+        """Store a recipe under category, assign it an id and return it."""
+
+    @abstractmethod
+    def get(self, category: str, recipe_id: str) -> Optional[Dict]:
+        """Return one recipe, or None if it doesn't exist."""
+
+    @abstractmethod
+    def list_category(self, category: str) -> List[Dict]:
+        """Return every recipe in a category, oldest first."""
+
+    @abstractmethod
+    def categories(self) -> List[str]:
+        """Return the names of all categories that have recipes."""
+
+    @abstractmethod
+    def version(self) -> int:
+        """Return a counter that changes on every write."""
+
+
+class SQLiteRecipeStore(RecipeRepository):
+    """RecipeRepository on a single SQLite file, safe across processes."""
+
+    def __init__(self, path: Path, busy_timeout_ms: int = 5000):
+        self.path = Path(path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+
+    # -- connections ------------------------------------------------------
+    # sqlite3 connections can't be shared between threads, and FastAPI runs
+    # sync routes in a thread pool, so every thread gets its own connection.
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self):
+        """
+        Open a write transaction. BEGIN IMMEDIATE takes the write lock up
+        front, so two workers saving at once queue up instead of losing
+        each other's inserts.
+        """
+        return _WriteTransaction(self._conn())
+
+    # -- writes -----------------------------------------------------------
+
+    def add(self, category: str, recipe: Dict) -> Dict:
+        with self._write() as conn:
+            return self._insert(conn, category, recipe)
+
+    def add_many(self, items: List[Tuple[str, Dict]]) -> List[Dict]:
+        """
+        Store several (category, recipe) pairs in one transaction: one id
+        reservation per category, one executemany and one version bump,
+        however many recipes there are.
+        """
+        if not items:
+            return []
+        with self._write() as conn:
+            next_ids = {
+                category: self._reserve_ids(conn, category, count)
+                for category, count in Counter(category for category, _ in items).items()
+            }
+            stored, rows = [], []
+            for category, recipe in items:
+                recipe_id = str(next_ids[category])
+                next_ids[category] += 1
+                stored.append({**recipe, "id": recipe_id})
+                rows.append((category, recipe_id, dumps(stored[-1]).decode("utf-8")))
+            conn.executemany("INSERT INTO recipes (category, recipe_id, data) VALUES (?, ?, ?)", rows)
+            _bump_version(conn)
+            return stored
+
+    def _insert(self, conn: sqlite3.Connection, category: str, recipe: Dict) -> Dict:
+        recipe_id = self._next_id(conn, category)
+        stored = {**recipe, "id": recipe_id}
+        conn.execute(
+            "INSERT INTO recipes (category, recipe_id, data) VALUES (?, ?, ?)",
+            (category, recipe_id, dumps(stored).decode("utf-8")),
+        )
+        _bump_version(conn)
+        return stored
+
+    @staticmethod
+    def _next_id(conn: sqlite3.Connection, category: str) -> str:
+        return str(SQLiteRecipeStore._reserve_ids(conn, category, 1))
+
+    @staticmethod
+    def _reserve_ids(conn: sqlite3.Connection, category: str, count: int) -> int:
+        """Claim count consecutive ids in category; returns the first."""
+        # Same ids as the old JSON store: "1", "2", ... per category
+        row = conn.execute("SELECT next_id FROM categories WHERE name = ?", (category,)).fetchone()
+        next_id = row[0] if row else 1
+        conn.execute(
+            "INSERT INTO categories (name, next_id) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET next_id = excluded.next_id",
+            (category, next_id + count),
+        )
+        return next_id
+
+    # -- reads ------------------------------------------------------------
+
+    def get(self, category: str, recipe_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT data FROM recipes WHERE category = ? AND recipe_id = ?",
+            (category, recipe_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_category(self, category: str) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT data FROM recipes WHERE category = ? ORDER BY pk", (category,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def categories(self) -> List[str]:
+        rows = self._conn().execute("SELECT DISTINCT category FROM recipes ORDER BY category")
+        return [name for (name,) in rows]
+
+    def version(self) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def rows_since(self, after_pk: int = 0) -> Iterator[Tuple[int, str, Dict]]:
+        """
+        Yield (pk, category, recipe) for every row added after after_pk.
+        In-memory indexes use this to catch up with writes made by other
+        workers without re-reading the whole store.
+        """
+        rows = self._conn().execute(
+            "SELECT pk, category, data FROM recipes WHERE pk > ? ORDER BY pk", (after_pk,)
+        )
+        for pk, category, data in rows:
+            yield pk, category, json.loads(data)
+
+    def export_chunks(self, category: Optional[str] = None, chunk_size: int = 1000) -> Iterator[List[str]]:
+        """
+        Yield the stored JSON of every recipe (optionally of one category),
+        oldest first, chunk_size rows at a time. Each chunk is its own short
+        query keyed on pk, so no read stays open between chunks and rows
+        saved during an export are simply included at the end.
+        """
+        query = "SELECT pk, data FROM recipes WHERE pk > ?"
+        if category is not None:
+            query += " AND category = ?"
+        query += " ORDER BY pk LIMIT ?"
+        after_pk = 0
+        while True:
+            params = (after_pk, category, chunk_size) if category is not None else (after_pk, chunk_size)
+            rows = self._conn().execute(query, params).fetchall()
+            if not rows:
+                return
+            after_pk = rows[-1][0]
+            yield [data for _, data in rows]
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+    # -- migration --------------------------------------------------------
+
+    def migrate_from_json(self, json_path: Path) -> int:
+        """
+        Import the legacy {category: [recipe, ...]} file once. Recipes keep
+        their ids, except that a recipe whose id is already taken in its
+        category (the old len + 1 ids could repeat) gets the next free one.
+        Returns the number of recipes imported (0 if the file is missing or
+        the migration already ran). A file that can't be read is left for
+        the next start to try again.
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+
+        with self._write() as conn:
+            done = conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone()
+            if done:
+                return 0
+
+            try:
+                with open(json_path, "r") as f:
+                    legacy = json.load(f)
+                if not isinstance(legacy, dict):
+                    raise ValueError("expected an object of categories")
+            except (OSError, ValueError) as e:
+                logger.warning("Could not read %s for migration, will retry on the next start: %s", json_path, e)
+                return 0
+
+            imported = 0
+            for category, recipes in legacy.items():
+                collided = []
+                for position, recipe in enumerate(recipes, start=1):
+                    recipe_id = str(recipe.get("id", position))
+                    cur = conn.execute(
+                        "INSERT OR IGNORE INTO recipes (category, recipe_id, data) VALUES (?, ?, ?)",
+                        (category, recipe_id, json.dumps({**recipe, "id": recipe_id})),
+                    )
+                    if cur.rowcount:
+                        imported += 1
+                    else:
+                        collided.append(recipe)
+
+                # New ids continue after the highest one in use, whatever the gaps
+                highest = conn.execute(
+                    "SELECT COALESCE(MAX(CAST(recipe_id AS INTEGER)), 0) FROM recipes WHERE category = ?",
+                    (category,),
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO categories (name, next_id) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET next_id = MAX(next_id, excluded.next_id)",
+                    (category, highest + 1),
+                )
+
+                if collided:
+                    first = self._reserve_ids(conn, category, len(collided))
+                    for offset, recipe in enumerate(collided):
+                        recipe_id = str(first + offset)
+                        conn.execute(
+                            "INSERT INTO recipes (category, recipe_id, data) VALUES (?, ?, ?)",
+                            (category, recipe_id, json.dumps({**recipe, "id": recipe_id})),
+                        )
+                        logger.warning(
+                            "Legacy recipe %s/%s has an id already in use; migrated as %s/%s",
+                            category, recipe.get("id"), category, recipe_id,
+                        )
+                    imported += len(collided)
+
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)", (str(json_path),)
+            )
+            if imported:
+                _bump_version(conn)
+            return imported
+
+
+class _WriteTransaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _bump_version(conn: sqlite3.Connection):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('version', '1') "
+        "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m services.recipe_store <recipes.json> <recipes.db>")
+    store = SQLiteRecipeStore(Path(sys.argv[2]))
+    count = store.migrate_from_json(Path(sys.argv[1]))
+    print(f"✓  {count:,} recipes migrated into {store.path}")
@@ -0,0 +1,42 @@
+# backend/services/singleflight.py
+"""
+Request coalescing ("single-flight") for async calls.
+
+While a call for a key is in flight, later callers with the same key wait
+for it instead of starting their own. Everyone gets the same result, or the
+same exception.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._counters = {"calls": 0, "coalesced": 0, "failures": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._counters["coalesced"] += 1
+        else:
+            self._counters["calls"] += 1
+            # The call runs as its own task, so it finishes for the other
+            # waiters even if the caller that started it goes away
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            self._counters["failures"] += 1
+
+    def stats(self) -> Dict:
+        stats = dict(self._counters)
+        stats["in_flight"] = len(self._in_flight)
+        return stats
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+# Keep the suite off the real data/ files and away from the model
+os.environ.setdefault("GENERATION_CACHE_PATH", "")
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,45 @@
+import pytest
+
+from services.encoded_page import accepts_gzip, encode_page, etag_matches
+
+
+def test_gzip_representation_has_its_own_etag():
+    page = encode_page([{"id": "1"}], None, 1)
+    assert page.etag.startswith('"') and page.etag.endswith('"')
+    assert page.gzip_etag == page.etag[:-1] + '-gz"'
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        ('"abc"', True),
+        ('"x", "abc"', True),
+        ('W/"abc"', True),
+        ("*", True),
+        ('"abc-gz"', False),
+        ('"ab"', False),
+        ('"xabcx"', False),
+        ("", False),
+    ],
+)
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+@pytest.mark.parametrize(
+    "header, gzip",
+    [
+        ("gzip, deflate, br", True),
+        ("GZIP", True),
+        ("br;q=1.0, gzip;q=0.8", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0, identity", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("*, gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(header, gzip):
+    assert accepts_gzip(header) is gzip
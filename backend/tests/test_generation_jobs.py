@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from services import generation_jobs
+from services.generation_jobs import DONE, FAILED, RUNNING, JobQueue, MemoryJobBackend, new_job
+
+
+def test_finished_jobs_expire_behind_a_running_one():
+    async def scenario():
+        backend = MemoryJobBackend(ttl_seconds=60)
+        long_running = new_job(["rice"], False)
+        long_running.update(status=RUNNING, started_at=time.time() - 120)
+        await backend.save(long_running)
+        old = new_job(["beans"], False)
+        old.update(status=DONE, finished_at=time.time() - 90)
+        await backend.save(old)
+
+        fresh = new_job(["corn"], False)
+        fresh.update(status=DONE, finished_at=time.time())
+        await backend.save(fresh)
+
+        assert await backend.get(old["id"]) is None
+        assert await backend.get(long_running["id"]) is not None
+        assert await backend.get(fresh["id"]) is not None
+
+    asyncio.run(scenario())
+
+
+class FlakyBackend(MemoryJobBackend):
+    """Fails the first save of a finished job, like a dropped connection."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    async def save(self, job):
+        if job["status"] == DONE and self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend went away")
+        await super().save(job)
+
+
+def test_worker_survives_a_failing_save(monkeypatch):
+    async def generate(ingredients, bypass_cache=False):
+        return {"title": " ".join(ingredients)}
+
+    monkeypatch.setattr(generation_jobs, "get_or_generate_recipe", generate)
+
+    async def scenario():
+        queue = JobQueue(FlakyBackend(), workers=1)
+        queue.start()
+        try:
+            first = await queue.submit(["rice"], bypass_cache=True)
+            second = await queue.submit(["beans"], bypass_cache=True)
+            first = await queue.status(first["id"], wait=1)
+            second = await queue.status(second["id"], wait=1)
+        finally:
+            await queue.stop()
+        assert first["status"] == FAILED and first["status_code"] == 500
+        assert second["status"] == DONE and second["recipe"] == {"title": "beans"}
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from services import generation
+from services.near_duplicates import NearDuplicateIndex
+from services.recipe_store import SQLiteRecipeStore
+
+CHICKEN_RICE_TEXT = """Title: Garlic Chicken Rice
+
+Prep Time: 10 minutes
+Cook Time: 30 minutes
+Servings: 2
+
+Ingredients:
+• 2 chicken breasts
+• 1 cup rice
+• 1 onion
+
+Spices & Seasonings:
+• 2 cloves garlic
+
+Instructions:
+1. Cook the rice.
+2. Brown the chicken with the onion and garlic.
+3. Serve over the rice.
+
+Tips: Add lime.
+"""
+
+
+def saved_recipe(instructions: str) -> dict:
+    return {
+        "title": "Chicken rice",
+        "summary": "A recipe created using: chicken, rice, onion",
+        "category": "dinner",
+        "instructions": instructions,
+        "nutrition": {"calories": 800, "protein": 60.0, "total_carbs": 90.0, "sodium": 1000.0},
+        "servings": 4,
+        "prepTime": "5",
+        "cookTime": "25",
+    }
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SQLiteRecipeStore(tmp_path / "recipes.db")
+    index = NearDuplicateIndex(threshold=0.6)
+    index.follow(lambda: store)
+    monkeypatch.setattr(generation, "near_duplicates", index)
+    return store
+
+
+def test_saved_recipe_is_reused_with_its_own_fields(store):
+    saved = store.add("dinner", saved_recipe(CHICKEN_RICE_TEXT))
+
+    recipe = asyncio.run(generation.reusable_recipe(["chicken", "rice", "onions", "garlic"]))
+
+    assert recipe is not None
+    assert recipe["title"] == "Chicken rice"
+    assert recipe["servings"] == 4
+    assert recipe["prep_time"] == "5"
+    assert recipe["cook_time"] == "25"
+    assert "2 chicken breasts" in recipe["ingredients"]
+    assert "2 cloves garlic" in recipe["spices"]
+    assert recipe["instructions"].startswith("1. Cook the rice.")
+    assert recipe["nutrition"]["calories"] == 200
+    assert recipe["nutrition"]["protein"] == 15.0
+    assert recipe["nutrition"]["sodium"] == 250.0
+    assert recipe["nutrition_source"] == "saved"
+    assert recipe["reused"] == {
+        "source": "saved",
+        "similarity": 0.75,
+        "ingredients": ["chicken", "rice", "onion"],
+        "category": "dinner",
+        "id": saved["id"],
+    }
+
+
+def test_saved_recipe_without_sections_is_not_reused(store):
+    store.add("dinner", saved_recipe("1. Cook the rice.\n2. Brown the chicken.\n3. Serve."))
+
+    assert asyncio.run(generation.reusable_recipe(["chicken", "rice", "onions", "garlic"])) is None
+
+
+def test_recipe_needing_unlisted_ingredients_is_not_reused(store):
+    store.add("dinner", saved_recipe(CHICKEN_RICE_TEXT))
+
+    # Jaccard 2/3, but the saved recipe also needs onion
+    assert asyncio.run(generation.reusable_recipe(["chicken", "rice"])) is None
+
+
+def test_generated_recipe_is_cached(store, monkeypatch, tmp_path):
+    from services.generation_cache import GenerationCache
+
+    calls = []
+
+    async def generate(ingredients):
+        calls.append(ingredients)
+        return {"title": "Bean bowl", "ingredients": "• beans", "instructions": "1. Eat."}
+
+    monkeypatch.setattr(generation, "generation_cache", GenerationCache(tmp_path / "cache.db"))
+    monkeypatch.setattr(generation, "generate_recipe_from_ingredients", generate)
+
+    first = asyncio.run(generation.get_or_generate_recipe(["beans", "corn"]))
+    again = asyncio.run(generation.get_or_generate_recipe(["corn", "beans"]))
+    assert first == again and len(calls) == 1
+    # The disk tier has it too
+    assert GenerationCache(tmp_path / "cache.db").get(generation.ingredient_key(["beans", "corn"])) == first
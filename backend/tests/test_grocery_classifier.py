@@ -0,0 +1,17 @@
+from services.grocery_classifier import SUB_CATEGORY_BY_BUCKET, get_grocery_classifier, load_training_data
+from services.ingredient_index import FALLBACK_BUCKET
+
+
+def test_labels_are_csv_sub_categories():
+    _, csv_labels = load_training_data(map_path=None)
+    _, labels = load_training_data()
+    assert set(labels) == set(csv_labels)
+    assert set(get_grocery_classifier().labels) == set(csv_labels)
+
+
+def test_map_buckets_are_not_returned():
+    _, csv_labels = load_training_data(map_path=None)
+    allowed = set(csv_labels) | {FALLBACK_BUCKET}
+    results = get_grocery_classifier().classify_many(["kale", "yogurt", "paper towels", "oats", "almond milk"])
+    assert {r["category"] for r in results} <= allowed
+    assert set(SUB_CATEGORY_BY_BUCKET.values()) <= set(csv_labels)
@@ -0,0 +1,30 @@
+from services.ingredient_index import IngredientIndex, MAX_FUZZY_WORD, max_edits
+
+INDEX = IngredientIndex({"broccoli": "Produce", "tomatoes": "Produce", "olive oil": "Pantry"})
+
+
+def test_misspellings_still_match():
+    assert [s["name"] for s in INDEX.suggest("brocolli")] == ["broccoli"]
+
+
+def test_long_words_are_matched_exactly():
+    assert max_edits("x" * MAX_FUZZY_WORD) == 2
+    assert max_edits("x" * (MAX_FUZZY_WORD + 1)) == 0
+    assert INDEX.suggest("broccoli" + "x" * 400) == []
+
+
+def test_binary_map_older_than_json_is_not_used(tmp_path, caplog):
+    import os
+
+    from services.ingredient_index import binary_map_is_current
+
+    binary, source = tmp_path / "category_map.bin", tmp_path / "category_map.json"
+    binary.write_bytes(b"")
+    source.write_text("{}")
+    os.utime(binary, (1_000, 1_000))
+    assert not binary_map_is_current(binary, source)
+    assert "older than" in caplog.text
+
+    os.utime(source, (500, 500))
+    assert binary_map_is_current(binary, source)
+    assert not binary_map_is_current(tmp_path / "missing.bin", source)
@@ -0,0 +1,78 @@
+import pytest
+
+from services.nutrition_engine import NutritionEngine, parse_ingredient_line
+from services.nutrition_matrix import NUTRIENTS
+
+
+@pytest.mark.parametrize(
+    "text, quantity, unit, name",
+    [
+        ("1/2 cup rice", 0.5, "cup", "rice"),
+        ("• 1 1/2 cups rice", 1.5, "cup", "rice"),
+        ("3/4 tsp salt", 0.75, "tsp", "salt"),
+        ("1/4 onion", 0.25, "", "onion"),
+        ("1 ½ cups cooked rice, warm", 1.5, "cup", "cooked rice"),
+        ("1.5 lb beef", 1.5, "lb", "beef"),
+        ("2-3 cloves garlic", 2.5, "clove", "garlic"),
+        ("2 eggs", 2.0, "", "eggs"),
+        ("8 fl oz milk", 8.0, "fl oz", "milk"),
+        ("2 T butter", 2.0, "tbsp", "butter"),
+        ("1 t salt", 1.0, "tsp", "salt"),
+        ("salt to taste", None, "", "salt"),
+    ],
+)
+def test_parse_quantities(text, quantity, unit, name):
+    line = parse_ingredient_line(text)
+    assert (line.quantity, line.unit, line.name) == (quantity, unit, name)
+
+
+@pytest.mark.parametrize(
+    "text, quantity, unit",
+    [
+        ("1 (15 oz) can black beans", 15.0, "oz"),
+        ("2 (14.5-ounce) cans diced tomatoes", 29.0, "oz"),
+        ("1 can black beans", 1.0, "can"),
+        ("1 (large) can black beans", 1.0, "can"),
+    ],
+)
+def test_parse_package_size(text, quantity, unit):
+    line = parse_ingredient_line(text)
+    assert (line.quantity, line.unit) == (quantity, unit)
+
+
+def rice_engine() -> NutritionEngine:
+    names = [name for name, _, _ in NUTRIENTS]
+    per_100g = [130 if name == "calories" else 0 for name in names]
+    return NutritionEngine({
+        "nutrients": names,
+        "foods": {"rice": {"per_100g": per_100g, "portions": {"cup": 200}}},
+    })
+
+
+def test_fraction_weighs_a_fraction_of_the_portion():
+    engine = rice_engine()
+    _, _, grams = engine.match("1/2 cup rice")
+    assert grams == pytest.approx(100)
+    nutrition, coverage = engine.compute(["1/2 cup rice"])
+    assert nutrition["calories"] == 130
+    assert coverage["share"] == 1.0
+
+
+def test_fluid_ounces_and_tablespoons_weigh_what_they_say():
+    engine = rice_engine()
+    assert engine.match("8 fl oz rice")[2] == pytest.approx(8 * 29.57)
+    assert engine.match("2 T rice")[2] == pytest.approx(30)
+
+
+def test_nothing_matched_is_unknown_not_zero():
+    nutrition, coverage = rice_engine().compute(["2 cups quinoa", "1 lb tofu", "salt to taste"])
+    assert set(nutrition.values()) == {None}
+    assert coverage["share"] == 0.0
+
+
+def test_low_coverage_is_unknown():
+    nutrition, _ = rice_engine().compute(["1 cup rice", "2 cups quinoa", "1 lb tofu"])
+    assert nutrition["calories"] is None
+    # Unmeasured lines like "salt to taste" don't count against coverage
+    nutrition, _ = rice_engine().compute(["1 cup rice", "salt to taste", "pepper to taste"])
+    assert nutrition["calories"] == 260
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import main
+from services.recipe_ndjson import BulkImport, export_ndjson
+from services.recipe_store import SQLiteRecipeStore
+
+LEGACY = {
+    "lunch": [{
+        "id": 1,
+        "title": "Old salad",
+        "summary": "A recipe created using: lettuce, tomato",
+        "category": "lunch",
+        "instructions": "Toss everything together.",
+    }],
+}
+
+NUTRITION = {name: 1.0 for name in main.DetailedNutrition.model_fields}
+NUTRITION["calories"] = 400
+
+
+async def chunks(body: bytes, size: int = 64):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def without_id(recipe: dict) -> dict:
+    return {key: value for key, value in recipe.items() if key != "id"}
+
+
+def test_export_import_round_trip_with_legacy_rows(tmp_path):
+    legacy_file = tmp_path / "recipes.json"
+    legacy_file.write_text(json.dumps(LEGACY))
+    source = SQLiteRecipeStore(tmp_path / "source.db")
+    assert source.migrate_from_json(legacy_file) == 1
+    saved = main.Recipe(
+        title="Chicken rice", summary="A recipe created using: chicken, rice", category="dinner",
+        instructions="Cook.", nutrition=NUTRITION, servings=2, prepTime="5", cookTime="25",
+    )
+    source.add("dinner", main.recipe_record(saved))
+
+    body = b"".join(export_ndjson(source))
+    target = SQLiteRecipeStore(tmp_path / "target.db")
+    report = asyncio.run(BulkImport(target, main.parse_import_line).run(chunks(body)))
+
+    assert report == {"imported": 2, "failed": 0, "errors": [], "errors_truncated": False}
+    for category in ("lunch", "dinner"):
+        assert [without_id(r) for r in target.list_category(category)] == \
+            [without_id(r) for r in source.list_category(category)]
+
+
+def test_import_still_rejects_incomplete_lines(tmp_path):
+    store = SQLiteRecipeStore(tmp_path / "recipes.db")
+    body = b'{"title": "No category", "summary": "", "instructions": ""}\n'
+    report = asyncio.run(BulkImport(store, main.parse_import_line).run(chunks(body)))
+    assert report["imported"] == 0
+    assert report["errors"][0]["line"] == 1
+    assert "category" in report["errors"][0]["error"]
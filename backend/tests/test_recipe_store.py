@@ -0,0 +1,33 @@
+import json
+
+from services.recipe_store import SQLiteRecipeStore
+
+RECIPE = {"title": "Salad", "summary": "", "category": "lunch", "instructions": "Toss."}
+
+
+def test_unreadable_legacy_file_is_retried(tmp_path):
+    legacy = tmp_path / "recipes.json"
+    legacy.write_text('{"lunch": [')  # Cut off mid-write
+    store = SQLiteRecipeStore(tmp_path / "recipes.db")
+    assert store.migrate_from_json(legacy) == 0
+
+    legacy.write_text(json.dumps({"lunch": [{**RECIPE, "id": 1}]}))
+    assert store.migrate_from_json(legacy) == 1
+    assert store.migrate_from_json(legacy) == 0
+
+
+def test_colliding_and_sparse_legacy_ids(tmp_path):
+    legacy = tmp_path / "recipes.json"
+    legacy.write_text(json.dumps({"lunch": [
+        {**RECIPE, "id": 1, "title": "A"},
+        {**RECIPE, "id": 7, "title": "B"},
+        {**RECIPE, "id": 1, "title": "C"},  # The old len + 1 ids could repeat
+    ]}))
+    store = SQLiteRecipeStore(tmp_path / "recipes.db")
+    assert store.migrate_from_json(legacy) == 3
+
+    ids = {r["title"]: r["id"] for r in store.list_category("lunch")}
+    assert ids == {"A": "1", "B": "7", "C": "8"}
+    # New recipes continue after the highest id, one at a time or in bulk
+    assert store.add("lunch", RECIPE)["id"] == "9"
+    assert [r["id"] for r in store.add_many([("lunch", RECIPE), ("lunch", RECIPE)])] == ["10", "11"]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from services import generation_jobs
+from services.generation_jobs import DONE, QUEUED, JobQueue, RedisJobBackend, new_job
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def backend() -> RedisJobBackend:
+    return RedisJobBackend(ttl_seconds=60, client=fakeredis.FakeAsyncRedis())
+
+
+def test_jobs_round_trip_and_queue_in_fifo_order():
+    async def scenario():
+        jobs = backend()
+        first, second = new_job(["rice"], False), new_job(["beans"], False)
+        for job in (first, second):
+            await jobs.save(job)
+            await jobs.push(job["id"])
+
+        assert await jobs.get(first["id"]) == first
+        assert await jobs.get("missing") is None
+        assert await jobs.depth() == 2
+        assert await jobs.position(first["id"]) == 1
+        assert await jobs.position(second["id"]) == 2
+        assert await jobs.pop() == first["id"]
+        assert await jobs.position(second["id"]) == 1
+        assert await jobs.position(first["id"]) is None
+        assert await jobs.redis.ttl(jobs._key(first["id"])) == 60
+
+    asyncio.run(scenario())
+
+
+def test_wait_wakes_up_when_the_job_finishes():
+    async def scenario():
+        jobs = backend()
+        job = new_job(["rice"], False)
+        await jobs.save(job)
+
+        async def finish():
+            await asyncio.sleep(0.1)
+            job.update(status=DONE, finished_at=0.0)
+            await jobs.save(job)
+
+        finishing = asyncio.ensure_future(finish())
+        started = asyncio.get_running_loop().time()
+        await jobs.wait(job["id"], timeout=5)
+        assert asyncio.get_running_loop().time() - started < 2
+        assert (await jobs.get(job["id"]))["status"] == DONE
+        await finishing
+
+    asyncio.run(scenario())
+
+
+def test_queue_runs_jobs_through_redis(monkeypatch):
+    async def generate(ingredients, bypass_cache=False):
+        return {"title": " ".join(ingredients)}
+
+    monkeypatch.setattr(generation_jobs, "get_or_generate_recipe", generate)
+
+    async def scenario():
+        queue = JobQueue(backend(), workers=1)
+        submitted = await queue.submit(["rice"], bypass_cache=True)
+        assert submitted["status"] == QUEUED and submitted["position"] == 1
+        queue.start()
+        try:
+            done = await queue.status(submitted["id"], wait=2)
+        finally:
+            await queue.stop()
+        assert done["status"] == DONE and done["recipe"] == {"title": "rice"}
+
+    asyncio.run(scenario())
@@ -113,6 +113,23 @@ export const api = {
       return api.post<any>('/api/recipes', recipeData);
     },
   },
+
+  // Ingredient autocomplete / categorization (backed by category_map.json)
+  ingredients: {
+    /**
+     * Autocomplete suggestions for a partial ingredient name
+     */
+    suggest: async (query: string, limit = 8) => {
+      return api.get<any>(`/api/ingredients/suggest?q=${encodeURIComponent(query)}&limit=${limit}`);
+    },
+
+    /**
+     * Categorize a whole grocery list in one call
+     */
+    categorize: async (items: string[]) => {
+      return api.post<any>('/api/ingredients/categorize', { items });
+    },
+  },
 };
 
 export default api; 
\ No newline at end of file